@@ -0,0 +1,28 @@
+from parser import create_arguments_bench
+from logger.logger import OutputManager
+from benchmarks.benchmark import PDFBenchmark
+
+if __name__ == "__main__":
+    logger = OutputManager()
+    logger.print_banner()
+
+    parser = create_arguments_bench()
+    args = parser.parse_args()
+
+    output_file = getattr(args, 'output', None) or getattr(args, 'o', None)
+
+    benchmark = PDFBenchmark(args.work_dir, repeat=args.repeat, trace_memory=not args.no_memory,
+                             encryption_key=None if args.plain else "benchmark",
+                             converter_backend=args.converter,
+                             startup_budget=args.startup_budget / 1000 if args.startup_budget is not None else None,
+                             logger=logger)
+    try:
+        results = benchmark.run(args.objects, args.object_size, args.payload, args.cases)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if output_file:
+        benchmark.write_json(results, output_file)
+        logger.print_success(f"Results written to {output_file} ({len(results)} cases)")
+    if args.compare:
+        benchmark.compare(PDFBenchmark.load_json(args.compare), results)
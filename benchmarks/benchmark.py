@@ -0,0 +1,330 @@
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from benchmarks.synthetic_pdf import SyntheticPDFGenerator
+from converter.converter import PDFTraditionalConverter
+from cryptography.AES import AESCipher
+from extractor.extractor import PDFHiddenMessageExtractor
+from injector.injector import PDFHiddenObjectInjector
+from logger.logger import OutputManager
+
+# One measured case. Times are in seconds over `runs` timed repetitions;
+# peak_memory is the tracemalloc peak of one extra (untimed) run in bytes,
+# None when memory tracing is off; throughput is MB/s of processed input.
+BenchmarkResult = namedtuple('BenchmarkResult', ['case', 'objects', 'object_size', 'payload_size', 'runs',
+                                                 'best', 'mean', 'stdev', 'peak_memory', 'input_size',
+                                                 'output_size', 'throughput'])
+
+
+class PDFBenchmark:
+    """
+    Timing and memory benchmarks of the injection/extraction pipeline
+
+    Every case runs on synthetic PDFs generated once per object count, and
+    results are written as JSON so that two runs (before/after a change)
+    can be compared with compare().
+    """
+
+    CASES = ['inject_text', 'inject_file', 'extract_text', 'extract_file',
+             'aes_encrypt', 'aes_decrypt', 'convert', 'startup']
+    # Directory of inject.py / extract.py, run as fresh processes by the startup case
+    SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # JSON layout version, bumped when fields change
+    FORMAT_VERSION = 1
+
+    def __init__(self, work_dir, repeat=3, trace_memory=True, encryption_key="benchmark",
+                 converter_backend='native', startup_budget=None, logger=None):
+        """
+        Initialize PDFBenchmark
+
+        Args:
+            work_dir (str): Directory receiving the generated and output files
+            repeat (int): Timed repetitions per case (the best and mean are kept)
+            trace_memory (bool): Measure the peak memory of each case (one extra run)
+            encryption_key (str): Key of the encrypted cases (None: plain payloads)
+            converter_backend (str): Backend of the convert case
+            startup_budget (float): Seconds a CLI may add to the bare interpreter
+                start before the startup case warns
+            logger (OutputManager): Progress output (default: warnings and errors only)
+        """
+        self.work_dir = work_dir
+        self.repeat = max(1, repeat)
+        self.trace_memory = trace_memory
+        self.encryption_key = encryption_key
+        self.converter_backend = converter_backend
+        self.startup_budget = startup_budget
+        self.logger = logger or OutputManager(level='warning')
+        # The measured classes stay silent, progress is reported by the benchmark
+        self.quiet = OutputManager(level='quiet')
+        os.makedirs(work_dir, exist_ok=True)
+
+    def path(self, name):
+        """Path of a work file"""
+        return os.path.join(self.work_dir, name)
+
+    def measure(self, func):
+        """
+        Time func repeat times, then run it once more under tracemalloc
+
+        Returns:
+            tuple: (list of elapsed seconds, peak memory in bytes or None)
+        """
+        times = []
+        for _ in range(self.repeat):
+            gc.collect()
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+
+        peak = None
+        if self.trace_memory:
+            gc.collect()
+            tracemalloc.start()
+            try:
+                func()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        return times, peak
+
+    def result(self, case, objects, object_size, payload_size, times, peak, input_size, output_size):
+        """Build the BenchmarkResult of a measured case"""
+        best = min(times)
+        return BenchmarkResult(case, objects, object_size, payload_size, len(times), best,
+                               statistics.mean(times), statistics.stdev(times) if len(times) > 1 else 0.0,
+                               peak, input_size, output_size,
+                               input_size / best / 1e6 if best > 0 and input_size else None)
+
+    def run(self, object_counts, object_size=64, payload_sizes=(1024,), cases=None):
+        """
+        Run the selected cases for every object count and payload size
+
+        Args:
+            object_counts (list): Object counts of the generated PDFs
+            object_size (int): Stream size of the filler objects
+            payload_sizes (list): Payload sizes in bytes
+            cases (list): Subset of CASES (default: all)
+
+        Returns:
+            list: BenchmarkResult of every case, in execution order
+        """
+        cases = cases or self.CASES
+        unknown = set(cases) - set(self.CASES)
+        if unknown:
+            raise ValueError(f"Unknown benchmark cases: {', '.join(sorted(unknown))}")
+
+        results = []
+        encrypted = self.encryption_key is not None
+        for payload_size in payload_sizes:
+            payload_path = self.path(f"payload_{payload_size}.bin")
+            SyntheticPDFGenerator.generate_payload(payload_path, payload_size)
+            message = "x" * payload_size
+
+            for case in ('aes_encrypt', 'aes_decrypt'):
+                if case in cases and encrypted:
+                    results.append(self.run_aes(case, payload_path, payload_size))
+                    self.report(results[-1])
+
+            for objects in object_counts:
+                pdf_path = self.path(f"synthetic_{objects}.pdf")
+                if not os.path.exists(pdf_path):
+                    self.logger.info("🏗️  Generating %s (%s objects)", pdf_path, objects)
+                    SyntheticPDFGenerator(objects, object_size).generate(pdf_path)
+                text_pdf = self.path(f"inject_text_{objects}_{payload_size}.pdf")
+                file_pdf = self.path(f"inject_file_{objects}_{payload_size}.pdf")
+
+                def inject_text():
+                    PDFHiddenObjectInjector(logger=self.quiet).inject_hidden_object(
+                        pdf_path, text_pdf, message, encrypted, self.encryption_key)
+
+                def inject_file():
+                    with open(payload_path, 'rb') as f:
+                        PDFHiddenObjectInjector(logger=self.quiet).inject_hidden_object_file(
+                            pdf_path, file_pdf, f, 'payload.bin', encrypted, self.encryption_key)
+
+                extract_dir = self.path("extracted")
+
+                def extract_text():
+                    PDFHiddenMessageExtractor(logger=self.quiet).extract_all_hidden_objects(
+                        text_pdf, encrypted, self.encryption_key)
+
+                def extract_file():
+                    PDFHiddenMessageExtractor(logger=self.quiet, output_dir=extract_dir).extract_all_hidden_objects_file(
+                        file_pdf, encrypted, self.encryption_key)
+
+                # The extraction cases read the injection outputs: build them even if not measured
+                if 'extract_text' in cases and 'inject_text' not in cases:
+                    inject_text()
+                if 'extract_file' in cases and 'inject_file' not in cases:
+                    inject_file()
+
+                for case, func, source, output in (('inject_text', inject_text, pdf_path, text_pdf),
+                                                   ('inject_file', inject_file, pdf_path, file_pdf),
+                                                   ('extract_text', extract_text, text_pdf, None),
+                                                   ('extract_file', extract_file, file_pdf, None)):
+                    if case not in cases:
+                        continue
+                    times, peak = self.measure(func)
+                    results.append(self.result(case, objects, object_size, payload_size, times, peak,
+                                               os.path.getsize(source),
+                                               os.path.getsize(output) if output else None))
+                    self.report(results[-1])
+
+        # Conversion does not depend on the payload: one run per object count
+        if 'convert' in cases:
+            for objects in object_counts:
+                results.append(self.run_convert(objects, object_size))
+                self.report(results[-1])
+        if 'startup' in cases:
+            results.extend(self.run_startup(min(object_counts), object_size))
+        return results
+
+    def run_aes(self, case, payload_path, payload_size):
+        """Measure streaming encryption or decryption of the payload file"""
+        cipher = AESCipher(self.encryption_key)
+        encrypted_path = self.path(f"payload_{payload_size}.aes")
+        with open(payload_path, 'rb') as src, open(encrypted_path, 'wb') as dst:
+            for chunk in cipher.encrypt_stream_raw(src):
+                dst.write(chunk)
+
+        def encrypt():
+            with open(payload_path, 'rb') as src:
+                for _ in cipher.encrypt_stream_raw(src):
+                    pass
+
+        def decrypt():
+            with open(encrypted_path, 'rb') as src:
+                for _ in cipher.decrypt_stream_raw(iter(lambda: src.read(AESCipher.STREAM_CHUNK_SIZE), b"")):
+                    pass
+
+        func, source = (encrypt, payload_path) if case == 'aes_encrypt' else (decrypt, encrypted_path)
+        times, peak = self.measure(func)
+        return self.result(case, None, None, payload_size, times, peak, os.path.getsize(source), None)
+
+    def run_convert(self, objects, object_size):
+        """Measure an uncached conversion of the synthetic PDF"""
+        pdf_path = self.path(f"synthetic_{objects}.pdf")
+        output = self.path(f"convert_{objects}.pdf")
+        converter = PDFTraditionalConverter(self.converter_backend, use_cache=False, logger=self.quiet)
+        times, peak = self.measure(lambda: converter.convert_pdf(pdf_path, output))
+        return self.result('convert', objects, object_size, None, times, peak,
+                           os.path.getsize(pdf_path), os.path.getsize(output) if os.path.exists(output) else None)
+
+    def run_startup(self, objects, object_size):
+        """
+        Measure cold-start latency: the bare interpreter, then quiet CLI runs on the smallest PDF
+
+        Each command is a fresh process (imports included); the CLI cases
+        are checked against startup_budget after subtracting the interpreter.
+        """
+        pdf_path = os.path.abspath(self.path(f"synthetic_{objects}.pdf"))
+        if not os.path.exists(pdf_path):
+            SyntheticPDFGenerator(objects, object_size).generate(pdf_path)
+        output = os.path.abspath(self.path("startup.pdf"))
+        commands = [
+            ('startup_python', [sys.executable, '-c', 'pass']),
+            ('startup_help', [sys.executable, os.path.join(self.SCRIPTS_DIR, 'inject.py'), '--help']),
+            ('startup_inject', [sys.executable, os.path.join(self.SCRIPTS_DIR, 'inject.py'), '--i', pdf_path,
+                                '--o', output, '--m', 't', '--t', 'x', '--converter', 'native', '--no-cache',
+                                '--quiet']),
+            ('startup_extract', [sys.executable, os.path.join(self.SCRIPTS_DIR, 'extract.py'), '--i', output,
+                                 '--m', 't', '--quiet']),
+        ]
+        results = []
+        for case, command in commands:
+            times = []
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                # The injector writes its temporary copy to the working directory
+                subprocess.run(command, cwd=self.work_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               check=True)
+                times.append(time.perf_counter() - start)
+            results.append(self.result(case, objects if case in ('startup_inject', 'startup_extract') else None,
+                                       None, None, times, None, None, None))
+            self.report(results[-1])
+
+        if self.startup_budget is not None:
+            interpreter = results[0].best
+            for result in results[1:]:
+                if result.best - interpreter > self.startup_budget:
+                    self.logger.warning("⚠️  %s exceeds the startup budget: %.1f ms over the interpreter (budget %.1f ms)",
+                                        result.case, (result.best - interpreter) * 1000, self.startup_budget * 1000)
+        return results
+
+    def report(self, result):
+        """Log one finished case"""
+        memory = f", peak {result.peak_memory / 1024 / 1024:.1f} MiB" if result.peak_memory is not None else ""
+        self.logger.info("⏱️  %-15s objects=%-8s payload=%-10s best %9.2f ms, mean %9.2f ms%s",
+                         result.case, result.objects, result.payload_size, result.best * 1000,
+                         result.mean * 1000, memory, result=result._asdict())
+
+    @staticmethod
+    def environment():
+        """Machine and revision the results were measured on"""
+        try:
+            commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+        return {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'commit': commit or None,
+        }
+
+    def write_json(self, results, output_file):
+        """Write results with their environment as one JSON document"""
+        document = {
+            'format': self.FORMAT_VERSION,
+            'time': time.time(),
+            'environment': self.environment(),
+            'settings': {'repeat': self.repeat, 'trace_memory': self.trace_memory,
+                         'encrypted': self.encryption_key is not None,
+                         'converter_backend': self.converter_backend,
+                         'startup_budget': self.startup_budget},
+            'results': [result._asdict() for result in results],
+        }
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+
+    @staticmethod
+    def load_json(input_file):
+        """Return the BenchmarkResult list of a results file"""
+        with open(input_file, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+        return [BenchmarkResult(**record) for record in document['results']]
+
+    @staticmethod
+    def case_key(result):
+        """Identity of a case across runs"""
+        return result.case, result.objects, result.object_size, result.payload_size
+
+    def compare(self, baseline, results):
+        """
+        Log the speedup of results over a baseline run
+
+        Returns:
+            list: (case key, baseline best, current best, speedup) of the cases in both runs
+        """
+        previous = {self.case_key(result): result for result in baseline}
+        rows = []
+        for result in results:
+            before = previous.get(self.case_key(result))
+            if before is None:
+                continue
+            speedup = before.best / result.best if result.best > 0 else None
+            rows.append((self.case_key(result), before.best, result.best, speedup))
+            self.logger.info("📈 %-15s objects=%-8s payload=%-10s %9.2f ms → %9.2f ms (%sx)",
+                             result.case, result.objects, result.payload_size, before.best * 1000,
+                             result.best * 1000, f"{speedup:.2f}" if speedup else "n/a")
+        return rows
@@ -0,0 +1,91 @@
+import os
+import random
+from array import array
+
+
+class SyntheticPDFGenerator:
+    """
+    Generator of synthetic classic-xref PDFs for benchmarks
+
+    Builds a one-page document (catalog, page tree, page, contents) and pads
+    it with filler stream objects up to the requested object count. Objects
+    are written one at a time, so million-object files never sit in memory.
+    """
+
+    HEADER = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+    # Objects 1-4: catalog, page tree, page and its content stream
+    FIXED_OBJECTS = 4
+    WRITE_BUFFER = 1024 * 1024
+
+    def __init__(self, objects=1000, object_size=64, seed=0):
+        """
+        Initialize SyntheticPDFGenerator
+
+        Args:
+            objects (int): Total number of objects (at least FIXED_OBJECTS)
+            object_size (int): Stream length of each filler object in bytes
+            seed (int): Seed of the filler content, for reproducible files
+        """
+        if objects < self.FIXED_OBJECTS:
+            raise ValueError(f"A synthetic PDF needs at least {self.FIXED_OBJECTS} objects")
+        self.objects = objects
+        self.object_size = object_size
+        self.seed = seed
+
+    def fixed_objects(self):
+        """Bodies of objects 1-4"""
+        contents = b"BT /F1 12 Tf 72 720 Td (PayloadPDF benchmark) Tj ET"
+        return [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R >>",
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(contents), contents),
+        ]
+
+    def filler_streams(self):
+        """A small pool of filler stream bodies, cycled over the filler objects"""
+        rng = random.Random(self.seed)
+        alphabet = b"0123456789 ABCDEFGHIJKLMNOPQRSTUVWXYZ abcdefghijklmnopqrstuvwxyz"
+        pool = []
+        for _ in range(16):
+            data = bytes(rng.choice(alphabet) for _ in range(self.object_size))
+            pool.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(data), data))
+        return pool
+
+    def generate(self, path):
+        """
+        Write the PDF to path
+
+        Returns:
+            int: Size of the written file in bytes
+        """
+        offsets = array('Q')
+        fillers = self.filler_streams()
+        with open(path, 'wb', buffering=self.WRITE_BUFFER) as f:
+            position = f.write(self.HEADER)
+            bodies = self.fixed_objects()
+            for obj_num in range(1, self.objects + 1):
+                body = bodies[obj_num - 1] if obj_num <= self.FIXED_OBJECTS else fillers[obj_num % len(fillers)]
+                offsets.append(position)
+                position += f.write(b"%d 0 obj\n%s\nendobj\n" % (obj_num, body))
+
+            xref_offset = position
+            f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (self.objects + 1))
+            for offset in offsets:
+                f.write(b"%010d 00000 n \n" % offset)
+            f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                    % (self.objects + 1, xref_offset))
+        return os.path.getsize(path)
+
+    @staticmethod
+    def generate_payload(path, size, seed=0):
+        """Write size random (incompressible) bytes to path, in 1 MiB blocks"""
+        rng = random.Random(seed)
+        block = 1024 * 1024
+        with open(path, 'wb') as f:
+            remaining = size
+            while remaining > 0:
+                n = min(block, remaining)
+                f.write(rng.randbytes(n))
+                remaining -= n
+        return size
@@ -0,0 +1,107 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+
+class PDFConversionCache:
+    """
+    Content-addressed on-disk cache of normalized PDFs
+
+    Entries are keyed on the SHA-256 of the input bytes plus the converter
+    options, so an unchanged document is converted only once. The cache is
+    bounded in size and evicts the least recently used entries first.
+    """
+
+    DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize PDFConversionCache
+
+        Args:
+            cache_dir (str): Cache directory (default: $XDG_CACHE_HOME/payloadpdf)
+            max_bytes (int): Maximum total size of cached files
+        """
+        self.cache_dir = cache_dir or self.default_cache_dir()
+        self.max_bytes = max_bytes
+        self._digests = {}
+
+    @staticmethod
+    def default_cache_dir():
+        """Per-user cache directory: $XDG_CACHE_HOME/payloadpdf or ~/.cache/payloadpdf"""
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(base, 'payloadpdf')
+
+    def file_digest(self, path):
+        """SHA-256 of a file, memoized on (path, size, mtime) for this process"""
+        stat = os.stat(path)
+        memo_key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+        if memo_key not in self._digests:
+            digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                    digest.update(chunk)
+            self._digests[memo_key] = digest.hexdigest()
+        return self._digests[memo_key]
+
+    def key(self, input_file, options):
+        """Build the cache key of input_file converted with the given options"""
+        digest = hashlib.sha256(self.file_digest(input_file).encode('ascii'))
+        for option in options:
+            digest.update(b'\0' + str(option).encode('utf-8'))
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        """Path of the cached file for a key"""
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def fetch(self, key, output_file):
+        """Copy the cached entry to output_file; return False on a miss"""
+        path = self.entry_path(key)
+        try:
+            shutil.copyfile(path, output_file)
+            os.utime(path)  # mark as recently used
+            return True
+        except FileNotFoundError:
+            return False
+
+    def store(self, key, converted_file):
+        """Add a converted file to the cache, then enforce the size bound"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            shutil.copyfile(converted_file, tmp_path)
+            os.replace(tmp_path, self.entry_path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.pdf') and entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove every cached entry"""
+        if os.path.isdir(self.cache_dir):
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.pdf') and entry.is_file():
+                    os.remove(entry.path)
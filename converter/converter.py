@@ -1,38 +1,152 @@
+import json
 import platform
-import subprocess
 import sys
 import os
 import shutil
+import time
+from collections import namedtuple
+from converter.normalizer import PDFNormalizer
+from converter.cache import PDFConversionCache
+from logger.logger import OutputManager
+
+# Outcome of a successful conversion. backend is 'native', 'qpdf' or
+# 'cache' (reused from the conversion cache), elapsed is in seconds.
+PDFConversionResult = namedtuple('PDFConversionResult', ['output_file', 'backend', 'input_size', 'output_size', 'elapsed'])
 
 class PDFTraditionalConverter:
-    def __init__(self):
+    BACKENDS = ['auto', 'native', 'qpdf']
+    DEFAULT_PROBE_TTL = 24 * 3600
+
+    # OS / qpdf probe result shared by every instance of this process
+    _probe_state = None
+
+    def __init__(self, backend='auto', use_cache=True, cache_dir=None,
+                 cache_max_bytes=PDFConversionCache.DEFAULT_MAX_BYTES,
+                 probe_cache_ttl=DEFAULT_PROBE_TTL, probe_cache_file=None, logger=None):
+        """
+        Initialize PDFTraditionalConverter
+        
+        Args:
+            backend (str): 'native' (in-process normalizer), 'qpdf' (subprocess)
+                or 'auto' (native first, qpdf as fallback)
+            use_cache (bool): Reuse previously normalized copies of the same input
+            cache_dir (str): Cache directory (default: $XDG_CACHE_HOME/payloadpdf)
+            cache_max_bytes (int): Size bound of the cache, LRU entries are evicted
+            probe_cache_ttl (int): Seconds a qpdf probe stays valid on disk (0/None: memory only)
+            probe_cache_file (str): Probe cache file (default: <cache dir>/qpdf_probe.json)
+            logger (OutputManager): Progress output (default: warnings and errors only)
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown converter backend: {backend}")
+        self.backend = backend
+        self.logger = logger or OutputManager(level='warning')
+        self.used_backend = None
+        self.cache = PDFConversionCache(cache_dir, cache_max_bytes) if use_cache else None
+        self.probe_cache_ttl = probe_cache_ttl
+        self.probe_cache_file = probe_cache_file or os.path.join(
+            cache_dir or PDFConversionCache.default_cache_dir(), 'qpdf_probe.json')
         self.system = ""
         self.qpdf_installed = False
+        self.qpdf_path = None
+        self.qpdf_version = None
         
     def detect_operating_system(self):
         """Detect operating system"""
         self.system = platform.system().lower()
-        print(f"🖥️  Operating system detected: {self.system}")
+        self.logger.info("🖥️  Operating system detected: %s", self.system)
         return self.system
     
     def check_qpdf_installation(self):
         """Check if qpdf is installed"""
+        import subprocess  # only the qpdf backend runs external commands
         try:
-            result = subprocess.run(['qpdf', '--version'], 
+            qpdf_path = shutil.which('qpdf') or 'qpdf'
+            result = subprocess.run([qpdf_path, '--version'], 
                                   capture_output=True, text=True, timeout=5)
             if result.returncode == 0:
-                print(f"✅ qpdf already installed: {result.stdout.strip()}")
+                self.logger.info("✅ qpdf already installed: %s", result.stdout.strip())
                 self.qpdf_installed = True
+                self.qpdf_path = qpdf_path
+                self.qpdf_version = result.stdout.strip().splitlines()[0] if result.stdout.strip() else ""
                 return True
             else:
-                print("❌ qpdf not found")
+                self.logger.warning("❌ qpdf not found")
                 self.qpdf_installed = False
                 return False
         except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
-            print("❌ qpdf not installed")
+            self.logger.warning("❌ qpdf not installed")
             self.qpdf_installed = False
             return False
     
+    def load_probe_cache(self):
+        """Return a still-valid probe result from disk, or None"""
+        if not self.probe_cache_ttl:
+            return None
+        try:
+            with open(self.probe_cache_file, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if time.time() - state.get('timestamp', 0) > self.probe_cache_ttl:
+            return None
+        if state.get('system') != platform.system().lower():
+            return None
+        if not state.get('qpdf_path') or not os.path.exists(state['qpdf_path']):
+            return None
+        return state
+    
+    def save_probe_cache(self, state):
+        """Persist a successful probe result (missing qpdf is never cached on disk)"""
+        if not self.probe_cache_ttl or not state.get('qpdf_installed'):
+            return
+        try:
+            os.makedirs(os.path.dirname(self.probe_cache_file) or '.', exist_ok=True)
+            tmp_file = self.probe_cache_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_file, self.probe_cache_file)
+        except OSError:
+            pass
+    
+    def remember_probe(self, install_attempted=False):
+        """Store the current OS / qpdf state for the rest of the process"""
+        state = {
+            'system': self.system,
+            'qpdf_installed': self.qpdf_installed,
+            'qpdf_path': self.qpdf_path,
+            'qpdf_version': self.qpdf_version,
+            'install_attempted': install_attempted,
+            'timestamp': time.time(),
+        }
+        PDFTraditionalConverter._probe_state = state
+        self.save_probe_cache(state)
+        return state
+    
+    def probe_environment(self):
+        """Detect OS and qpdf once per process (and once per TTL across processes)"""
+        state = PDFTraditionalConverter._probe_state or self.load_probe_cache()
+        if state is None:
+            self.detect_operating_system()
+            self.check_qpdf_installation()
+            return self.remember_probe()
+        
+        PDFTraditionalConverter._probe_state = state
+        self.system = state['system']
+        self.qpdf_installed = state['qpdf_installed']
+        self.qpdf_path = state['qpdf_path']
+        self.qpdf_version = state['qpdf_version']
+        return state
+    
+    def refresh(self):
+        """Drop cached probe results (memory and disk) and probe again"""
+        PDFTraditionalConverter._probe_state = None
+        try:
+            os.remove(self.probe_cache_file)
+        except OSError:
+            pass
+        return self.probe_environment()
+    
     def detect_linux_distribution(self):
         """Detect Linux distribution"""
         try:
@@ -50,106 +164,111 @@ class PDFTraditionalConverter:
     
     def install_qpdf_linux(self):
         """Install qpdf on Linux systems"""
+        import subprocess
         distro = self.detect_linux_distribution()
         
         if distro == 'debian':
-            print("🐧 Detected Debian/Ubuntu system")
-            print("💡 Attempting installation without sudo...")
+            self.logger.info("🐧 Detected Debian/Ubuntu system")
+            self.logger.info("💡 Attempting installation without sudo...")
             
             try:
                 result = subprocess.run(['apt', 'install', '-y', 'qpdf'], 
                                       capture_output=True, text=True, timeout=30)
                 if result.returncode != 0:
-                    print("⚠️  Installation without privileges failed")
-                    print("💡 Try manually: sudo apt install qpdf")
+                    self.logger.warning("⚠️  Installation without privileges failed")
+                    self.logger.warning("💡 Try manually: sudo apt install qpdf")
                     return False
                 return True
             except:
-                print("⚠️  Cannot install automatically")
-                print("💡 Run manually: sudo apt update && sudo apt install qpdf")
+                self.logger.warning("⚠️  Cannot install automatically")
+                self.logger.warning("💡 Run manually: sudo apt update && sudo apt install qpdf")
                 return False
                 
         elif distro == 'redhat':
-            print("🐧 Detected RedHat/Fedora system")
-            print("💡 Run manually: sudo dnf install qpdf")
+            self.logger.info("🐧 Detected RedHat/Fedora system")
+            self.logger.warning("💡 Run manually: sudo dnf install qpdf")
             return False
         else:
-            print("⚠️  Unrecognized Linux distribution")
-            print("💡 Install qpdf manually using your distribution's package manager")
+            self.logger.warning("⚠️  Unrecognized Linux distribution")
+            self.logger.warning("💡 Install qpdf manually using your distribution's package manager")
             return False
     
     def install_qpdf_macos(self):
         """Install qpdf on macOS"""
-        print("🍎 Detected macOS")
+        import subprocess
+        self.logger.info("🍎 Detected macOS")
         
         if shutil.which('brew') is None:
-            print("❌ Homebrew not found")
-            print("💡 Install Homebrew from: https://brew.sh/")
-            print("💡 Then run: brew install qpdf")
+            self.logger.error("❌ Homebrew not found")
+            self.logger.warning("💡 Install Homebrew from: https://brew.sh/")
+            self.logger.warning("💡 Then run: brew install qpdf")
             return False
         
         try:
             result = subprocess.run(['brew', 'install', 'qpdf'], 
                                   capture_output=True, text=True, timeout=120)
             if result.returncode != 0:
-                print(f"❌ Brew error: {result.stderr}")
+                self.logger.error("❌ Brew error: %s", result.stderr)
                 return False
             return True
         except Exception as e:
-            print(f"❌ Error installing via Homebrew: {e}")
+            self.logger.error("❌ Error installing via Homebrew: %s", e)
             return False
     
     def try_winget_installation(self):
         """Try installing qpdf via winget"""
+        import subprocess
         if shutil.which('winget') is not None:
-            print("📦 Using winget...")
+            self.logger.info("📦 Using winget...")
             try:
                 result = subprocess.run(['winget', 'install', 'qpdf', '--accept-source-agreements', '--accept-package-agreements'], 
                                       capture_output=True, text=True, timeout=120)
                 if result.returncode == 0:
-                    print("✅ Installed via winget")
+                    self.logger.info("✅ Installed via winget")
                     return True
                 else:
-                    print(f"⚠️  Winget failed: {result.stderr}")
+                    self.logger.warning("⚠️  Winget failed: %s", result.stderr)
             except Exception as e:
-                print(f"⚠️  Winget error: {e}")
+                self.logger.warning("⚠️  Winget error: %s", e)
         return False
     
     def try_chocolatey_installation(self):
         """Try installing qpdf via chocolatey"""
+        import subprocess
         if shutil.which('choco') is not None:
-            print("🍫 Using Chocolatey...")
+            self.logger.info("🍫 Using Chocolatey...")
             try:
                 result = subprocess.run(['choco', 'install', 'qpdf', '-y'], 
                                       capture_output=True, text=True, timeout=120)
                 if result.returncode == 0:
-                    print("✅ Installed via chocolatey")
+                    self.logger.info("✅ Installed via chocolatey")
                     return True
                 else:
-                    print(f"⚠️  Chocolatey failed: {result.stderr}")
+                    self.logger.warning("⚠️  Chocolatey failed: %s", result.stderr)
             except Exception as e:
-                print(f"⚠️  Chocolatey error: {e}")
+                self.logger.warning("⚠️  Chocolatey error: %s", e)
         return False
     
     def try_scoop_installation(self):
         """Try installing qpdf via scoop"""
+        import subprocess
         if shutil.which('scoop') is not None:
-            print("🥄 Using Scoop...")
+            self.logger.info("🥄 Using Scoop...")
             try:
                 result = subprocess.run(['scoop', 'install', 'qpdf'], 
                                       capture_output=True, text=True, timeout=120)
                 if result.returncode == 0:
-                    print("✅ Installed via scoop")
+                    self.logger.info("✅ Installed via scoop")
                     return True
                 else:
-                    print(f"⚠️  Scoop failed: {result.stderr}")
+                    self.logger.warning("⚠️  Scoop failed: %s", result.stderr)
             except Exception as e:
-                print(f"⚠️  Scoop error: {e}")
+                self.logger.warning("⚠️  Scoop error: %s", e)
         return False
     
     def install_qpdf_windows(self):
         """Install qpdf on Windows"""
-        print("🪟 Detected Windows")
+        self.logger.info("🪟 Detected Windows")
         
         # Try different package managers
         if self.try_winget_installation():
@@ -160,17 +279,18 @@ class PDFTraditionalConverter:
             return True
         
         # No package manager worked
-        print("❌ No package manager found")
-        print("💡 Options:")
-        print("   1. Install winget (Windows 10 1709+): https://github.com/microsoft/winget-cli")
-        print("   2. Install chocolatey: https://chocolatey.org/install")
-        print("   3. Install scoop: https://scoop.sh/")
-        print("   4. Manual download: https://qpdf.sourceforge.io/")
+        self.logger.error("❌ No package manager found")
+        self.logger.warning("💡 Options:")
+        self.logger.warning("   1. Install winget (Windows 10 1709+): https://github.com/microsoft/winget-cli")
+        self.logger.warning("   2. Install chocolatey: https://chocolatey.org/install")
+        self.logger.warning("   3. Install scoop: https://scoop.sh/")
+        self.logger.warning("   4. Manual download: https://qpdf.sourceforge.io/")
         return False
     
     def install_qpdf(self):
         """Install qpdf based on operating system"""
-        print(f"📦 Attempting to install qpdf on {self.system}...")
+        import subprocess
+        self.logger.info("📦 Attempting to install qpdf on %s...", self.system)
         
         try:
             if self.system == "linux":
@@ -180,53 +300,54 @@ class PDFTraditionalConverter:
             elif self.system == "windows":
                 return self.install_qpdf_windows()
             else:
-                print(f"❌ Operating system '{self.system}' not supported")
+                self.logger.error("❌ Operating system '%s' not supported", self.system)
                 return False
                 
         except subprocess.CalledProcessError as e:
-            print(f"❌ Error during installation: {e}")
-            print("💡 Try manual installation")
+            self.logger.error("❌ Error during installation: %s", e)
+            self.logger.warning("💡 Try manual installation")
             return False
         except Exception as e:
-            print(f"❌ Unexpected error: {e}")
+            self.logger.error("❌ Unexpected error: %s", e)
             return False
     
     def show_manual_installation_instructions(self):
         """Show manual installation instructions"""
-        print("\n📋 MANUAL INSTALLATION INSTRUCTIONS:")
+        self.logger.warning("\n📋 MANUAL INSTALLATION INSTRUCTIONS:")
         
         if self.system == "linux":
-            print("🐧 Linux:")
-            print("   Ubuntu/Debian: sudo apt update && sudo apt install qpdf")
-            print("   Fedora/RHEL:   sudo dnf install qpdf")
-            print("   Arch:          sudo pacman -S qpdf")
-            print("   openSUSE:      sudo zypper install qpdf")
+            self.logger.warning("🐧 Linux:")
+            self.logger.warning("   Ubuntu/Debian: sudo apt update && sudo apt install qpdf")
+            self.logger.warning("   Fedora/RHEL:   sudo dnf install qpdf")
+            self.logger.warning("   Arch:          sudo pacman -S qpdf")
+            self.logger.warning("   openSUSE:      sudo zypper install qpdf")
         elif self.system == "darwin":
-            print("🍎 macOS:")
-            print("   With Homebrew: brew install qpdf")
-            print("   With MacPorts: sudo port install qpdf")
-            print("   Download:      https://qpdf.sourceforge.io/")
+            self.logger.warning("🍎 macOS:")
+            self.logger.warning("   With Homebrew: brew install qpdf")
+            self.logger.warning("   With MacPorts: sudo port install qpdf")
+            self.logger.warning("   Download:      https://qpdf.sourceforge.io/")
         elif self.system == "windows":
-            print("🪟 Windows:")
-            print("   Winget:        winget install qpdf")
-            print("   Chocolatey:    choco install qpdf")
-            print("   Scoop:         scoop install qpdf")
-            print("   Download:      https://qpdf.sourceforge.io/")
+            self.logger.warning("🪟 Windows:")
+            self.logger.warning("   Winget:        winget install qpdf")
+            self.logger.warning("   Chocolatey:    choco install qpdf")
+            self.logger.warning("   Scoop:         scoop install qpdf")
+            self.logger.warning("   Download:      https://qpdf.sourceforge.io/")
         
-        print("\n🔄 After installation, run the script again!")
+        self.logger.warning("\n🔄 After installation, run the script again!")
     
     def validate_input_file(self, input_file):
         """Validate input file exists"""
         if not os.path.exists(input_file):
-            print(f"❌ Input file not found: {input_file}")
+            self.logger.error("❌ Input file not found: %s", input_file)
             return False
         return True
     
     def build_conversion_command(self, input_file, output_file):
         """Build qpdf conversion command"""
+        qpdf = self.qpdf_path or 'qpdf'
         if self.system == "windows":
             cmd = [
-                'qpdf', '--qdf',
+                qpdf, '--qdf',
                 '--object-streams=disable',
                 '--compress-streams=n', 
                 '--normalize-content=y',
@@ -236,7 +357,7 @@ class PDFTraditionalConverter:
             ]
         else:
             cmd = [
-                'qpdf', '--qdf',
+                qpdf, '--qdf',
                 '--object-streams=disable',
                 '--compress-streams=n', 
                 '--normalize-content=y',
@@ -248,6 +369,7 @@ class PDFTraditionalConverter:
     
     def execute_conversion(self, cmd):
         """Execute the conversion command"""
+        import subprocess
         try:
             result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
             
@@ -265,7 +387,7 @@ class PDFTraditionalConverter:
         """Verify output file was created successfully"""
         if os.path.exists(output_file):
             size = os.path.getsize(output_file)
-            print(f"📄 Output file created: {output_file} ({size} bytes)")
+            self.logger.info("📄 Output file created: %s (%s bytes)", output_file, size)
             return True
         return False
     
@@ -274,60 +396,139 @@ class PDFTraditionalConverter:
         if not self.validate_input_file(input_file):
             return False
         
-        print(f"🔄 Converting {input_file} → {output_file}")
+        self.logger.info("🔄 Converting %s → %s", input_file, output_file)
         
         # Build and execute command
         cmd = self.build_conversion_command(input_file, output_file)
         success, stdout, stderr = self.execute_conversion(cmd)
         
         if success:
-            print("✅ Conversion completed successfully!")
+            self.logger.info("✅ Conversion completed successfully!")
             return self.verify_output_file(output_file)
         else:
-            print(f"❌ Error during conversion:")
+            self.logger.error("❌ Error during conversion:")
             if stdout:
-                print(f"   stdout: {stdout}")
+                self.logger.error("   stdout: %s", stdout)
             if stderr:
-                print(f"   stderr: {stderr}")
+                self.logger.error("   stderr: %s", stderr)
             return False
     
     def setup_qpdf(self):
-        """Setup qpdf installation"""
-        if not self.check_qpdf_installation():
-            print("\n⚠️  qpdf is not installed!")
-            
-            # Try automatic installation
-            print("🔧 Attempting automatic installation...")
-            if self.install_qpdf():
-                # Verify again after installation
-                if self.check_qpdf_installation():
-                    print("✅ qpdf installed successfully!")
-                    return True
-                else:
-                    print("❌ qpdf not working after installation")
-                    self.show_manual_installation_instructions()
-                    return False
+        """
+        Setup qpdf installation
+        
+        Trusts the cached probe: a missing qpdf is installed at most once
+        per process, later calls fail without forking anything until
+        refresh() probes again.
+        """
+        state = self.probe_environment()
+        if self.qpdf_installed:
+            return True
+        if state.get('install_attempted'):
+            self.logger.error("❌ qpdf is not available (refresh() probes and installs again)")
+            return False
+        self.logger.warning("\n⚠️  qpdf is not installed!")
+        
+        # Try automatic installation
+        self.logger.info("🔧 Attempting automatic installation...")
+        if self.install_qpdf():
+            # Verify again after installation
+            if self.check_qpdf_installation():
+                self.logger.info("✅ qpdf installed successfully!")
+                self.remember_probe(install_attempted=True)
+                return True
             else:
-                print("❌ Automatic installation failed")
-                self.show_manual_installation_instructions()
-                return False
-        return True
+                self.logger.error("❌ qpdf not working after installation")
+        else:
+            self.logger.error("❌ Automatic installation failed")
+        self.remember_probe(install_attempted=True)
+        self.show_manual_installation_instructions()
+        return False
+    
+    def convert_pdf_native(self, input_file, output_file):
+        """Convert PDF to traditional format in-process, without qpdf"""
+        if not self.validate_input_file(input_file):
+            return False
+        
+        self.logger.info("🔄 Normalizing %s → %s (native)", input_file, output_file)
+        
+        try:
+            normalizer = PDFNormalizer(self.logger)
+            normalizer.normalize(input_file, output_file)
+            self.logger.info("✅ Native normalization completed (%s objects)", normalizer.objects_written)
+            return self.verify_output_file(output_file)
+        except Exception as e:
+            self.logger.warning("⚠️  Native normalization failed: %s", e)
+            return False
+    
+    def conversion_options(self):
+        """Options that determine the converted output (part of the cache key)"""
+        system = self.system or platform.system().lower()
+        previous, self.system = self.system, system
+        flags = self.build_conversion_command('', '')[1:-2]
+        self.system = previous
+        return [f"backend={self.backend}", f"normalizer={PDFNormalizer.VERSION}"] + flags
     
     def convert_pdf(self, input_file, output_file):
-        """Main method to convert PDF to traditional format"""
-        print("🚀 Starting PDF conversion...")
+        """
+        Main method to convert PDF to traditional format
+        
+        Returns a PDFConversionResult, or None when the conversion failed.
+        """
+        self.logger.info("🚀 Starting PDF conversion...")
+        start_time = time.perf_counter()
+        
+        key = None
+        if self.cache is not None and os.path.exists(input_file):
+            try:
+                key = self.cache.key(input_file, self.conversion_options())
+                if self.cache.fetch(key, output_file):
+                    self.logger.info("⚡ Reused cached conversion: %s", self.cache.entry_path(key))
+                    self.used_backend = 'cache'
+                    if not self.verify_output_file(output_file):
+                        return None
+                    return self.conversion_result(input_file, output_file, start_time)
+            except OSError as e:
+                self.logger.warning("⚠️  Conversion cache unavailable: %s", e)
+                key = None
+        
+        success = self.convert_pdf_uncached(input_file, output_file)
         
+        if success and key is not None:
+            try:
+                self.cache.store(key, output_file)
+            except OSError as e:
+                self.logger.warning("⚠️  Could not store conversion in cache: %s", e)
+        return self.conversion_result(input_file, output_file, start_time) if success else None
+    
+    def conversion_result(self, input_file, output_file, start_time):
+        """Build the PDFConversionResult of a finished conversion"""
+        return PDFConversionResult(output_file, self.used_backend, os.path.getsize(input_file),
+                                   os.path.getsize(output_file), time.perf_counter() - start_time)
+    
+    def convert_pdf_uncached(self, input_file, output_file):
+        """Convert PDF to traditional format, bypassing the cache"""
         try:
-            # Step 1: Detect operating system
-            self.detect_operating_system()
+            # Step 0: Try the in-process normalizer
+            if self.backend in ['auto', 'native']:
+                if self.convert_pdf_native(input_file, output_file):
+                    self.used_backend = 'native'
+                    return True
+                if self.backend == 'native':
+                    return False
+                self.logger.info("🔁 Falling back to qpdf...")
+            
+            # Step 1: Detect operating system and qpdf (cached after the first call)
+            self.probe_environment()
             
             # Step 2: Setup qpdf
             if not self.setup_qpdf():
                 return False
             
             # Step 3: Execute conversion
+            self.used_backend = 'qpdf'
             return self.convert_pdf_to_traditional(input_file, output_file)
             
         except Exception as e:
-            print(f"❌ Unexpected error in conversion process: {e}")
+            self.logger.error("❌ Unexpected error in conversion process: %s", e)
             return False
\ No newline at end of file
@@ -0,0 +1,156 @@
+import mmap
+import os
+import re
+from extractor.xref_reader import PDFXrefReader
+from logger.logger import OutputManager
+
+
+class PDFNormalizer:
+    """
+    In-process replacement for the qpdf QDF conversion
+
+    Rewrites a PDF into the layout the injector needs: every object as a
+    top-level "N G obj ... endobj" in number order, a single classic xref
+    table and a plain trailer. Objects stored in object streams are
+    expanded, xref streams are dropped and content streams are copied
+    byte-for-byte, so they stay compressed.
+    """
+
+    # Bump when the output layout changes (part of the conversion cache key)
+    VERSION = 2
+
+    HEADER_PATTERN = rb'\s*(\d+)\s+(\d+)\s+obj'
+    BODY_END_PATTERN = rb'stream\r?\n|endobj'
+    TRAILER_KEYS = [
+        rb'/Root\s+\d+\s+\d+\s+R',
+        rb'/Info\s+\d+\s+\d+\s+R',
+        rb'/Encrypt\s+\d+\s+\d+\s+R',
+        rb'/ID\s*\[[^\]]*\]',
+    ]
+
+    def __init__(self, logger=None):
+        self.logger = logger or OutputManager(level='warning')
+        self.content = b""
+        self.reader = None
+        self.objects_written = 0
+
+    def object_span(self, offset, obj_num=None):
+        """Return (start, end) of the top-level object at offset (object obj_num if given), or None"""
+        header = re.compile(self.HEADER_PATTERN).match(self.content, offset)
+        if not header or (obj_num is not None and int(header.group(1)) != obj_num):
+            return None
+        body_end = re.compile(self.BODY_END_PATTERN).search(self.content, header.end())
+        if not body_end:
+            return None
+
+        if body_end.group(0) == b'endobj':
+            return header.start(1), body_end.end()
+
+        # Stream: skip the declared /Length so binary data cannot fool the search
+        data_start = body_end.end()
+        stream_dict = self.content[header.end():body_end.start()]
+        length = self.stream_length(stream_dict)
+        end = -1
+        if length is not None and re.compile(rb'\s*endstream').match(self.content, data_start + length):
+            end = self.content.find(b'endstream', data_start + length)
+        if end < 0:
+            end = self.content.find(b'endstream', data_start)
+        end = self.content.find(b'endobj', end) if end >= 0 else -1
+        if end < 0:
+            return None
+        return header.start(1), end + len(b'endobj')
+
+    def stream_length(self, stream_dict):
+        """Resolve the /Length of a stream dictionary, following an indirect reference"""
+        match = re.search(rb'/Length\s+(\d+)(?:\s+(\d+)\s+R)?', stream_dict)
+        if not match:
+            return None
+        if match.group(2) is None:
+            return int(match.group(1))
+        entry = self.reader.entries.get(int(match.group(1)))
+        if entry is None or entry.kind != 'n':
+            return None
+        value = re.compile(self.HEADER_PATTERN + rb'\s*(\d+)').match(self.content, entry.offset)
+        return int(value.group(3)) if value else None
+
+    def find_object(self, obj_num, generation):
+        """Span of the last "N G obj" of an object whose xref offset is wrong, or None"""
+        pattern = re.compile(rb'(?<!\d)%d\s+%d\s+obj\b' % (obj_num, generation))
+        for match in reversed(list(pattern.finditer(self.content))):
+            span = self.object_span(match.start(), obj_num)
+            if span is not None:
+                return span
+        return None
+
+    def build_trailer(self, size):
+        """Keep only the document-level trailer keys and set the new /Size"""
+        keys = [b'/Size %d' % size]
+        for pattern in self.TRAILER_KEYS:
+            match = re.search(pattern, self.reader.trailer)
+            if match:
+                keys.append(match.group(0))
+        return b'<< ' + b' '.join(keys) + b' >>'
+
+    def normalize(self, input_file, output_file):
+        """Write a classic-xref, object-stream-free copy of input_file"""
+        with open(input_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError("empty input file")
+            self.content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self.reader = PDFXrefReader(self.content, self.logger)
+            if not self.reader.read():
+                raise ValueError("no readable cross-reference section")
+
+            compressed = [entry for entry in self.reader.entries.values() if entry.kind == 'c']
+            if compressed and re.search(rb'/Encrypt\b', self.reader.trailer):
+                raise ValueError("encrypted object streams are not supported")
+
+            # Containers and xref streams are replaced by their expanded content
+            skipped = set(entry.offset for entry in compressed)
+            skipped_offsets = set(offset for kind, offset in self.reader.sections if kind == 'stream')
+
+            version = re.match(rb'%PDF-(\d\.\d)', self.content[:16])
+            offsets = {}
+            with open(output_file, 'wb') as out, memoryview(self.content) as view:
+                pos = out.write(b'%PDF-' + (version.group(1) if version else b'1.4') + b'\n%\xe2\xe3\xcf\xd3\n')
+
+                for obj_num in sorted(self.reader.entries):
+                    entry = self.reader.entries[obj_num]
+                    if entry.kind == 'n' and obj_num not in skipped and entry.offset not in skipped_offsets:
+                        span = self.object_span(entry.offset, obj_num)
+                        if span is None:
+                            # A copy without the object would pass for a good conversion
+                            span = self.find_object(obj_num, entry.generation)
+                            if span is None:
+                                raise ValueError(f"object {obj_num} not found (xref offset {entry.offset})")
+                            self.logger.warning("⚠️  Object %s not at offset %s, recovered at %s",
+                                                obj_num, entry.offset, span[0])
+                        offsets[obj_num] = (pos, entry.generation)
+                        pos += out.write(view[span[0]:span[1]])
+                        pos += out.write(b'\n')
+                    elif entry.kind == 'c':
+                        body = self.reader.read_object_stream(entry.offset).get(obj_num)
+                        if body is None:
+                            raise ValueError(f"object {obj_num} missing from object stream {entry.offset}")
+                        offsets[obj_num] = (pos, 0)
+                        pos += out.write(b'%d 0 obj\n' % obj_num + body + b'\nendobj\n')
+
+                size = max(max(offsets) + 1 if offsets else 1, self.reader.size)
+                xref_offset = pos
+                out.write(b'xref\n0 %d\n' % size)
+                out.write(b'0000000000 65535 f \n')
+                for obj_num in range(1, size):
+                    if obj_num in offsets:
+                        out.write(b'%010d %05d n \n' % offsets[obj_num])
+                    else:
+                        out.write(b'0000000000 00000 f \n')
+                out.write(b'trailer\n' + self.build_trailer(size) + b'\nstartxref\n%d\n%%%%EOF\n' % xref_offset)
+
+            self.objects_written = len(offsets)
+            return True
+        finally:
+            self.reader = None
+            self.content.close()
+            self.content = b""
@@ -1,13 +1,54 @@
 import base64
+import functools
 import hashlib
-from Crypto import Random
-from Crypto.Cipher import AES
+import importlib
+from cryptography import base64_stream
+
+KDF_CACHE_SIZE = 128
+PBKDF2_ITERATIONS = 200000
+GCM_TAG_SIZE = 16
+
+
+class _LazyModule(object):
+    """Modulo importato al primo accesso a un attributo (pycryptodome pesa sull'avvio dei comandi)"""
+
+    def __init__(self, name):
+        self.name = name
+        self.module = None
+
+    def __getattr__(self, attribute):
+        if self.module is None:
+            self.module = importlib.import_module(self.name)
+        return getattr(self.module, attribute)
+
+
+Random = _LazyModule("Crypto.Random")
+AES = _LazyModule("Crypto.Cipher.AES")
+
+
+@functools.lru_cache(maxsize=KDF_CACHE_SIZE)
+def derive_key(key, salt=b"", kdf="sha256", iterations=PBKDF2_ITERATIONS):
+    """Deriva la chiave AES-256 dalla password (memoizzata, LRU su chiave + parametri)"""
+    if kdf == "sha256":
+        return hashlib.sha256(key.encode()).digest()
+    if kdf == "pbkdf2":
+        return hashlib.pbkdf2_hmac("sha256", key.encode(), salt, iterations)
+    raise ValueError(f"Unsupported KDF: {kdf}")
+
 
 class AESCipher(object):
 
-    def __init__(self, key):
-        self.bs = AES.block_size
-        self.key = hashlib.sha256(key.encode()).digest()
+    # Multiple of both the AES block size (16) and the base64 group size (3),
+    # so every chunk encodes without padding in the middle of the stream
+    STREAM_CHUNK_SIZE = 48 * 4096
+
+    def __init__(self, key, salt=b"", kdf="sha256", iterations=PBKDF2_ITERATIONS):
+        self.bs = 16  # AES block size: a wrong-key check never loads pycryptodome
+        self.kdf = kdf
+        self.salt = salt
+        self.iterations = iterations
+        # Derivation is cached: building many ciphers for one key costs one KDF run
+        self.key = derive_key(key, salt, kdf, iterations)
 
     def encrypt(self, raw):
         raw = self._pad(raw)
@@ -35,6 +76,74 @@ class AESCipher(object):
         cipher = AES.new(self.key, AES.MODE_CBC, iv)
         return self._unpad_bytes(cipher.decrypt(enc[AES.block_size:]))
 
+    def encrypt_chunk(self, data, nonce, aad=b""):
+        """Cifra un blocco indipendente con AES-GCM e restituisce ciphertext + tag"""
+        cipher = AES.new(self.key, AES.MODE_GCM, nonce=nonce, mac_len=GCM_TAG_SIZE)
+        cipher.update(aad)
+        ciphertext, tag = cipher.encrypt_and_digest(data)
+        return ciphertext + tag
+
+    def decrypt_chunk(self, data, nonce, aad=b""):
+        """Decifra un blocco AES-GCM e ne verifica il tag (ValueError se non corrisponde)"""
+        if len(data) < GCM_TAG_SIZE:
+            raise ValueError("Encrypted chunk shorter than the GCM tag")
+        cipher = AES.new(self.key, AES.MODE_GCM, nonce=nonce, mac_len=GCM_TAG_SIZE)
+        cipher.update(aad)
+        return cipher.decrypt_and_verify(data[:-GCM_TAG_SIZE], data[-GCM_TAG_SIZE:])
+
+    def encrypted_raw_length(self, size):
+        """Length of iv + ciphertext produced by encrypt_stream_raw for a payload of size bytes"""
+        return self.bs + (size // self.bs + 1) * self.bs
+
+    def encrypted_length(self, size):
+        """Length of the base64 output of encrypt_byte/encrypt_stream for a payload of size bytes"""
+        return base64_stream.encoded_length(self.encrypted_raw_length(size))
+
+    def encrypt_stream(self, reader, chunk_size=STREAM_CHUNK_SIZE):
+        """Cripta un file-like binario a blocchi e restituisce base64 incrementale"""
+        return base64_stream.encode_chunks(self.encrypt_stream_raw(reader, chunk_size))
+
+    def encrypt_stream_raw(self, reader, chunk_size=STREAM_CHUNK_SIZE):
+        """Restituisce iv e ciphertext CBC a blocchi (padding PKCS7 sull'ultimo)"""
+        iv = Random.new().read(AES.block_size)
+        cipher = AES.new(self.key, AES.MODE_CBC, iv)
+        yield iv
+        tail = b""
+        while True:
+            data = reader.read(chunk_size)
+            if not data:
+                break
+            if tail:
+                data = tail + data
+            cut = len(data) - len(data) % self.bs
+            yield cipher.encrypt(data[:cut])
+            tail = data[cut:]
+        yield cipher.encrypt(self._pad_bytes(tail))
+
+    def decrypt_stream(self, chunks):
+        """Decripta base64 ricevuto a blocchi e restituisce bytes incrementali"""
+        return self.decrypt_stream_raw(base64_stream.decode_chunks(chunks))
+
+    def decrypt_stream_raw(self, chunks):
+        """Decripta iv + ciphertext ricevuti a blocchi e restituisce bytes incrementali"""
+        raw = bytearray()
+        cipher = None
+        for data in chunks:
+            raw += data
+            if cipher is None:
+                if len(raw) < self.bs:
+                    continue
+                cipher = AES.new(self.key, AES.MODE_CBC, bytes(raw[:self.bs]))
+                del raw[:self.bs]
+            # Keep the last block back: it carries the padding
+            usable = len(raw) - len(raw) % self.bs - self.bs
+            if usable > 0:
+                yield cipher.decrypt(bytes(raw[:usable]))
+                del raw[:usable]
+        if cipher is None:
+            raise ValueError("Encrypted payload shorter than the IV")
+        yield self._unpad_bytes(cipher.decrypt(bytes(raw)))
+
     def _pad(self, s):
         return s + (self.bs - len(s) % self.bs) * chr(self.bs - len(s) % self.bs)
     
@@ -46,10 +155,14 @@ class AESCipher(object):
 
     @staticmethod
     def _unpad(s):
-        return s[:-ord(s[len(s)-1:])]
+        return AESCipher._unpad_bytes(s)
 
     @staticmethod
     def _unpad_bytes(data):
-        """Rimozione padding PKCS7 per bytes"""
+        """Rimozione padding PKCS7 per bytes (ValueError se vuoto o padding non valido)"""
+        if not data:
+            raise ValueError("Empty plaintext: missing PKCS7 padding")
         padding_length = data[-1]
+        if not 1 <= padding_length <= min(16, len(data)) or data[-padding_length:] != bytes([padding_length]) * padding_length:
+            raise ValueError("Invalid PKCS7 padding (wrong key or corrupt payload)")
         return data[:-padding_length]
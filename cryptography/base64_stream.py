@@ -0,0 +1,85 @@
+import binascii
+import re
+
+# Multiple of 3, so every full chunk encodes without '=' padding
+ENCODE_CHUNK_SIZE = 3 * 64 * 1024
+# Multiple of 4, so every full chunk of clean input decodes on its own
+DECODE_CHUNK_SIZE = 4 * 64 * 1024
+
+WHITESPACE = b" \t\r\n\f\x00"
+_WHITESPACE_PATTERN = re.compile(rb'[ \t\r\n\f\x00]')
+
+
+def encoded_length(size):
+    """Length of the base64 encoding of size bytes"""
+    return 4 * ((size + 2) // 3)
+
+
+def encode_reader(reader, chunk_size=ENCODE_CHUNK_SIZE):
+    """Encode a binary file-like object to base64, yielding fixed-size blocks"""
+    chunk_size -= chunk_size % 3
+    if hasattr(reader, 'readinto'):
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        return encode_chunks(view[:n] for n in iter(lambda: reader.readinto(buffer), 0))
+    return encode_chunks(iter(lambda: reader.read(chunk_size), b''))
+
+
+def encode_chunks(chunks):
+    """Encode an iterable of bytes-like chunks to base64, yielding blocks as they complete"""
+    carry = b''
+    for chunk in chunks:
+        if carry:
+            # Complete the pending group with the head of this chunk
+            need = 3 - len(carry)
+            carry += bytes(chunk[:need])
+            # Re-aligning after a short chunk (e.g. a header) must not copy the rest
+            chunk = memoryview(chunk)[need:]
+            if len(carry) < 3:
+                continue
+            yield binascii.b2a_base64(carry, newline=False)
+            carry = b''
+        aligned = len(chunk) - len(chunk) % 3
+        if aligned:
+            yield binascii.b2a_base64(chunk[:aligned], newline=False)
+        carry = bytes(chunk[aligned:])
+    if carry:
+        yield binascii.b2a_base64(carry, newline=False)
+
+
+def decode_chunks(chunks):
+    """
+    Decode an iterable of base64 chunks (bytes or memoryview), yielding bytes
+
+    Whitespace anywhere in the input is ignored. Chunks without whitespace
+    are decoded in place, only the few characters straddling two chunks are
+    copied.
+    """
+    carry = b''
+    for chunk in chunks:
+        if _WHITESPACE_PATTERN.search(chunk):
+            chunk = bytes(chunk).translate(None, WHITESPACE)
+        if carry:
+            need = 4 - len(carry)
+            carry += bytes(chunk[:need])
+            chunk = chunk[need:]
+            if len(carry) < 4:
+                continue
+            yield binascii.a2b_base64(carry)
+            carry = b''
+        aligned = len(chunk) - len(chunk) % 4
+        if aligned:
+            yield binascii.a2b_base64(chunk[:aligned])
+        carry = bytes(chunk[aligned:])
+    if carry:
+        raise binascii.Error("Incomplete base64 group at end of input")
+
+
+def split_buffer(buffer, chunk_size=DECODE_CHUNK_SIZE, head=0):
+    """Yield zero-copy memoryview slices of a bytes-like buffer (the first one head bytes long, if given)"""
+    view = memoryview(buffer)
+    if head:
+        yield view[:head]
+        view = view[head:]
+    for start in range(0, len(view), chunk_size):
+        yield view[start:start + chunk_size]
@@ -0,0 +1,78 @@
+import base64
+import re
+import struct
+from collections import namedtuple
+from cryptography import payload_header
+
+# A chunked payload is a manifest object followed, with consecutive object
+# numbers, by Count chunk objects of ChunkSize plaintext bytes each (the
+# last one shorter). Every chunk is compressed and encrypted on its own,
+# with AES-GCM under the nonce prefix + big-endian chunk index:
+#   N 0 obj << /name /Chunked /Count C /ChunkSize S /Nonce <hex> /Header base64 >> endobj
+#   N+1 0 obj << /PayloadChunk base64 >> endobj          (base64 encoding)
+#   N+1 0 obj << /PayloadChunk /Stream /Length L >> stream ... (stream encoding)
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+CHUNK_KEY = "PayloadChunk"
+NONCE_PREFIX_SIZE = 8
+
+CHUNK_PATTERN = re.compile(rb'\s*/PayloadChunk\b')
+MANIFEST_PATTERN = re.compile(rb'\s*/(\S+)\s+/Chunked\b')
+
+# Manifest entries after the name, with the pattern of their value
+MANIFEST_FIELDS = {'Count': r'(\d+)', 'ChunkSize': r'(\d+)', 'Nonce': r'<([0-9a-fA-F]*)>',
+                   'Header': r'([A-Za-z0-9+/=]+)'}
+
+# Parsed manifest: header is the PayloadHeader of the whole file
+# (plaintext length, KDF parameters, key check, compression codec)
+ChunkManifest = namedtuple('ChunkManifest', ['name', 'count', 'chunk_size', 'nonce', 'header'])
+
+
+def chunk_count(size, chunk_size):
+    """Number of chunks of a payload of size bytes"""
+    return (size + chunk_size - 1) // chunk_size
+
+
+def chunk_length(index, size, chunk_size):
+    """Plaintext length of chunk index"""
+    return min(chunk_size, size - index * chunk_size)
+
+
+def chunk_nonce(prefix, index):
+    """GCM nonce of chunk index (12 bytes: random prefix + index)"""
+    return prefix + struct.pack(">I", index)
+
+
+def chunk_aad(index, count):
+    """Authenticated data of a chunk: a reordered or truncated container fails the tag check"""
+    return struct.pack(">QQ", index, count)
+
+
+def build_manifest(name, count, chunk_size, nonce, header):
+    """Dictionary entries of the manifest object"""
+    return (f"/{name} /Chunked /Count {count} /ChunkSize {chunk_size} /Nonce <{nonce.hex()}> "
+            f"/Header {base64.b64encode(header).decode('ascii')}")
+
+
+def parse_manifest(obj_content):
+    """
+    Parse a manifest dictionary
+
+    Returns None when obj_content is not a manifest; raises ValueError on a
+    malformed one.
+    """
+    match = re.match(r'/(\S+)\s+/Chunked\b', obj_content)
+    if not match:
+        return None
+    fields = {}
+    for key, pattern in MANIFEST_FIELDS.items():
+        field = re.search(rf'/{key}\s+{pattern}', obj_content)
+        if not field:
+            raise ValueError(f"Malformed chunk manifest: no /{key}")
+        fields[key] = field.group(1)
+    header = payload_header.parse(base64.b64decode(fields['Header']))
+    if header is None:
+        raise ValueError("Malformed chunk manifest: no payload header")
+    count, chunk_size = int(fields['Count']), int(fields['ChunkSize'])
+    if chunk_size <= 0 or count != chunk_count(header.plain_length, chunk_size):
+        raise ValueError("Malformed chunk manifest: chunk count does not match the payload length")
+    return ChunkManifest(match.group(1), count, chunk_size, bytes.fromhex(fields['Nonce']), header)
@@ -0,0 +1,70 @@
+import lzma
+import zlib
+
+# Codecs applied to the payload before encryption, as recorded in the payload header
+CODECS = ['zlib', 'lzma']
+CODEC_IDS = {None: 0, 'zlib': 1, 'lzma': 2}
+CODEC_NAMES = {value: name for name, value in CODEC_IDS.items()}
+DEFAULT_LEVEL = 6
+
+# Auto mode: compress this much of the payload with a fast level first and
+# skip compression unless it saves at least MIN_SAVING of the sample
+SAMPLE_SIZE = 64 * 1024
+MIN_SAVING = 0.1
+
+OUTPUT_CHUNK_SIZE = 1024 * 1024
+
+
+def check_level(codec, level):
+    """Return the compression level to use (ValueError outside 0-9)"""
+    if level is None:
+        return DEFAULT_LEVEL
+    if not 0 <= level <= 9:
+        raise ValueError(f"Invalid {codec} compression level: {level} (0-9)")
+    return level
+
+
+def compressor(codec, level=None):
+    """Incremental compressor (compress/flush) of a codec"""
+    level = check_level(codec, level)
+    if codec == 'zlib':
+        return zlib.compressobj(level)
+    if codec == 'lzma':
+        return lzma.LZMACompressor(preset=level)
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+
+def is_compressible(sample):
+    """True when a fast zlib pass over the sample saves at least MIN_SAVING"""
+    if not sample:
+        return False
+    return len(zlib.compress(sample, 1)) <= len(sample) * (1 - MIN_SAVING)
+
+
+def decompress_chunks(chunks, codec):
+    """
+    Decompress a chunk stream incrementally, yielding at most OUTPUT_CHUNK_SIZE
+    bytes at a time (a small, highly compressed chunk never expands in one
+    piece). Raises ValueError on corrupt or truncated data.
+    """
+    if codec == 'zlib':
+        decompressor = zlib.decompressobj()
+    elif codec == 'lzma':
+        decompressor = lzma.LZMADecompressor()
+    else:
+        raise ValueError(f"Unknown compression codec: {codec}")
+    try:
+        for chunk in chunks:
+            data = decompressor.decompress(chunk, OUTPUT_CHUNK_SIZE)
+            while data:
+                yield data
+                if codec == 'zlib':
+                    data = decompressor.decompress(decompressor.unconsumed_tail, OUTPUT_CHUNK_SIZE)
+                elif decompressor.needs_input or decompressor.eof:
+                    data = b""
+                else:
+                    data = decompressor.decompress(b"", OUTPUT_CHUNK_SIZE)
+    except (zlib.error, lzma.LZMAError, EOFError) as e:
+        raise ValueError(f"Corrupt {codec} payload: {e}") from e
+    if not decompressor.eof:
+        raise ValueError(f"Truncated {codec} payload")
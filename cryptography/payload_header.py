@@ -0,0 +1,131 @@
+import hashlib
+import hmac
+import itertools
+import struct
+from collections import namedtuple
+from cryptography import compression
+
+# Versioned header written in front of every payload (inside the base64
+# text or at the start of the stream data):
+#   magic, version, flags, KDF id, salt length, KDF iterations,
+#   plaintext length, key-check value, tag length, compression codec id
+#   (version 2), then salt and tag bytes
+MAGIC = b"PPDF"
+VERSION = 2
+FIXED_FORMAT = struct.Struct(">4sBBBBIQ8sBB2x")
+FIXED_SIZE = FIXED_FORMAT.size
+# Base64 characters that cover the fixed part: enough to accept or reject a payload
+PEEK_LENGTH = 4 * ((FIXED_SIZE + 2) // 3)
+
+FLAG_ENCRYPTED = 0x01
+
+KDF_IDS = {None: 0, 'sha256': 1, 'pbkdf2': 2}
+KDF_NAMES = {value: name for name, value in KDF_IDS.items()}
+
+KEY_CHECK_SIZE = 8
+KEY_CHECK_LABEL = b"PayloadPDF key check"
+
+PayloadHeader = namedtuple('PayloadHeader', ['version', 'flags', 'kdf', 'iterations', 'salt', 'plain_length',
+                                             'key_check', 'tag', 'compression', 'size'])
+
+
+def key_check(key):
+    """Key-check value of a derived AES key (an HMAC, so it reveals nothing about the key)"""
+    return hmac.new(key, KEY_CHECK_LABEL, hashlib.sha256).digest()[:KEY_CHECK_SIZE]
+
+
+def build(plain_length, cipher=None, tag=b"", codec=None):
+    """
+    Header of a payload of plain_length bytes
+
+    cipher is the AESCipher the payload is encrypted with (None: plain);
+    its KDF parameters and key-check value are recorded. codec is the
+    compression applied before encryption; uncompressed payloads keep
+    version 1, which readers without compression support still open.
+    """
+    if cipher is None:
+        flags, kdf, iterations, salt, check = 0, None, 0, b"", bytes(KEY_CHECK_SIZE)
+    else:
+        flags, kdf, iterations, salt, check = (FLAG_ENCRYPTED, cipher.kdf, cipher.iterations if cipher.kdf == 'pbkdf2' else 0,
+                                               cipher.salt, key_check(cipher.key))
+    version = VERSION if codec else 1
+    return FIXED_FORMAT.pack(MAGIC, version, flags, KDF_IDS[kdf], len(salt), iterations, plain_length,
+                             check, len(tag), compression.CODEC_IDS[codec]) + salt + tag
+
+
+def parse(data):
+    """
+    Parse the header at the start of data
+
+    Returns None when data does not start with a header (payloads written
+    before headers existed); raises ValueError on a truncated header or an
+    unsupported version.
+    """
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        return None
+    if len(data) < FIXED_SIZE:
+        raise ValueError("Truncated payload header")
+    (_, version, flags, kdf, salt_length, iterations, plain_length, check, tag_length,
+     codec) = FIXED_FORMAT.unpack_from(data)
+    if version > VERSION:
+        raise ValueError(f"Unsupported payload format version {version}")
+    if kdf not in KDF_NAMES:
+        raise ValueError(f"Unknown payload KDF id {kdf}")
+    if codec not in compression.CODEC_NAMES:
+        raise ValueError(f"Unknown payload compression id {codec}")
+    size = FIXED_SIZE + salt_length + tag_length
+    if len(data) < size:
+        raise ValueError("Truncated payload header")
+    salt = bytes(data[FIXED_SIZE:FIXED_SIZE + salt_length])
+    tag = bytes(data[FIXED_SIZE + salt_length:size])
+    return PayloadHeader(version, flags, KDF_NAMES[kdf], iterations, salt, plain_length, check, tag,
+                         compression.CODEC_NAMES[codec], size)
+
+
+def read(chunks):
+    """
+    Split decoded payload chunks into (PayloadHeader or None, remaining chunks)
+
+    Only the chunks covering the header are consumed, the rest of the
+    payload is left untouched in the returned iterator.
+    """
+    chunks = iter(chunks)
+    head = b""
+    needed = FIXED_SIZE
+    header = None
+    while True:
+        if len(head) >= len(MAGIC) and bytes(head[:len(MAGIC)]) != MAGIC:
+            break
+        if len(head) >= needed:
+            if needed == FIXED_SIZE:
+                salt_length, tag_length = head[7], head[FIXED_SIZE - 4]
+                needed = FIXED_SIZE + salt_length + tag_length
+                if len(head) < needed:
+                    continue
+            header = parse(head)
+            head = head[header.size:]
+            break
+        chunk = next(chunks, None)
+        if chunk is None:
+            if head[:len(MAGIC)] == MAGIC:
+                raise ValueError("Truncated payload header")
+            break
+        head += bytes(chunk)
+    return header, itertools.chain([head] if head else [], chunks)
+
+
+def checked_length(chunks, expected):
+    """
+    Pass chunks through, raising ValueError if their total differs from the header's plaintext length
+
+    The running total is checked on every chunk, so a payload that
+    expands past its declared length is stopped right away.
+    """
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+        if total > expected:
+            raise ValueError(f"Payload exceeds the {expected} bytes declared in its header")
+        yield chunk
+    if total != expected:
+        raise ValueError(f"Payload is {total} bytes, header declares {expected}")
@@ -1,23 +1,55 @@
 from parser import create_arguments_extract
 from logger.logger import OutputManager
-from extractor.extractor import PDFHiddenMessageExtractor
 
 if __name__ == "__main__":
-    logger = OutputManager()
-    logger.print_banner()
-
+    # Arguments first: --help and usage errors never load the heavy modules
     parser = create_arguments_extract()
     args = parser.parse_args()
+    byte_range = getattr(args, 'range', None)
+    if byte_range is not None and not (getattr(args, 'output', None) or getattr(args, 'o', None)):
+        parser.error("--range requires --o")
+    verbose = getattr(args, 'verbose', False) or getattr(args, 'v', False)
+    quiet = getattr(args, 'quiet', False) and not verbose
 
+    logger = OutputManager()
+    if not quiet:
+        logger.print_banner()
+    if verbose:
+        logger.set_level('debug')
+    if getattr(args, 'log_json', None):
+        logger.open_json_sink(args.log_json, logger.level)
+    # With --quiet the library only reports warnings and errors, results are still printed
+    library_logger = OutputManager(level='warning') if quiet else logger
+
+    from extractor.extractor import PDFHiddenMessageExtractor
+    from logger.profiler import StageProfiler
 
     input_file = getattr(args, 'input', None) or getattr(args, 'i', None)
     mode = getattr(args, 'mode', None) or getattr(args, 'm', None)
     encryption_key = getattr(args, 'encryption', None) or getattr(args, 'e', None)
     has_encryption = bool(encryption_key)
 
-    ext = PDFHiddenMessageExtractor()
-    if mode in ['t', 'text']:
-        ext.extract_all_hidden_objects(input_file, has_encryption, encryption_key)
-    if mode in ['f', 'file']:
-        ext.extract_all_hidden_objects_file(input_file, has_encryption, encryption_key)
-
+    profiler = StageProfiler(trace_memory=True, logger=logger) if getattr(args, 'profile', False) else None
+    ext = PDFHiddenMessageExtractor(logger=library_logger, profiler=profiler, workers=getattr(args, 'workers', None))
+    if byte_range is not None:
+        output_file = getattr(args, 'output', None) or getattr(args, 'o', None)
+        try:
+            # Only the chunks covering the range are decoded
+            data = ext.read_range(input_file, byte_range[0], byte_range[1], getattr(args, 'name', None), encryption_key)
+        except ValueError as e:
+            logger.print_error(f"Range read failed: {e}")
+        else:
+            with open(output_file, 'wb') as f:
+                f.write(data)
+            logger.print_success(f"{len(data)} bytes written to {output_file}")
+    elif mode in ['t', 'text']:
+        result = ext.extract_all_hidden_objects(input_file, has_encryption, encryption_key)
+        # The library never logs payloads: showing the message is the command's job
+        for hidden in (result.hidden_objects if result else []):
+            logger.log(f"🔓 MESSAGE (object {hidden.number}): {hidden.content}")
+    elif mode in ['f', 'file']:
+        result = ext.extract_all_hidden_objects_file(input_file, has_encryption, encryption_key)
+        for hidden in (result.hidden_objects if result else []):
+            logger.print_success(f"Object {hidden.number}: {hidden.path} ({hidden.size} bytes)")
+    if profiler:
+        profiler.close()
@@ -0,0 +1,156 @@
+import functools
+import json
+import multiprocessing
+import os
+import sys
+from extractor.extractor import PDFHiddenMessageExtractor
+from extractor.prefilter import PDFOrphanPrefilter
+from logger.logger import OutputManager
+
+
+class PDFCorpusScanner:
+    """
+    Parallel orphan-object scanner for directories of PDFs
+
+    Files are fanned out to a process pool and one JSON line is written per
+    file as soon as its scan completes. With resume enabled, files already
+    present in the output (same path, size and mtime) are skipped, so an
+    interrupted scan can be restarted where it stopped.
+    """
+
+    EXTENSIONS = ('.pdf',)
+    # Files handed to a worker at a time: amortizes IPC on small files
+    CHUNK_SIZE = 8
+
+    def __init__(self, workers=None, recursive=True, resume=False, prefilter=True, logger=None):
+        """
+        Initialize PDFCorpusScanner
+
+        Args:
+            workers (int): Worker processes (default: one per CPU)
+            recursive (bool): Descend into subdirectories
+            resume (bool): Append to the output and skip files already scanned
+            prefilter (bool): Run the full scan only on files the pre-filter keeps
+            logger (OutputManager): Per-file events (default: warnings and errors only)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.recursive = recursive
+        self.resume = resume
+        self.prefilter = prefilter
+        self.logger = logger or OutputManager(level='warning')
+
+    def iter_files(self, paths):
+        """Yield the PDF files named by paths (files or directories), in sorted order"""
+        for path in paths:
+            if os.path.isfile(path):
+                yield path
+                continue
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                if not self.recursive:
+                    dirs.clear()
+                for name in sorted(files):
+                    if name.lower().endswith(self.EXTENSIONS):
+                        yield os.path.join(root, name)
+
+    @staticmethod
+    def file_identity(path):
+        """(size, mtime_ns) of a file, used to detect files changed since their scan"""
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    @staticmethod
+    def load_scanned(output_file):
+        """Return {path: (size, mtime_ns)} of the records already in output_file"""
+        scanned = {}
+        if not output_file or not os.path.exists(output_file):
+            return scanned
+        with open(output_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    scanned[record['path']] = (record['size'], record['mtime_ns'])
+                except (ValueError, KeyError, TypeError):
+                    continue  # truncated last line of an interrupted run
+        return scanned
+
+    @staticmethod
+    def scan_file(path, prefilter=True):
+        """Scan one PDF for orphan objects and return its JSON-serializable record"""
+        record = {'path': path}
+        try:
+            record['size'], record['mtime_ns'] = PDFCorpusScanner.file_identity(path)
+            if prefilter:
+                result = PDFOrphanPrefilter().check(path)
+                if not result.candidate:
+                    record.update({'status': 'prefiltered', 'objects': result.headers,
+                                   'referenced': None, 'orphans': []})
+                    return record
+            # Workers stay silent: stdout may carry the JSON lines
+            extractor = PDFHiddenMessageExtractor(logger=OutputManager(level='quiet'))
+            try:
+                extractor.read_pdf(path)
+                has_xref = extractor.parse_xref_table()
+                extractor.find_orphan_objects()
+            finally:
+                extractor.close()
+            record.update({
+                'status': 'ok' if has_xref else 'no-xref',
+                'objects': len(extractor.all_objects),
+                'referenced': len(extractor.referenced_objects),
+                'orphans': sorted(extractor.orphan_objects),
+            })
+        except Exception as e:
+            record.update({'status': 'error', 'error': f"{type(e).__name__}: {e}"})
+        return record
+
+    def scan(self, paths, output_file=None):
+        """
+        Scan every PDF under paths, writing one JSON line per file
+
+        Args:
+            paths (list): Files and/or directories to scan
+            output_file (str): JSON lines output (default: stdout)
+
+        Returns:
+            dict: Counters (scanned, skipped, prefiltered, with_orphans, errors)
+        """
+        scanned = self.load_scanned(output_file) if self.resume else {}
+        stats = {'scanned': 0, 'skipped': 0, 'prefiltered': 0, 'with_orphans': 0, 'errors': 0}
+
+        def pending():
+            for path in self.iter_files(paths):
+                if path in scanned:
+                    try:
+                        if self.file_identity(path) == scanned[path]:
+                            stats['skipped'] += 1
+                            continue
+                    except OSError:
+                        pass
+                yield path
+
+        if output_file:
+            out = open(output_file, 'a' if self.resume else 'w', encoding='utf-8')
+        else:
+            out = sys.stdout
+        try:
+            with multiprocessing.Pool(self.workers) as pool:
+                # imap_unordered keeps memory flat and streams results as they finish
+                scan_file = functools.partial(self.scan_file, prefilter=self.prefilter)
+                for record in pool.imap_unordered(scan_file, pending(), self.CHUNK_SIZE):
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+                    stats['scanned'] += 1
+                    if record.get('orphans'):
+                        stats['with_orphans'] += 1
+                    if record['status'] == 'prefiltered':
+                        stats['prefiltered'] += 1
+                    if record['status'] == 'error':
+                        stats['errors'] += 1
+                        self.logger.warning("⚠️  %s: %s", record['path'], record['error'], **record)
+                    else:
+                        self.logger.debug("📄 %s: %s", record['path'], record['status'], **record)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        return stats
@@ -1,11 +1,46 @@
+import hmac
 import re
-from cryptography.AES import AESCipher
-import base64
+from cryptography.AES import AESCipher, PBKDF2_ITERATIONS
+from cryptography import base64_stream, chunked_payload, compression, payload_header
+from extractor.xref_reader import PDFXrefReader
+from extractor.object_locator import PDFObjectLocator
+from extractor.prefilter import PDFOrphanPrefilter
+import mmap
 import os
+import time
+import zlib
+from collections import deque, namedtuple
+from logger.logger import OutputManager
+from logger.profiler import StageProfiler
+
+# One recovered payload. encoding is how it was stored ('base64', 'hex',
+# 'stream' or 'chunked'), offset the position of the object header (None inside object
+# streams), size the decoded payload size. content is the message (str) or
+# the file bytes (None above RETURN_BYTES_LIMIT); path is set for files.
+PDFHiddenObject = namedtuple('PDFHiddenObject', ['number', 'name', 'encoding', 'offset', 'size', 'content', 'path'])
+
+# Outcome of a whole-document scan, elapsed is in seconds and stages the
+# per-stage StageStats (empty unless a profiler is enabled)
+PDFExtractionResult = namedtuple('PDFExtractionResult', ['pdf_path', 'total_objects', 'referenced_objects',
+                                                         'orphan_objects', 'hidden_objects', 'elapsed', 'stages'])
 
 class PDFHiddenMessageExtractor:
-    def __init__(self):
-        self.content_str = ""
+    # Characters of an object body shown at debug level (payloads are never logged whole)
+    PREVIEW_LENGTH = 200
+    # Streamed extractions larger than this are only written to disk,
+    # 'byte_content' is None in the returned result
+    RETURN_BYTES_LIMIT = 16 * 1024 * 1024
+
+    def __init__(self, use_mmap=True, prefilter=False, logger=None, profiler=None, output_dir="extracted_files",
+                 workers=None):
+        self.use_mmap = use_mmap
+        self.output_dir = output_dir
+        # Threads decoding the chunks of a chunked payload (default: one per CPU)
+        self.workers = workers or os.cpu_count() or 1
+        self.logger = logger or OutputManager(level='warning')
+        self.profiler = profiler or StageProfiler(enabled=False)
+        self.prefilter = PDFOrphanPrefilter() if prefilter else None
+        self.content = b""
         self.start_obj = 0
         self.num_objects = 0
         self.max_obj_in_xref = 0
@@ -13,31 +48,189 @@ class PDFHiddenMessageExtractor:
         self.all_objects = set()
         self.referenced_objects = set()
         self.orphan_objects = set()
+        self.xref_reader = None
+        self.compressed_objects = {}
+        self.locator = None
+        self.ciphers = {}
         
     def read_pdf(self, pdf_path):
-        """Read PDF file and convert to string"""
+        """Map PDF file into memory as bytes (no decoded copy)"""
+        self.close()
         with open(pdf_path, 'rb') as f:
-            content = f.read()
+            if self.use_mmap and os.fstat(f.fileno()).st_size > 0:
+                self.content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.content = f.read()
+        self.profiler.add_bytes(read=len(self.content))
         
-        # Convert to string for parsing
-        self.content_str = content.decode('latin-1')
-        print(f"PDF file loaded: {pdf_path}")
+        self.logger.info("PDF file loaded: %s", pdf_path)
+    
+    def get_cipher(self, encryption_key, salt=b"", kdf="sha256", iterations=PBKDF2_ITERATIONS):
+        """Return the AESCipher for a key and KDF parameters, built once and reused for every object"""
+        params = (encryption_key, salt, kdf, iterations)
+        if params not in self.ciphers:
+            self.ciphers[params] = AESCipher(encryption_key, salt, kdf, iterations)
+        return self.ciphers[params]
+    
+    def open_payload(self, chunks, encryption_key=None, encrypted=None, inflate=False):
+        """
+        Check the payload header of decoded chunks and return the plaintext chunks
+        
+        The key is verified against the header's key-check value before
+        anything is decrypted, so a wrong key or a foreign object is
+        rejected after a few dozen bytes; compressed payloads are
+        decompressed after decryption. Payloads written without header
+        are decrypted when encrypted is True (None: whenever a key is
+        given). Raises ValueError when the payload cannot be opened.
+        """
+        header, chunks = payload_header.read(chunks)
+        if header is not None:
+            aes = self.header_cipher(header, encryption_key)
+        elif encrypted or (encrypted is None and encryption_key):
+            if not encryption_key:
+                raise ValueError("payload is encrypted, a key is required")
+            aes = self.get_cipher(encryption_key)
+        else:
+            aes = None
+        
+        if aes is not None:
+            chunks = aes.decrypt_stream_raw(chunks)
+        if header is not None and header.compression:
+            chunks = compression.decompress_chunks(chunks, header.compression)
+        if inflate:
+            chunks = self.inflate_chunks(chunks)
+        if header is not None:
+            chunks = payload_header.checked_length(chunks, header.plain_length)
+        return chunks
+    
+    def header_cipher(self, header, encryption_key=None):
+        """Cipher of a payload header (None if the payload is plain), the key verified against its key check"""
+        if not header.flags & payload_header.FLAG_ENCRYPTED:
+            return None
+        if not encryption_key:
+            raise ValueError("payload is encrypted, a key is required")
+        aes = self.get_cipher(encryption_key, header.salt, header.kdf, header.iterations)
+        if not hmac.compare_digest(payload_header.key_check(aes.key), header.key_check):
+            raise ValueError("wrong key (key check failed)")
+        return aes
+    
+    def chunk_locations(self, manifest_num, manifest, indices):
+        """Locate the chunk objects of a manifest (ValueError if one is missing)"""
+        locations = []
+        for index in indices:
+            location = self.locate_object(manifest_num + 1 + index)
+            if not location or not chunked_payload.CHUNK_PATTERN.match(location.source, location.dict_start,
+                                                                       location.dict_end):
+                raise ValueError(f"chunk {index} (object {manifest_num + 1 + index}) is missing")
+            locations.append((index, location))
+        return locations
+    
+    @staticmethod
+    def chunk_data(location):
+        """Stored bytes of a chunk object (stream data, or its decoded base64 value)"""
+        if location.stream_start is not None:
+            return bytes(location.source[location.stream_start:location.stream_end])
+        value = memoryview(location.source)[location.dict_start:location.dict_end]
+        value = bytes(value).strip()[len(chunked_payload.CHUNK_KEY) + 1:]
+        return b"".join(base64_stream.decode_chunks([value]))
+    
+    def decode_chunk(self, manifest, aes, index, location):
+        """Decrypt (verifying the GCM tag) and decompress one chunk"""
+        data = self.chunk_data(location)
+        if aes is not None:
+            data = aes.decrypt_chunk(data, chunked_payload.chunk_nonce(manifest.nonce, index),
+                                     chunked_payload.chunk_aad(index, manifest.count))
+        expected = chunked_payload.chunk_length(index, manifest.header.plain_length, manifest.chunk_size)
+        if manifest.header.compression:
+            parts, size = [], 0
+            for part in compression.decompress_chunks([data], manifest.header.compression):
+                size += len(part)
+                if size > expected:
+                    raise ValueError(f"chunk {index} decodes to more than {expected} bytes")
+                parts.append(part)
+            data = b"".join(parts)
+        if len(data) != expected:
+            raise ValueError(f"chunk {index} decodes to {len(data)} bytes, expected {expected}")
+        return data
+    
+    def decode_chunks(self, manifest, aes, locations):
+        """
+        Decode chunks on the worker threads and yield them in order
+        
+        At most twice as many chunks as workers are in flight, so memory
+        stays bounded whatever the payload size.
+        """
+        # Imported here: only chunked payloads need it, not every command start
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(self.workers) as pool:
+            window = deque()
+            for index, location in locations:
+                window.append(pool.submit(self.decode_chunk, manifest, aes, index, location))
+                if len(window) >= 2 * self.workers:
+                    yield window.popleft().result()
+            while window:
+                yield window.popleft().result()
+    
+    def decode_text_value(self, value, encryption_key=None):
+        """Decode (and decrypt) a base64 /Asd value to the hidden message"""
+        chunks = base64_stream.split_buffer(value.encode('ascii'), head=payload_header.PEEK_LENGTH)
+        return b"".join(self.open_payload(base64_stream.decode_chunks(chunks), encryption_key)).decode('utf-8')
+    
+    def may_contain_orphans(self, pdf_path):
+        """Run the cheap pre-filter (when enabled); False means the file cannot hold orphans"""
+        if self.prefilter is None:
+            return True
+        result = self.prefilter.check(pdf_path)
+        if not result.candidate:
+            self.logger.info("⏭️  Skipped by pre-filter: %s (%s objects, /Size %s)", result.reason, result.headers, result.size)
+        return result.candidate
+    
+    def close(self):
+        """Release the memory map of the current PDF, if any"""
+        if isinstance(self.content, mmap.mmap):
+            try:
+                self.content.close()
+            except BufferError:
+                pass  # a view is still alive: the map is released with it
+        self.content = b""
+        self.locator = None
+    
+    def get_locator(self):
+        """Return the object locator of the current PDF, built once on first use"""
+        if self.locator is None:
+            self.locator = PDFObjectLocator(self.content, self.xref_reader, self.compressed_objects)
+        return self.locator
     
     def parse_xref_table(self):
-        """Parse xref table and extract object information"""
-        xref_pattern = r'xref\s*\n(\d+)\s+(\d+)\s*\n(.*?)\ntrailer'
-        xref_match = re.search(xref_pattern, self.content_str, re.DOTALL)
+        """Parse xref sections (tables and streams) and extract object information"""
+        self.xref_reader = PDFXrefReader(self.content, self.logger)
+        self.compressed_objects = {}
+        self.locator = None
+        if self.xref_reader.read():
+            self.start_obj = 0
+            self.num_objects = self.xref_reader.size
+            
+            kinds = ", ".join(f"{kind} @ {offset}" for kind, offset in self.xref_reader.sections)
+            self.logger.info("📊 Xref sections found: %s", kinds)
+            self.logger.info("   - Declared size: %s", self.num_objects)
+            self.logger.info("   - Objects in use: %s", len(self.xref_reader.referenced_objects()))
+            return True
+        
+        # Fall back to the first classic table anywhere in the file
+        self.xref_reader = None
+        xref_pattern = rb'xref\s*\n(\d+)\s+(\d+)\s*\n(.*?)\ntrailer'
+        xref_match = re.search(xref_pattern, self.content, re.DOTALL)
         
         if not xref_match:
-            print("❌ Error: xref table not found")
+            self.logger.error("❌ Error: xref table not found")
             return False
         
         self.start_obj = int(xref_match.group(1))  # First object (usually 0)
         self.num_objects = int(xref_match.group(2))  # Number of objects in xref
         
-        print(f"📊 Xref table found:")
-        print(f"   - First object: {self.start_obj}")
-        print(f"   - Number of objects: {self.num_objects}")
+        self.logger.info("📊 Xref table found:")
+        self.logger.info("   - First object: %s", self.start_obj)
+        self.logger.info("   - Number of objects: %s", self.num_objects)
         
         return True
     
@@ -45,29 +238,101 @@ class PDFHiddenMessageExtractor:
         """Calculate the hidden object number"""
         self.max_obj_in_xref = self.start_obj + self.num_objects - 1
         self.hidden_obj_num = self.max_obj_in_xref + 1
+        if self.xref_reader is not None and self.locate_object(self.hidden_obj_num) is None:
+            # An incremental update written as an xref stream declares its
+            # own number, so /Size ends past the hidden objects: take the
+            # first orphan instead
+            orphans = sorted(self.find_orphan_objects())
+            if orphans:
+                self.hidden_obj_num = orphans[0]
         
-        print(f"🔍 Looking for hidden object number: {self.hidden_obj_num}")
+        self.logger.info("🔍 Looking for hidden object number: %s", self.hidden_obj_num)
         return self.hidden_obj_num
     
     def find_hidden_object(self, obj_num):
         """Find hidden object in content"""
-        hidden_obj_pattern = rf'{obj_num}\s+0\s+obj\s*<<(.*?)>>\s*endobj'
-        hidden_match = re.search(hidden_obj_pattern, self.content_str, re.DOTALL)
+        location = self.locate_object(obj_num)
         
-        if not hidden_match:
-            print(f"❌ Hidden object {obj_num} not found")
+        if not location:
+            self.logger.warning("❌ Hidden object %s not found", obj_num)
             return None
         
-        print(f"✅ Hidden object {obj_num} found!")
-        return hidden_match
+        self.logger.info("✅ Hidden object %s found!", obj_num)
+        return location
     
-    def extract_object_content(self, obj_match):
-        """Extract content from object match"""
-        if not obj_match:
+    def locate_object(self, obj_num):
+        """Locate an object's dictionary (and stream data) without copying it"""
+        return self.get_locator().locate(obj_num)
+    
+    def object_offset(self, obj_num):
+        """Offset of an object's header in the file (None for objects in object streams)"""
+        return self.get_locator().offsets.get(obj_num)
+    
+    def output_path(self, name):
+        """
+        Path of an extracted file in output_dir
+        
+        The name comes from the PDF: only its last component is kept, so a
+        crafted name never writes outside output_dir (ValueError if nothing
+        usable is left).
+        """
+        filename = os.path.basename(name.replace('\\', '/'))
+        if filename in ('', '.', '..'):
+            raise ValueError(f"unsafe embedded file name: {name!r}")
+        return os.path.join(self.output_dir, filename)
+    
+    def preview(self, text):
+        """Truncate an object body to PREVIEW_LENGTH characters for debug output"""
+        if len(text) <= self.PREVIEW_LENGTH:
+            return text
+        return f"{text[:self.PREVIEW_LENGTH]}... ({len(text)} characters)"
+    
+    def object_dictionary(self, location):
+        """Decode the dictionary content of a located object"""
+        return bytes(location.source[location.dict_start:location.dict_end]).strip().decode('latin-1')
+    
+    def stream_payload_chunks(self, location, obj_content, encryption_key=None):
+        """
+        Yield the decoded payload of a stream object chunk by chunk
+        
+        The declared /Length is sliced straight from the mapped file, its
+        header checked, then decrypted (/Encrypted true) and inflated
+        (/Filter /FlateDecode).
+        """
+        chunks = base64_stream.split_buffer(memoryview(location.source)[location.stream_start:location.stream_end],
+                                            AESCipher.STREAM_CHUNK_SIZE, head=payload_header.FIXED_SIZE)
+        return self.open_payload(chunks, encryption_key,
+                                 encrypted=bool(re.search(r'/Encrypted\s+true', obj_content)),
+                                 inflate=bool(re.search(r'/Filter\s*/FlateDecode', obj_content)))
+    
+    @staticmethod
+    def inflate_chunks(chunks):
+        """
+        Inflate a deflated chunk stream incrementally (at most OUTPUT_CHUNK_SIZE
+        bytes per call); raises ValueError on corrupt or truncated data
+        """
+        decompressor = zlib.decompressobj()
+        try:
+            for chunk in chunks:
+                data = decompressor.decompress(chunk, compression.OUTPUT_CHUNK_SIZE)
+                while data:
+                    yield data
+                    data = decompressor.decompress(decompressor.unconsumed_tail, compression.OUTPUT_CHUNK_SIZE)
+            data = decompressor.flush()
+        except zlib.error as e:
+            raise ValueError(f"Corrupt deflate payload: {e}") from e
+        if data:
+            yield data
+        if not decompressor.eof:
+            raise ValueError("Truncated deflate payload")
+    
+    def extract_object_content(self, location):
+        """Extract content from a located object"""
+        if not location:
             return None
             
-        obj_content = obj_match.group(1).strip()
-        print(f"📝 Object content:\n{obj_content}")
+        obj_content = self.object_dictionary(location)
+        self.logger.debug("📝 Object content:\n%s", self.preview(obj_content))
         return obj_content
     
     def extract_asd_field(self, obj_content, encryption=False, encryption_key=None):
@@ -82,27 +347,30 @@ class PDFHiddenMessageExtractor:
         if asd_match:
             # If it's in parentheses (string), use first group, otherwise second
             asd_value = asd_match.group(1) if asd_match.group(1) else asd_match.group(2)
-            if encryption:
-                aes = AESCipher(encryption_key)
-                asd_value = aes.decrypt(asd_value.encode('ascii'))
-            else:
-                asd_value = base64.b64decode(asd_value.encode('ascii')).decode("utf-8")
-            print(f"\n🔓 HIDDEN MESSAGE FOUND:")
-            print(f"   /Asd field: {asd_value}")
+            asd_value = self.decode_text_value(asd_value, encryption_key if encryption else None)
+            self.logger.info("\n🔓 HIDDEN MESSAGE FOUND in /Asd field (%s characters)", len(asd_value))
             return asd_value
         else:
-            print("❌ /Asd field not found in hidden object")
+            self.logger.warning("❌ /Asd field not found in hidden object")
             return None
     
     def find_all_objects(self):
         """Find all objects in the PDF file"""
-        all_obj_pattern = r'(\d+)\s+0\s+obj'
-        self.all_objects = set(int(match.group(1)) for match in re.finditer(all_obj_pattern, self.content_str))
+        # Objects stored inside object streams have no "N 0 obj" header
+        if self.xref_reader is not None:
+            self.compressed_objects = self.xref_reader.compressed_objects()
+            self.locator = None
+        
+        # One sweep of the file, shared with every later object lookup
+        self.all_objects = self.get_locator().object_numbers()
+        self.all_objects.update(self.compressed_objects)
         return self.all_objects
     
     def find_referenced_objects(self):
         """Find objects referenced in xref table"""
-        if self.num_objects > 0:
+        if self.xref_reader is not None:
+            self.referenced_objects = self.xref_reader.referenced_objects()
+        elif self.num_objects > 0:
             self.referenced_objects = set(range(self.start_obj, self.start_obj + self.num_objects))
         else:
             self.referenced_objects = set()
@@ -116,14 +384,26 @@ class PDFHiddenMessageExtractor:
         return self.orphan_objects
     
     def analyze_orphan_object(self, obj_num, encryption=False, encryption_key=None):
-        """Analyze a specific orphan object"""
-        print(f"\n🔍 Analyzing orphan object {obj_num}:")
-        obj_pattern = rf'{obj_num}\s+0\s+obj\s*<<(.*?)>>\s*endobj'
-        obj_match = re.search(obj_pattern, self.content_str, re.DOTALL)
+        """Analyze a specific orphan object; returns a PDFHiddenObject or None"""
+        self.logger.info("\n🔍 Analyzing orphan object %s:", obj_num)
+        location = self.locate_object(obj_num)
         
-        if obj_match:
-            obj_content = obj_match.group(1).strip()
-            print(f"   Content: {obj_content}")
+        if location:
+            # Only the object dictionary is decoded, never the whole file
+            obj_content = self.object_dictionary(location)
+            self.logger.debug("   Content: %s", self.preview(obj_content))
+            
+            if location.stream_start is not None:
+                if not re.match(r'/Asd\s+/Stream\b', obj_content):
+                    return None
+                try:
+                    asd_value = b"".join(self.stream_payload_chunks(location, obj_content, encryption_key)).decode('utf-8')
+                except ValueError as e:
+                    self.logger.warning("   ❌ Cannot read object %s: %s", obj_num, e)
+                    return None
+                self.logger.info("   🔓 Message found (%s characters)", len(asd_value))
+                return PDFHiddenObject(obj_num, 'Asd', 'stream', self.object_offset(obj_num),
+                                       len(asd_value.encode('utf-8')), asd_value, None)
             
             # Look for /Asd field
             asd_pattern = r'/Asd\s+(?:\((.*?)\)|(\S+))'
@@ -131,186 +411,304 @@ class PDFHiddenMessageExtractor:
             
             if asd_match:
                 asd_value = asd_match.group(1) if asd_match.group(1) else asd_match.group(2)
-                if encryption:
-                    aes = AESCipher(encryption_key)
-                    asd_value = aes.decrypt(asd_value.encode('ascii'))
-                else:
-                    asd_value = base64.b64decode(asd_value.encode('ascii')).decode("utf-8")
-                print(f"   🔓 MESSAGE: {asd_value}")
-                return asd_value
+                try:
+                    asd_value = self.decode_text_value(asd_value, encryption_key if encryption else None)
+                except ValueError as e:
+                    self.logger.warning("   ❌ Cannot read object %s: %s", obj_num, e)
+                    return None
+                self.logger.info("   🔓 Message found (%s characters)", len(asd_value))
+                return PDFHiddenObject(obj_num, 'Asd', 'base64', self.object_offset(obj_num),
+                                       len(asd_value.encode('utf-8')), asd_value, None)
         return None
 
     def analyze_orphan_object_file(self, obj_num, encryption=False, encryption_key=None):
-        """Analyze a specific orphan object and extract embedded files"""
-        print(f"\n🔍 Analyzing orphan object {obj_num}:")
-        obj_pattern = rf'{obj_num}\s+0\s+obj\s*<<(.*?)>>\s*endobj'
-        obj_match = re.search(obj_pattern, self.content_str, re.DOTALL)
+        """Analyze a specific orphan object and extract embedded files; returns a PDFHiddenObject or None"""
+        location = self.locate_object(obj_num)
+        if location and chunked_payload.CHUNK_PATTERN.match(location.source, location.dict_start, location.dict_end):
+            # Decoded with its manifest
+            return None
+        self.logger.info("\n🔍 Analyzing orphan object %s:", obj_num)
         
-        if obj_match:
-            obj_content = obj_match.group(1).strip()
-            print(f"   Content: {obj_content}")
+        if location and chunked_payload.MANIFEST_PATTERN.match(location.source, location.dict_start,
+                                                               location.dict_end):
+            return self.extract_chunked_file(obj_num, location, encryption_key if encryption else None)
+        if location:
+            # Work on offsets into the mapped file: the payload is never copied whole
+            source = location.source
+            body_start, body_end = location.dict_start, location.dict_end
+            if self.logger.is_enabled('debug'):
+                preview = bytes(source[body_start:min(body_end, body_start + self.PREVIEW_LENGTH)]).strip().decode('latin-1')
+                if body_end - body_start > self.PREVIEW_LENGTH:
+                    preview += f"... ({body_end - body_start} bytes)"
+                self.logger.debug("   Content: %s", preview)
+            
+            if location.stream_start is not None:
+                # Binary stream payload: /Name /Stream /Length N ...
+                obj_content = self.object_dictionary(location)
+                name_match = re.match(r'/(\S+)\s+/Stream\b', obj_content)
+                if not name_match:
+                    self.logger.warning("   ⚠️  No embedded file pattern found")
+                    return None
+                filename = name_match.group(1)
+                content_type = 'stream'
+                self.logger.info("   📁 Found embedded file: %s", filename)
+                self.logger.info("   📊 Content type: %s", content_type)
+                self.logger.info("   📏 Content length: %s bytes", location.stream_end - location.stream_start)
+            else:
+                name_match = re.compile(rb'\s*/(\S+)\s+(\()?').match(source, body_start, body_end)
+                if not name_match:
+                    self.logger.warning("   ⚠️  No embedded file pattern found")
+                    return None
+                
+                value_start, value_end = name_match.end(), body_end
+                while value_end > value_start and source[value_end - 1:value_end] in (b' ', b'\t', b'\r', b'\n', b')'):
+                    value_end -= 1
+                sample = bytes(source[value_start:min(value_end, value_start + 1024)])
+                if not sample or not re.fullmatch(rb'[A-Za-z0-9+/=\s]+', sample):
+                    self.logger.warning("   ⚠️  No embedded file pattern found")
+                    return None
+                
+                filename = name_match.group(1).decode('latin-1')
+                content_type = 'hex' if re.fullmatch(rb'[0-9a-fA-F\s]+', sample) else 'base64'
+                
+                self.logger.info("   📁 Found embedded file: %s", filename)
+                self.logger.info("   📊 Content type: %s", content_type)
+                self.logger.info("   📏 Content length: %s characters", value_end - value_start)
             
-            file_patterns = [
-                r'/(\S+)\s+([A-Za-z0-9+/=]+)',           # Base64 content
-                r'/(\S+)\s+([0-9a-fA-F]+)',              # Hex content  
-                r'/(\S+)\s+\(([A-Za-z0-9+/=\s]+)\)',     # Base64 in parentheses
-                r'/(\S+)\s+\(([0-9a-fA-F\s]+)\)',        # Hex in parentheses
-            ]
-            file_match = None
-            content_type = None
+            # Check the name, header (and key) before anything is written
+            try:
+                output_path = self.output_path(filename)
+                if content_type == 'stream':
+                    decoded = self.stream_payload_chunks(location, obj_content, encryption_key)
+                else:
+                    chunks = base64_stream.split_buffer(memoryview(source)[value_start:value_end],
+                                                        head=payload_header.PEEK_LENGTH)
+                    decoded = self.open_payload(base64_stream.decode_chunks(chunks),
+                                                encryption_key if encryption else None)
+            except ValueError as e:
+                self.logger.warning("   ❌ Cannot read object %s: %s", obj_num, e)
+                return None
             
-            for i, pattern in enumerate(file_patterns):
-                file_match = re.search(pattern, obj_content)
-                if file_match:
-                    # Determine content type based on pattern index
-                    content_type = 'base64' if i in [0, 2] else 'hex'
-                    break
-
-            if file_match:
-                filename = file_match.group(1)
-                raw_content = file_match.group(2).replace(' ', '').replace('\n', '')
+            try:
+                # Create output directory if it doesn't exist
+                os.makedirs(self.output_dir, exist_ok=True)
                 
-                print(f"   📁 Found embedded file: {filename}")
-                print(f"   📊 Content type: {content_type}")
-                print(f"   📏 Content length: {len(raw_content)} characters")
+                # Decode (and decrypt) chunk by chunk straight into the output file
+                size = 0
+                with open(output_path, 'wb') as f:
+                    for data in decoded:
+                        size += f.write(data)
+                self.profiler.add_bytes(written=size)
                 
-                try:
-                    # Convert base64 to byte
-                    file_bytes = raw_content.encode("ascii")
-                    if encryption and encryption_key:
-                        aes = AESCipher(encryption_key)
-                        file_bytes = aes.decrypt_byte(file_bytes)
-                    else:
-                        file_bytes = base64.b64decode(file_bytes)
-                    
-                    # Create output directory if it doesn't exist
-                    output_dir = "extracted_files"
-                    os.makedirs(output_dir, exist_ok=True)
-                    
-                    # Create full path for the file
-                    output_path = os.path.join(output_dir, filename)
-                    
-                    # Write file content
-                    with open(output_path, 'wb') as f:
-                        f.write(file_bytes)
-                    
-                    print(f"   ✅ File extracted successfully: {output_path}")
-                    print(f"   📏 File size: {len(file_bytes)} bytes")
-                    
-                    return {
-                        'filename': filename,
-                        'path': output_path,
-                        'size': len(file_bytes),
-                        'byte_content': file_bytes
-                    }
-                    
-                except ValueError as e:
-                    print(f"   ❌ Error converting hex content: {e}")
-                    return None
-                except Exception as e:
-                    print(f"   ❌ Error creating file: {e}")
-                    return None
-            else:
-                print("   ⚠️  No embedded file pattern found")
+                file_bytes = None
+                if size <= self.RETURN_BYTES_LIMIT:
+                    with open(output_path, 'rb') as f:
+                        file_bytes = f.read()
+                
+                self.logger.info("   ✅ File extracted successfully: %s", output_path)
+                self.logger.info("   📏 File size: %s bytes", size)
+                
+                return PDFHiddenObject(obj_num, filename, content_type, self.object_offset(obj_num),
+                                       size, file_bytes, output_path)
+                
+            except ValueError as e:
+                self.logger.error("   ❌ Corrupt payload: %s", e)
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                return None
+            except Exception as e:
+                self.logger.error("   ❌ Error creating file: %s", e)
                 return None
         else:
-            print(f"   ❌ Object {obj_num} not found")
+            self.logger.warning("   ❌ Object %s not found", obj_num)
             return None
     
-    def extract_hidden_message(self, pdf_path, encryption=False, encryption_key=None):
-        """Main method to extract hidden message from PDF"""
+    def extract_chunked_file(self, obj_num, location, encryption_key=None):
+        """Decode a chunked payload in parallel into the output directory; returns a PDFHiddenObject or None"""
+        # Manifest, name, key and chunk objects are checked before anything is written
         try:
-            # Step 1: Read PDF
-            self.read_pdf(pdf_path)
-            
-            # Step 2: Parse xref table
-            if not self.parse_xref_table():
-                return None
-            
-            # Step 3: Calculate hidden object number
-            self.calculate_hidden_object_number()
-            
-            # Step 4: Find hidden object
-            hidden_match = self.find_hidden_object(self.hidden_obj_num)
-            if not hidden_match:
-                return None
-            
-            # Step 5: Extract object content
-            obj_content = self.extract_object_content(hidden_match)
-
-            # Step 6: Extract Asd field
-            return self.extract_asd_field(obj_content, encryption, encryption_key)
-            
+            manifest = chunked_payload.parse_manifest(self.object_dictionary(location))
+            output_path = self.output_path(manifest.name)
+            aes = self.header_cipher(manifest.header, encryption_key)
+            locations = self.chunk_locations(obj_num, manifest, range(manifest.count))
+        except ValueError as e:
+            self.logger.warning("   ❌ Cannot read object %s: %s", obj_num, e)
+            return None
+        
+        self.logger.info("   📁 Found embedded file: %s", manifest.name)
+        self.logger.info("   📊 Content type: chunked (%s chunks of %s bytes, %s workers)",
+                         manifest.count, manifest.chunk_size, self.workers)
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            size = 0
+            with open(output_path, 'wb') as f:
+                for data in self.decode_chunks(manifest, aes, locations):
+                    size += f.write(data)
+            self.profiler.add_bytes(written=size)
+        except ValueError as e:
+            self.logger.error("   ❌ Corrupt chunked payload: %s", e)
+            os.remove(output_path)
+            return None
         except Exception as e:
-            print(f"Error during extraction: {str(e)}")
+            self.logger.error("   ❌ Error creating file: %s", e)
             return None
+        
+        file_bytes = None
+        if size <= self.RETURN_BYTES_LIMIT:
+            with open(output_path, 'rb') as f:
+                file_bytes = f.read()
+        self.logger.info("   ✅ File extracted successfully: %s", output_path)
+        self.logger.info("   📏 File size: %s bytes", size)
+        return PDFHiddenObject(obj_num, manifest.name, 'chunked', self.object_offset(obj_num),
+                               size, file_bytes, output_path)
     
-    def extract_all_hidden_objects(self, pdf_path, encryption=False, encryption_key=None):
-        """Extended version that searches for all unreferenced objects in xref"""
+    def read_range(self, pdf_path, start, end, file_name=None, encryption_key=None):
+        """
+        Read bytes [start, end) of a chunked embedded file
+        
+        Only the chunks covering the range are located and decoded, so the
+        first kilobyte of a 2 GB file costs one chunk. file_name None picks
+        the first chunked payload of the document. Returns the bytes (fewer
+        when end is past the end of the file); raises ValueError when no
+        such payload exists, the key is wrong or a chunk is corrupt.
+        """
+        if start < 0 or end < start:
+            raise ValueError(f"Invalid byte range: {start}-{end}")
         try:
-            # Step 1: Read PDF
             self.read_pdf(pdf_path)
-            
-            # Step 2: Parse xref table for reference
             self.parse_xref_table()
-            
-            # Step 3: Find orphan objects
             self.find_orphan_objects()
+            for obj_num in sorted(self.orphan_objects):
+                location = self.locate_object(obj_num)
+                match = location and chunked_payload.MANIFEST_PATTERN.match(location.source, location.dict_start,
+                                                                            location.dict_end)
+                if match and file_name in (None, match.group(1).decode('latin-1')):
+                    break
+            else:
+                raise ValueError(f"No chunked payload{f' {file_name}' if file_name else ''} in {pdf_path}")
             
-            print(f"📊 Complete analysis:")
-            print(f"   - Total objects in file: {len(self.all_objects)}")
-            print(f"   - Objects referenced in xref: {len(self.referenced_objects)}")
-            print(f"   - Orphan objects: {len(self.orphan_objects)}")
+            manifest = chunked_payload.parse_manifest(self.object_dictionary(location))
+            aes = self.header_cipher(manifest.header, encryption_key)
+            end = min(end, manifest.header.plain_length)
+            if start >= end:
+                return b""
+            first, last = start // manifest.chunk_size, (end - 1) // manifest.chunk_size
+            locations = self.chunk_locations(obj_num, manifest, range(first, last + 1))
+            data = b"".join(self.decode_chunks(manifest, aes, locations))
+            offset = start - first * manifest.chunk_size
+            self.logger.info("📖 %s bytes of %s read from %s chunks", end - start, manifest.name, len(locations))
+            return data[offset:offset + end - start]
+        finally:
+            self.close()
+    
+    def extract_hidden_message(self, pdf_path, encryption=False, encryption_key=None):
+        """Main method to extract hidden message from PDF; returns a PDFHiddenObject or None"""
+        self.profiler.reset()
+        try:
+            # Step 1: Read PDF
+            with self.profiler.stage('read'):
+                self.read_pdf(pdf_path)
             
-            messages = []
+            # Step 2: Parse xref table
+            with self.profiler.stage('xref'):
+                if not self.parse_xref_table():
+                    return None
             
-            if self.orphan_objects:
-                print(f"🕵️ Orphan objects found: {sorted(self.orphan_objects)}")
+            with self.profiler.stage('locate'):
+                # Step 3: Calculate hidden object number
+                self.calculate_hidden_object_number()
                 
-                for obj_num in sorted(self.orphan_objects):
-                    message = self.analyze_orphan_object(obj_num, encryption, encryption_key)
-                    if message:
-                        messages.append((obj_num, message))
-            else:
-                print("No orphan objects found")
+                # Step 4: Find hidden object
+                location = self.find_hidden_object(self.hidden_obj_num)
+                if not location:
+                    return None
+                
+                # Step 5: Extract object content
+                obj_content = self.extract_object_content(location)
+            
+            with self.profiler.stage('decode'):
+                if location.stream_start is not None:
+                    # Step 6: Read the stream payload
+                    message = b"".join(self.stream_payload_chunks(location, obj_content, encryption_key)).decode('utf-8')
+                    self.logger.info("\n🔓 HIDDEN MESSAGE FOUND in /Asd stream (%s characters)", len(message))
+                    encoding = 'stream'
+                else:
+                    # Step 6: Extract Asd field
+                    message = self.extract_asd_field(obj_content, encryption, encryption_key)
+                    encoding = 'base64'
+                    if message is None:
+                        return None
             
-            return messages
+            self.profiler.report("Extraction profile")
+            return PDFHiddenObject(self.hidden_obj_num, 'Asd', encoding, self.object_offset(self.hidden_obj_num),
+                                   len(message.encode('utf-8')), message, None)
             
         except Exception as e:
-            print(f"Error during extraction: {str(e)}")
-            return []
+            self.logger.error("Error during extraction: %s", e)
+            return None
+        finally:
+            self.close()
+    
+    def extract_all_hidden_objects(self, pdf_path, encryption=False, encryption_key=None):
+        """Extended version that searches for all unreferenced objects in xref"""
+        return self.extract_orphans(pdf_path, self.analyze_orphan_object, encryption, encryption_key)
 
     def extract_all_hidden_objects_file(self, pdf_path, encryption=False, encryption_key=None):
         """Extended version that searches for all unreferenced objects in xref"""
+        return self.extract_orphans(pdf_path, self.analyze_orphan_object_file, encryption, encryption_key)
+    
+    def extract_orphans(self, pdf_path, analyze, encryption=False, encryption_key=None):
+        """
+        Run analyze on every orphan object of a PDF
+        
+        Returns a PDFExtractionResult (hidden_objects lists what analyze
+        recovered), or None if the document could not be processed.
+        """
+        start_time = time.perf_counter()
+        self.profiler.reset()
+        with self.profiler.stage('prefilter'):
+            candidate = self.may_contain_orphans(pdf_path)
+        if not candidate:
+            return PDFExtractionResult(pdf_path, None, None, [], [], time.perf_counter() - start_time,
+                                       self.profiler.stats())
         try:
             # Step 1: Read PDF
-            self.read_pdf(pdf_path)
+            with self.profiler.stage('read'):
+                self.read_pdf(pdf_path)
             
             # Step 2: Parse xref table for reference
-            self.parse_xref_table()
+            with self.profiler.stage('xref'):
+                self.parse_xref_table()
             
             # Step 3: Find orphan objects
-            self.find_orphan_objects()
+            with self.profiler.stage('orphans'):
+                self.find_orphan_objects()
             
-            print(f"📊 Complete analysis:")
-            print(f"   - Total objects in file: {len(self.all_objects)}")
-            print(f"   - Objects referenced in xref: {len(self.referenced_objects)}")
-            print(f"   - Orphan objects: {len(self.orphan_objects)}")
+            self.logger.info("📊 Complete analysis:")
+            self.logger.info("   - Total objects in file: %s", len(self.all_objects))
+            self.logger.info("   - Objects referenced in xref: %s", len(self.referenced_objects))
+            self.logger.info("   - Orphan objects: %s", len(self.orphan_objects))
             
-            messages = []
+            hidden_objects = []
             
             if self.orphan_objects:
-                print(f"🕵️ Orphan objects found: {sorted(self.orphan_objects)}")
+                self.logger.info("🕵️ Orphan objects found: %s", sorted(self.orphan_objects))
                 
-                for obj_num in sorted(self.orphan_objects):
-                    message = self.analyze_orphan_object_file(obj_num, encryption, encryption_key)
-                    if message:
-                        messages.append((obj_num, message))
+                with self.profiler.stage('decode'):
+                    for obj_num in sorted(self.orphan_objects):
+                        hidden = analyze(obj_num, encryption, encryption_key)
+                        if hidden:
+                            hidden_objects.append(hidden)
             else:
-                print("No orphan objects found")
+                self.logger.info("No orphan objects found")
             
-            return messages
+            self.profiler.report("Extraction profile")
+            return PDFExtractionResult(pdf_path, len(self.all_objects), len(self.referenced_objects),
+                                       sorted(self.orphan_objects), hidden_objects,
+                                       time.perf_counter() - start_time, self.profiler.stats())
             
         except Exception as e:
-            print(f"Error during extraction: {str(e)}")
-            return []
\ No newline at end of file
+            self.logger.error("Error during extraction: %s", e)
+            return None
+        finally:
+            self.close()
@@ -0,0 +1,124 @@
+import bisect
+import re
+from collections import namedtuple
+
+# Where an object lives: source is the buffer holding it (the mapped file,
+# or the decoded body for objects inside object streams), dict_start/dict_end
+# delimit the dictionary content between << and >>, stream_start/stream_end
+# the raw stream data (None when the object is not a stream).
+PDFObjectLocation = namedtuple('PDFObjectLocation', ['source', 'dict_start', 'dict_end', 'stream_start', 'stream_end'])
+
+
+class PDFObjectLocator:
+    """
+    Object number -> offset map of a PDF, built once per document
+
+    Offsets come from the cross-reference sections when they point at the
+    right header, plus a single sweep of the file for objects the xref does
+    not know about (orphans). Each lookup is then a seek to the header and
+    a parse bounded by the next object header.
+    """
+
+    # Object headers ("N 0 obj"): the sweep looks for the literal "0 obj"
+    # and reads the number backwards, a pattern starting with \d+ would be
+    # tried at every digit of the payloads (base64 text is full of them)
+    GENERATION_PATTERN = re.compile(rb'0\s+obj\b')
+    NUMBER_PATTERN = re.compile(rb'(?<!\d)(\d+)\s+\Z')
+    NUMBER_WINDOW = 64
+
+    def __init__(self, content, xref_reader=None, compressed_objects=None):
+        self.content = content
+        self.xref_reader = xref_reader
+        self.compressed_objects = compressed_objects if compressed_objects is not None else {}
+        self.offsets = {}
+        self.header_offsets = []
+        self.build()
+
+    def build(self):
+        """Sweep the file once for object headers, then prefer valid xref offsets"""
+        self.offsets = {}
+        self.header_offsets = []
+        for match in self.GENERATION_PATTERN.finditer(self.content):
+            end = match.start()
+            number = self.NUMBER_PATTERN.search(self.content, max(0, end - self.NUMBER_WINDOW), end)
+            if number:
+                # Later definitions (incremental updates) win
+                self.offsets[int(number.group(1))] = number.start()
+                self.header_offsets.append(number.start())
+
+        if self.xref_reader is not None:
+            header = re.compile(rb'\s*(\d+)\s+0\s+obj\b')
+            for obj_num, entry in self.xref_reader.entries.items():
+                if entry.kind != 'n' or entry.generation != 0:
+                    continue
+                match = header.match(self.content, entry.offset)
+                if match and int(match.group(1)) == obj_num:
+                    self.offsets[obj_num] = match.start(1)
+
+    def object_numbers(self):
+        """Return the numbers of all objects with a top-level header"""
+        return set(self.offsets)
+
+    def next_header(self, offset):
+        """Offset of the first object header after offset (end of content if none)"""
+        i = bisect.bisect_right(self.header_offsets, offset)
+        return self.header_offsets[i] if i < len(self.header_offsets) else len(self.content)
+
+    def compressed_body(self, obj_num):
+        """Body of an object stored in an object stream, or None"""
+        if obj_num in self.compressed_objects:
+            return self.compressed_objects[obj_num]
+        if self.xref_reader is None:
+            return None
+        entry = self.xref_reader.entries.get(obj_num)
+        if entry is None or entry.kind != 'c':
+            return None
+        return self.xref_reader.read_object_stream(entry.offset).get(obj_num)
+
+    def locate(self, obj_num):
+        """Locate an object's dictionary (and stream data) without copying it"""
+        offset = self.offsets.get(obj_num)
+        if offset is not None:
+            source = self.content
+            limit = self.next_header(offset)
+            header = re.compile(rb'\d+\s+0\s+obj\s*<<').match(source, offset, limit)
+        else:
+            source = self.compressed_body(obj_num)
+            if source is None:
+                return None
+            limit = len(source)
+            header = re.compile(rb'\s*<<').match(source)
+        if not header:
+            return None
+        dict_open = header.end() - 2
+
+        dict_close = self.find_dict_end(source, dict_open, limit)
+        if dict_close is None:
+            return None
+
+        stream_start = stream_end = None
+        stream_match = re.compile(rb'\s*stream\r?\n').match(source, dict_close + 2)
+        if stream_match:
+            stream_start = stream_match.end()
+            length_match = re.search(rb'/Length\s+(\d+)(?![\d\s]*R)', bytes(source[dict_open:dict_close]))
+            if length_match:
+                stream_end = stream_start + int(length_match.group(1))
+            else:
+                stream_end = source.find(b'endstream', stream_start)
+                if stream_end < 0:
+                    return None
+                while stream_end > stream_start and source[stream_end - 1:stream_end] in (b'\r', b'\n'):
+                    stream_end -= 1
+
+        return PDFObjectLocation(source, dict_open + 2, dict_close, stream_start, stream_end)
+
+    @staticmethod
+    def find_dict_end(source, dict_open, limit=None):
+        """Return the offset of the '>>' closing the dictionary opened at dict_open"""
+        depth = 0
+        limit = len(source) if limit is None else limit
+        for token in re.compile(rb'<<|>>').finditer(source, dict_open, limit):
+            depth += 1 if token.group(0) == b'<<' else -1
+            if depth == 0:
+                return token.start()
+        return None
@@ -0,0 +1,76 @@
+import os
+import re
+from collections import namedtuple
+
+# Outcome of the pre-filter: candidate is False only when the file cannot
+# hold an orphan object; reason says why it was (or was not) rejected.
+PDFPrefilterResult = namedtuple('PDFPrefilterResult', ['candidate', 'reason', 'size', 'headers', 'free'])
+
+
+class PDFOrphanPrefilter:
+    """
+    Cheap first stage that rejects PDFs with no orphan candidates
+
+    The trailer /Size comes from a bounded read of the file tail, object
+    headers and free xref entries are counted with C-level byte searches
+    over fixed-size blocks. A file whose "obj" headers all fit in the
+    in-use xref slots (headers <= /Size - free entries) cannot contain an
+    object missing from the xref. Anything the counts cannot vouch for
+    (no trailer in the tail, xref or object streams) stays a candidate.
+    """
+
+    TAIL_SIZE = 4096
+    BLOCK_SIZE = 1024 * 1024
+    # "endobj" contains "obj": headers = count(obj) - count(endobj)
+    HEADER_TOKEN = b'obj'
+    END_TOKEN = b'endobj'
+    # Every xref entry is 20 bytes, ending in one of these for a free slot
+    FREE_TOKENS = (b' f \n', b' f \r', b' f\r\n')
+    OBJECT_STREAM_TOKEN = b'/ObjStm'
+
+    def __init__(self, tail_size=TAIL_SIZE, block_size=BLOCK_SIZE):
+        self.tail_size = tail_size
+        self.block_size = block_size
+
+    def read_tail(self, f, file_size):
+        """Read the last tail_size bytes of an open file"""
+        f.seek(max(0, file_size - self.tail_size))
+        return f.read()
+
+    def count_tokens(self, f, tokens):
+        """Count each token in an open file, block by block, including matches across blocks"""
+        counts = dict.fromkeys(tokens, 0)
+        overlap = max(len(token) for token in tokens) - 1
+        carry = b''
+        f.seek(0)
+        for block in iter(lambda: f.read(self.block_size), b''):
+            window = carry + block
+            for token in tokens:
+                # Skip the part of the carry where a whole token was already counted
+                skip = max(0, len(carry) - (len(token) - 1))
+                counts[token] += window.count(token, skip)
+            carry = window[-overlap:]
+        return counts
+
+    def check(self, pdf_path):
+        """Return a PDFPrefilterResult for pdf_path"""
+        with open(pdf_path, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            tail = self.read_tail(f, file_size)
+
+            sizes = re.findall(rb'trailer\s*<<.*?/Size\s+(\d+)', tail, re.DOTALL)
+            if not sizes or re.search(rb'/XRefStm\b', tail):
+                return PDFPrefilterResult(True, 'no classic trailer in tail', None, None, None)
+            size = int(sizes[-1])
+
+            tokens = (self.HEADER_TOKEN, self.END_TOKEN, self.OBJECT_STREAM_TOKEN) + self.FREE_TOKENS
+            counts = self.count_tokens(f, tokens)
+
+        if counts[self.OBJECT_STREAM_TOKEN]:
+            return PDFPrefilterResult(True, 'object streams', size, None, None)
+
+        headers = counts[self.HEADER_TOKEN] - counts[self.END_TOKEN]
+        free = sum(counts[token] for token in self.FREE_TOKENS)
+        if headers > size - free:
+            return PDFPrefilterResult(True, 'more objects than in-use xref slots', size, headers, free)
+        return PDFPrefilterResult(False, 'all objects fit in the xref', size, headers, free)
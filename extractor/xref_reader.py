@@ -0,0 +1,273 @@
+import re
+import zlib
+from collections import namedtuple
+from logger.logger import OutputManager
+
+# One cross-reference entry. kind is 'f' (free), 'n' (in use, offset and
+# generation) or 'c' (compressed: offset is the object stream number and
+# generation is the index of the object inside that stream).
+PDFXrefEntry = namedtuple('PDFXrefEntry', ['kind', 'offset', 'generation'])
+
+
+class PDFXrefReader:
+    """
+    Reader for every cross-reference section of a PDF file
+
+    Starting from startxref it follows the /Prev chain (and /XRefStm of
+    hybrid files) and understands both classic xref tables, with any number
+    of subsections, and /Type /XRef streams (FlateDecode with PNG
+    predictors). Object streams (/Type /ObjStm) are decoded on demand, so
+    compressed PDFs can be scanned without a qpdf QDF expansion.
+    """
+
+    STARTXREF_PATTERN = rb'startxref\s+(\d+)'
+    SUBSECTION_PATTERN = rb'\s*(\d+)\s+(\d+)[ \t]*\r?\n'
+    ENTRY_PATTERN = rb'\s*(\d{10})\s+(\d{5})\s+([fn])'
+    TRAILER_PATTERN = rb'\s*trailer\s*(<<.*?>>)\s*(?:startxref|$)'
+    STREAM_OBJ_PATTERN = rb'\s*(\d+)\s+(\d+)\s+obj\s*(<<.*?>>)\s*stream\r?\n'
+
+    def __init__(self, content, logger=None):
+        self.content = content
+        self.logger = logger or OutputManager(level='warning')
+        self.entries = {}
+        self.trailer = b""
+        self.size = 0
+        self.sections = []
+        self.object_streams = {}
+
+    def read(self):
+        """Read all xref sections reachable from startxref, newest first"""
+        self.entries = {}
+        self.trailer = b""
+        self.size = 0
+        self.sections = []
+        self.object_streams = {}
+
+        tail = max(0, len(self.content) - 1024)
+        startxrefs = re.compile(self.STARTXREF_PATTERN).findall(self.content, tail)
+        if not startxrefs:
+            return False
+
+        pending = [int(startxrefs[-1])]
+        seen = set()
+        while pending:
+            offset = pending.pop(0)
+            if offset in seen or offset >= len(self.content):
+                continue
+            seen.add(offset)
+
+            try:
+                if re.compile(rb'\s*xref').match(self.content, offset):
+                    trailer = self.read_xref_table(offset)
+                else:
+                    trailer = self.read_xref_stream(offset)
+            except (ValueError, zlib.error) as e:
+                self.logger.warning("⚠️  Xref section at %s could not be decoded: %s", offset, e)
+                trailer = None
+            if trailer is None:
+                continue
+
+            if not self.trailer:
+                self.trailer = trailer
+                self.size = self.dict_int(trailer, b'Size') or 0
+
+            # A hybrid file's /XRefStm takes precedence over its /Prev
+            for key in (b'XRefStm', b'Prev'):
+                value = self.dict_int(trailer, key)
+                if value is not None:
+                    pending.append(value)
+
+        return bool(self.sections)
+
+    def add_entry(self, obj_num, entry):
+        """Record an entry unless a newer section already declared the object"""
+        if obj_num not in self.entries:
+            self.entries[obj_num] = entry
+
+    def read_xref_table(self, offset):
+        """Parse a classic xref table (all subsections) and return its trailer dictionary"""
+        pos = re.compile(rb'\s*xref').match(self.content, offset).end()
+        subsection = re.compile(self.SUBSECTION_PATTERN)
+        entry = re.compile(self.ENTRY_PATTERN)
+
+        while True:
+            header = subsection.match(self.content, pos)
+            if not header:
+                break
+            first, count = int(header.group(1)), int(header.group(2))
+            pos = header.end()
+            for obj_num in range(first, first + count):
+                entry_match = entry.match(self.content, pos)
+                if not entry_match:
+                    break
+                pos = entry_match.end()
+                kind = entry_match.group(3).decode('ascii')
+                self.add_entry(obj_num, PDFXrefEntry(kind, int(entry_match.group(1)), int(entry_match.group(2))))
+
+        trailer_match = re.compile(self.TRAILER_PATTERN, re.DOTALL).match(self.content, pos)
+        if not trailer_match:
+            return None
+        self.sections.append(('table', offset))
+        return trailer_match.group(1)
+
+    def read_xref_stream(self, offset):
+        """Parse a /Type /XRef stream and return its dictionary"""
+        stream = self.read_stream_object(offset)
+        if stream is None:
+            return None
+        stream_dict, data = stream
+        if not re.search(rb'/Type\s*/XRef\b', stream_dict):
+            return None
+
+        widths = self.dict_ints(stream_dict, b'W')
+        if len(widths) != 3:
+            return None
+        index = self.dict_ints(stream_dict, b'Index') or [0, self.dict_int(stream_dict, b'Size') or 0]
+
+        row = sum(widths)
+        pos = 0
+        for i in range(0, len(index) - 1, 2):
+            first, count = index[i], index[i + 1]
+            for obj_num in range(first, first + count):
+                if pos + row > len(data):
+                    break
+                fields = []
+                for width in widths:
+                    fields.append(int.from_bytes(data[pos:pos + width], 'big'))
+                    pos += width
+                # A zero-width type field defaults to 1 (in use)
+                kind = fields[0] if widths[0] else 1
+                if kind == 0:
+                    self.add_entry(obj_num, PDFXrefEntry('f', fields[1], fields[2]))
+                elif kind == 1:
+                    self.add_entry(obj_num, PDFXrefEntry('n', fields[1], fields[2]))
+                elif kind == 2:
+                    self.add_entry(obj_num, PDFXrefEntry('c', fields[1], fields[2]))
+
+        self.sections.append(('stream', offset))
+        return stream_dict
+
+    def read_stream_object(self, offset):
+        """Return (dictionary, decoded data) of the stream object at offset, or None"""
+        match = re.compile(self.STREAM_OBJ_PATTERN, re.DOTALL).match(self.content, offset)
+        if not match:
+            return None
+        stream_dict = match.group(3)
+        start = match.end()
+
+        # /Length may be an indirect reference: fall back to the endstream keyword
+        length_match = re.search(rb'/Length\s+(\d+)(\s+\d+\s+R)?', stream_dict)
+        if length_match and not length_match.group(2):
+            end = start + int(length_match.group(1))
+        else:
+            end = self.content.find(b'endstream', start)
+            if end < 0:
+                return None
+            while end > start and self.content[end - 1:end] in (b'\r', b'\n'):
+                end -= 1
+
+        return stream_dict, self.decode_stream(stream_dict, self.content[start:end])
+
+    def decode_stream(self, stream_dict, data):
+        """Apply the stream filters (FlateDecode only) and PNG predictors"""
+        filter_match = re.search(rb'/Filter\s*(\[[^\]]*\]|/\w+)', stream_dict)
+        filters = re.findall(rb'/(\w+)', filter_match.group(1)) if filter_match else []
+        for name in filters:
+            if name not in (b'FlateDecode', b'Fl'):
+                raise ValueError(f"Unsupported stream filter: {name.decode('latin-1')}")
+            data = zlib.decompress(data)
+
+        predictor = self.dict_int(stream_dict, b'Predictor') or 1
+        if predictor >= 10:
+            columns = self.dict_int(stream_dict, b'Columns') or 1
+            data = self.undo_png_predictor(data, columns)
+        elif predictor != 1:
+            raise ValueError(f"Unsupported predictor: {predictor}")
+        return data
+
+    @staticmethod
+    def undo_png_predictor(data, columns):
+        """Reverse PNG row filters (one byte per pixel, as used by xref streams)"""
+        output = bytearray()
+        previous = bytearray(columns)
+        row_size = columns + 1
+        for pos in range(0, len(data) - columns, row_size):
+            filter_type = data[pos]
+            row = bytearray(data[pos + 1:pos + row_size])
+            if filter_type == 2:
+                # "Up" is what xref streams use almost exclusively
+                row = bytearray((value + up) & 0xFF for value, up in zip(row, previous))
+                filter_type = 0
+            for i in range(len(row) if filter_type else 0):
+                left = row[i - 1] if i else 0
+                up = previous[i]
+                if filter_type == 1:
+                    row[i] = (row[i] + left) & 0xFF
+                elif filter_type == 2:
+                    row[i] = (row[i] + up) & 0xFF
+                elif filter_type == 3:
+                    row[i] = (row[i] + ((left + up) >> 1)) & 0xFF
+                elif filter_type == 4:
+                    up_left = previous[i - 1] if i else 0
+                    estimate = left + up - up_left
+                    distances = (abs(estimate - left), abs(estimate - up), abs(estimate - up_left))
+                    if distances[0] <= distances[1] and distances[0] <= distances[2]:
+                        row[i] = (row[i] + left) & 0xFF
+                    elif distances[1] <= distances[2]:
+                        row[i] = (row[i] + up) & 0xFF
+                    else:
+                        row[i] = (row[i] + up_left) & 0xFF
+            output += row
+            previous = row
+        return bytes(output)
+
+    def read_object_stream(self, stream_num):
+        """
+        Decode a /Type /ObjStm object stream
+
+        Returns a dict mapping each contained object number to its body bytes.
+        """
+        if stream_num in self.object_streams:
+            return self.object_streams[stream_num]
+
+        members = {}
+        entry = self.entries.get(stream_num)
+        stream = self.read_stream_object(entry.offset) if entry and entry.kind == 'n' else None
+        if stream is not None:
+            stream_dict, data = stream
+            count = self.dict_int(stream_dict, b'N') or 0
+            first = self.dict_int(stream_dict, b'First') or 0
+            header = [int(value) for value in data[:first].split()]
+            pairs = [(header[i], header[i + 1]) for i in range(0, min(len(header), 2 * count) - 1, 2)]
+            for i, (obj_num, obj_offset) in enumerate(pairs):
+                end = first + pairs[i + 1][1] if i + 1 < len(pairs) else len(data)
+                members[obj_num] = data[first + obj_offset:end].strip()
+
+        self.object_streams[stream_num] = members
+        return members
+
+    def compressed_objects(self):
+        """Return {object number: body} for every object stored in an object stream"""
+        objects = {}
+        for stream_num in sorted(set(entry.offset for entry in self.entries.values() if entry.kind == 'c')):
+            try:
+                objects.update(self.read_object_stream(stream_num))
+            except (ValueError, zlib.error) as e:
+                self.logger.warning("⚠️  Object stream %s could not be decoded: %s", stream_num, e)
+        return objects
+
+    def referenced_objects(self):
+        """Return the numbers of all in-use objects (direct or compressed)"""
+        return set(obj_num for obj_num, entry in self.entries.items() if entry.kind != 'f')
+
+    @staticmethod
+    def dict_int(pdf_dict, key):
+        """Return the integer value of /key in a dictionary, or None"""
+        match = re.search(rb'/' + key + rb'\s+(\d+)(?![\d\s]*R)', pdf_dict)
+        return int(match.group(1)) if match else None
+
+    @staticmethod
+    def dict_ints(pdf_dict, key):
+        """Return the integer array value of /key in a dictionary"""
+        match = re.search(rb'/' + key + rb'\s*\[([\d\s]*)\]', pdf_dict)
+        return [int(value) for value in match.group(1).split()] if match else []
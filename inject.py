@@ -1,39 +1,77 @@
-from injector.injector import PDFHiddenObjectInjector
 from logger.logger import OutputManager
-from converter.converter import PDFTraditionalConverter
 from parser import create_argument_parser, validate_args
-from pathlib import Path
 import argparse
+import contextlib
+import os
 
 if __name__ == "__main__":
-    logger = OutputManager()
-    logger.print_banner()
-
+    # Arguments first: --help and usage errors never load the heavy modules
     parser = create_argument_parser()
     args = parser.parse_args()
+    verbose = getattr(args, 'verbose', False) or getattr(args, 'v', False)
+    quiet = getattr(args, 'quiet', False) and not verbose
+
+    logger = OutputManager()
+    if not quiet:
+        logger.print_banner()
+    if verbose:
+        logger.set_level('debug')
+    if getattr(args, 'log_json', None):
+        logger.open_json_sink(args.log_json, logger.level)
+    # With --quiet the library only reports warnings and errors, results are still printed
+    library_logger = OutputManager(level='warning') if quiet else logger
     
     try:
         args = validate_args(args)
 
+        from converter.converter import PDFTraditionalConverter
+        from injector.injector import PDFHiddenObjectInjector, PDFPayload
+        from logger.profiler import StageProfiler
+
         input_file = getattr(args, 'input', None) or getattr(args, 'i', None)
         output_file = getattr(args, 'output', None) or getattr(args, 'o', None)
         mode = getattr(args, 'mode', None) or getattr(args, 'm', None)
-        message = getattr(args, 'text', None) or getattr(args, 't', None)
-        file_path = getattr(args, 'file', None) or getattr(args, 'f', None)
+        messages = getattr(args, 'text', None) or getattr(args, 't', None) or []
+        file_paths = getattr(args, 'file', None) or getattr(args, 'f', None) or []
         encryption_key = getattr(args, 'encryption', None) or getattr(args, 'e', None)
         has_encryption = bool(encryption_key)
+        incremental = getattr(args, 'incremental', False)
+        compression = getattr(args, 'compress', 'none')
+        chunk_size = getattr(args, 'chunk_size', None)
+        profiler = StageProfiler(trace_memory=True, logger=logger) if getattr(args, 'profile', False) else None
 
         tmp = "temp.pdf"
-        converter = PDFTraditionalConverter()
+        converter = PDFTraditionalConverter(getattr(args, 'converter', 'auto'),
+                                            use_cache=not getattr(args, 'no_cache', False),
+                                            cache_dir=getattr(args, 'cache_dir', None),
+                                            logger=library_logger)
         if converter.convert_pdf(input_file, tmp):
-            inj = PDFHiddenObjectInjector()
+            inj = PDFHiddenObjectInjector(encoding=getattr(args, 'encoding', 'base64'),
+                                          flate=getattr(args, 'flate', False),
+                                          compression=compression if compression != 'none' else None,
+                                          compression_level=getattr(args, 'compress_level', None),
+                                          chunk_size=chunk_size * 1024 if chunk_size else None,
+                                          logger=library_logger,
+                                          profiler=profiler)
 
+            results = []
             if mode in ['t', 'text']:
-                inj.inject_hidden_object(tmp, output_file, message, has_encryption, encryption_key) 
+                results = [inj.inject_hidden_object(tmp, output_file, messages[0], has_encryption, encryption_key, incremental)]
             if mode in ['f', 'file']:
-                with open(file_path, 'rb') as f:
-                    file_bytes = f.read()
-                    inj.inject_hidden_object_file(tmp, output_file, file_bytes, Path(file_path).name, has_encryption, encryption_key) 
+                with open(file_paths[0], 'rb') as f:
+                    # Pass the open file: encrypted payloads are streamed, not loaded
+                    results = [inj.inject_hidden_object_file(tmp, output_file, f, os.path.basename(file_paths[0]), has_encryption, encryption_key, incremental)]
+            if mode in ['b', 'bundle']:
+                with contextlib.ExitStack() as stack:
+                    # All payloads go in with a single read, index and write of the document
+                    payloads = [PDFPayload(message, None) for message in messages]
+                    payloads += [PDFPayload(stack.enter_context(open(path, 'rb')), os.path.basename(path)) for path in file_paths]
+                    results = inj.inject_hidden_objects(tmp, output_file, payloads, has_encryption, encryption_key, incremental)
+            for result in results:
+                logger.print_success(f"Object {result.object_number} at byte {result.offset} "
+                                     f"({result.object_length} bytes, {result.elapsed:.2f}s)")
+            if profiler:
+                profiler.close()
 
     except argparse.ArgumentTypeError as e:
         parser.error(str(e))
@@ -1,10 +1,97 @@
+import io
+import itertools
+import mmap
+import os
 import re
-import base64
-from cryptography.AES import AESCipher
+import sys
+import tempfile
+import time
+import zlib
+from collections import namedtuple
+from cryptography.AES import AESCipher, GCM_TAG_SIZE
+from cryptography import base64_stream, chunked_payload, payload_header
+from cryptography import compression as payload_compression
+from injector.object_index import PDFObjectIndex
+from injector.streamed_object import PDFStreamedObject
+from logger.logger import OutputManager
+from logger.profiler import StageProfiler
+
+# Outcome of an injection: offset is the position of the hidden object's
+# header in the output file, object_length its size in bytes (with the
+# separating newlines), payload_size the size of the payload before
+# encoding, elapsed the wall time in seconds and stages the per-stage
+# StageStats (empty unless a profiler is enabled).
+PDFInjectionResult = namedtuple('PDFInjectionResult', ['output_path', 'object_number', 'offset', 'object_length',
+                                                       'payload_size', 'incremental', 'elapsed', 'stages'])
+
+# One item of a bundle: file_name None embeds content (str) as a text
+# message under /Asd, otherwise content is the file (bytes or binary file).
+PDFPayload = namedtuple('PDFPayload', ['content', 'file_name'])
+
+# A created hidden object waiting to be placed: data is the object (str or
+# PDFStreamedObject) without the separating newlines, length its size with
+# them; payload_size is None for the chunk objects of a chunked payload
+PDFPendingObject = namedtuple('PDFPendingObject', ['number', 'data', 'length', 'payload_size'])
 
 class PDFHiddenObjectInjector:
-    def __init__(self):
-        self.content_str = ""
+    # Unchanged regions at least this large are copied file-to-file by the kernel
+    ZERO_COPY_THRESHOLD = 1024 * 1024
+
+    # Compressed payloads up to this size stay in memory, larger ones spill to a temp file
+    FLATE_SPOOL_SIZE = 16 * 1024 * 1024
+    ENCODINGS = ['base64', 'stream']
+
+    # Document-level keys copied from an xref stream dictionary into the new one
+    XREF_STREAM_KEYS = [
+        rb'/Root\s+\d+\s+\d+\s+R',
+        rb'/Info\s+\d+\s+\d+\s+R',
+        rb'/Encrypt\s+\d+\s+\d+\s+R',
+        rb'/ID\s*\[[^\]]*\]',
+    ]
+
+    def __init__(self, use_mmap=True, encoding='base64', flate=False, compression=None, compression_level=None,
+                 chunk_size=None, logger=None, profiler=None):
+        """
+        Initialize PDFHiddenObjectInjector
+        
+        Args:
+            use_mmap (bool): Memory-map the input PDF instead of reading it
+            encoding (str): 'base64' (token in a dictionary) or 'stream'
+                (binary stream object with /Length)
+            flate (bool): Deflate the payload (stream encoding only)
+            compression (str): Compress the payload before encryption: 'zlib',
+                'lzma' or 'auto' (zlib, skipped for incompressible data)
+            compression_level (int): Compression level 0-9 (default: 6)
+            chunk_size (int): Store file payloads as a manifest plus chunk
+                objects of this many bytes, each encrypted on its own
+                (default: one object per payload)
+            logger (OutputManager): Progress output (default: warnings and errors only)
+            profiler (StageProfiler): Per-stage timing/memory/I-O instrumentation (default: off)
+        """
+        if encoding not in self.ENCODINGS:
+            raise ValueError(f"Unknown payload encoding: {encoding}")
+        if compression is not None:
+            if compression not in payload_compression.CODECS + ['auto']:
+                raise ValueError(f"Unknown compression codec: {compression}")
+            if flate:
+                raise ValueError("flate and compression cannot be combined")
+            payload_compression.check_level(compression, compression_level)
+        if chunk_size is not None:
+            if chunk_size <= 0:
+                raise ValueError(f"Invalid chunk size: {chunk_size}")
+            if flate:
+                raise ValueError("flate and chunk_size cannot be combined")
+        self.use_mmap = use_mmap
+        self.encoding = encoding
+        self.flate = flate
+        self.compression = compression
+        self.compression_level = compression_level
+        self.chunk_size = chunk_size
+        self.logger = logger or OutputManager(level='warning')
+        self.profiler = profiler or StageProfiler(enabled=False)
+        self.spools = []
+        self.content = b""
+        self.source_path = None
         self.objects = []
         self.max_obj_num = 0
         self.total_objects = 0
@@ -12,222 +99,674 @@ class PDFHiddenObjectInjector:
         self.new_obj_num = 0
         self.hidden_object = ""
         self.obj_length = 0
+        self.payload_size = 0
+        self.index = None
+        self.insert_pos = 0
+        self.shift = 0
+        self.pending = []
+        self.chunk_objects = []
+        self.placements = []
+        self.patches = []
+        self.incremental = False
+        self.trailer_dict = b""
+        self.trailer_size = 0
+        self.last_startxref = None
+        self.xref_stream_update = False
         
     def read_pdf(self, pdf_path):
-        """Read PDF file and convert to string"""
+        """Map PDF file into memory as bytes (no decoded copy)"""
+        self.close()
         with open(pdf_path, 'rb') as f:
-            content = f.read()
+            if self.use_mmap and os.fstat(f.fileno()).st_size > 0:
+                self.content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.content = f.read()
         
-        # Convert to string for parsing (assuming ASCII/Latin-1)
-        self.content_str = content.decode('latin-1')
-        print(f"PDF file loaded: {pdf_path}")
+        self.source_path = pdf_path
+        self.patches = []
+        self.trailer_size = 0
+        self.profiler.add_bytes(read=len(self.content))
+        self.logger.info("PDF file loaded: %s", pdf_path)
+    
+    def close(self):
+        """Release the memory map of the current PDF and any payload spool"""
+        for spool in self.spools:
+            spool.close()
+        self.spools = []
+        if isinstance(self.content, mmap.mmap):
+            try:
+                self.content.close()
+            except BufferError:
+                pass  # a view is still alive: the map is released with it
+        self.content = b""
+    
+    def build_object_index(self):
+        """Index objects, xref table and startxref in a single pass"""
+        self.index = PDFObjectIndex(self.content)
+        return self.index
     
     def analyze_objects(self):
         """Find and analyze all objects in the PDF"""
-        obj_pattern = r'(\d+)\s+0\s+obj'
-        self.objects = re.findall(obj_pattern, self.content_str)
+        if self.index is None or self.index.content is not self.content:
+            self.build_object_index()
+        self.objects = self.index.object_numbers()
         self.max_obj_num = max([int(obj) for obj in self.objects]) if self.objects else 0
+        # Numbers below the trailer /Size are reserved: in incremental mode the
+        # original body is not indexed, and a normalized copy keeps free
+        # entries for dropped object and xref streams
+        self.max_obj_num = max(self.max_obj_num, self.trailer_size - 1)
         self.total_objects = len(self.objects)
         
-        print(f"Objects found: {self.total_objects}")
-        print(f"Maximum object number: {self.max_obj_num}")
+        self.logger.debug("Objects found: %s", self.total_objects)
+        self.logger.debug("Maximum object number: %s", self.max_obj_num)
         
         # Calculate half objects (floor division)
         self.half_objects = self.total_objects // 2
-        print(f"Half objects (floor): {self.half_objects}")
+        self.logger.debug("Half objects (floor): %s", self.half_objects)
     
     def create_hidden_object(self, payload, encryption, encryption_key):
         """Create the hidden orphan object"""
         self.new_obj_num = self.max_obj_num + 1
-        if encryption:
-            aes = AESCipher(encryption_key)
-            enc = aes.encrypt(payload).decode("ascii")
-            self.hidden_object = f"{self.new_obj_num} 0 obj << /Asd {enc} >> endobj"
-        else:
-            self.hidden_object = f"{self.new_obj_num} 0 obj << /Asd {base64.b64encode(payload.encode('ascii')).decode('ascii')} >> endobj"
+        self.payload_size = len(payload.encode('utf-8'))
+        if self.encoding == 'stream':
+            data = payload.encode('utf-8')
+            self.create_stream_object('Asd', io.BytesIO(data), len(data), encryption, encryption_key)
+            return
+        data = payload.encode('utf-8')
+        chunks, _ = self.payload_chunks(io.BytesIO(data), len(data), encryption, encryption_key, compress=True)
+        value = b"".join(base64_stream.encode_chunks(chunks)).decode('ascii')
+        self.hidden_object = f"{self.new_obj_num} 0 obj << /Asd {value} >> endobj"
         
         # Calculate byte length of object (with newlines)
         obj_with_newlines = "\n" + self.hidden_object + "\n"
         self.obj_length = len(obj_with_newlines.encode('latin-1'))
-        print(f"New object length (with newlines): {self.obj_length} bytes")
+        self.logger.debug("New object length (with newlines): %s bytes", self.obj_length)
 
     def create_hidden_object_file(self, payload, file_name, encryption, encryption_key):
-        """Create the hidden orphan object"""
+        """Create the hidden orphan object (payload: bytes or binary file object)"""
         self.new_obj_num = self.max_obj_num + 1
-        if encryption:
-            aes = AESCipher(encryption_key)
-            enc = aes.encrypt_byte(payload).decode("ascii")
-            self.hidden_object = f"{self.new_obj_num} 0 obj << /{file_name} {enc} >> endobj"
+        if not hasattr(payload, 'read'):
+            payload = io.BytesIO(payload)
+        start = payload.tell()
+        size = payload.seek(0, os.SEEK_END) - start
+        payload.seek(start)
+        self.payload_size = size
+        
+        if self.chunk_size:
+            self.create_chunked_object(file_name, payload, size, encryption, encryption_key)
+            return
+        if self.encoding == 'stream':
+            self.create_stream_object(file_name, payload, size, encryption, encryption_key)
+            return
+        
+        # The payload is encoded (and encrypted) while saving, in fixed-size
+        # blocks, so only its predicted length is needed here
+        chunks, raw_length = self.payload_chunks(payload, size, encryption, encryption_key, compress=True)
+        body, body_length = base64_stream.encode_chunks(chunks), base64_stream.encoded_length(raw_length)
+        self.hidden_object = PDFStreamedObject(f"{self.new_obj_num} 0 obj << /{file_name} ".encode('latin-1'),
+                                               body, b" >> endobj", body_length)
+        
+        # Calculate byte length of object (with newlines)
+        self.obj_length = len(self.hidden_object) + 2
+        self.logger.debug("New object length (with newlines): %s bytes", self.obj_length)
+    
+    def payload_chunks(self, reader, size, encryption, encryption_key, plain_length=None, compress=False):
+        """
+        Return the payload header and the (compressed, encrypted) payload as raw chunks, with their total length
+        
+        plain_length is the size recorded in the header when reader holds a
+        transformed (deflated) copy of size bytes; compress applies the
+        compression stage first.
+        """
+        codec = None
+        if plain_length is None:
+            plain_length = size
+        if compress:
+            reader, size, codec = self.compress_payload(reader, size)
+        aes = AESCipher(encryption_key) if encryption else None
+        header = payload_header.build(plain_length, aes, codec=codec)
+        if aes is not None:
+            body, body_length = aes.encrypt_stream_raw(reader), aes.encrypted_raw_length(size)
         else:
-            self.hidden_object = f"{self.new_obj_num} 0 obj << /{file_name} {base64.b64encode(payload).decode('ascii')} >> endobj"
+            body, body_length = iter(lambda: reader.read(AESCipher.STREAM_CHUNK_SIZE), b''), size
+        return itertools.chain([header], body), len(header) + body_length
+    
+    def spool_compressed(self, reader, compressor):
+        """Compress reader into a spool (the compressed size must be known before writing)"""
+        spool = tempfile.SpooledTemporaryFile(max_size=self.FLATE_SPOOL_SIZE)
+        self.spools.append(spool)
+        for chunk in iter(lambda: reader.read(AESCipher.STREAM_CHUNK_SIZE), b''):
+            spool.write(compressor.compress(chunk))
+        spool.write(compressor.flush())
+        size = spool.tell()
+        spool.seek(0)
+        return spool, size
+    
+    def compress_payload(self, reader, size):
+        """
+        Apply the compression stage to a payload
+        
+        Returns:
+            tuple: (reader, size, codec) of the data to encrypt; codec is None
+            when the payload is stored as is (no compression, or auto mode
+            found it incompressible)
+        """
+        if self.compression is None or size == 0:
+            return reader, size, None
+        start = reader.tell()
+        codec = self.compression
+        if codec == 'auto':
+            sample = reader.read(payload_compression.SAMPLE_SIZE)
+            reader.seek(start)
+            if not payload_compression.is_compressible(sample):
+                self.logger.debug("Payload looks incompressible, stored as is")
+                return reader, size, None
+            codec = 'zlib'
+        
+        spool, compressed_size = self.spool_compressed(
+            reader, payload_compression.compressor(codec, self.compression_level))
+        if self.compression == 'auto' and compressed_size >= size:
+            reader.seek(start)
+            self.logger.debug("Compression does not shrink the payload, stored as is")
+            return reader, size, None
+        self.logger.info("🗜️  Payload compressed with %s: %s -> %s bytes", codec, size, compressed_size)
+        return spool, compressed_size, codec
+    
+    def create_stream_object(self, name, reader, size, encryption, encryption_key):
+        """
+        Create the hidden orphan object as a binary stream object
+        
+        The dictionary keeps the payload name as first key (value /Stream)
+        and declares /Length, so the extractor slices the data directly.
+        Data is deflated first (/Filter /FlateDecode) and then encrypted
+        (/Encrypted true): decode in reverse order.
+        """
+        entries = ""
+        plain_length = size
+        if self.flate:
+            reader, size = self.spool_compressed(reader, zlib.compressobj(9))
+            entries += " /Filter /FlateDecode"
+        
+        if encryption:
+            entries += " /Encrypted true"
+        body, body_length = self.payload_chunks(reader, size, encryption, encryption_key, plain_length,
+                                                compress=not self.flate)
+        
+        header = f"{self.new_obj_num} 0 obj\n<< /{name} /Stream /Length {body_length}{entries} >>\nstream\n"
+        self.hidden_object = PDFStreamedObject(header.encode('latin-1'), body, b"\nendstream\nendobj", body_length)
         
         # Calculate byte length of object (with newlines)
-        obj_with_newlines = "\n" + self.hidden_object + "\n"
-        self.obj_length = len(obj_with_newlines.encode('latin-1'))
-        print(f"New object length (with newlines): {self.obj_length} bytes")
+        self.obj_length = len(self.hidden_object) + 2
+        self.logger.debug("New stream object length (with newlines): %s bytes", self.obj_length)
     
-    def find_insertion_position(self):
-        """Find the position to insert the hidden object"""
-        obj_pattern = r'(\d+)\s+0\s+obj'
-        obj_positions = []
+    def create_chunked_object(self, name, reader, size, encryption, encryption_key):
+        """
+        Create a chunked payload: a manifest object and fixed-size chunk objects
+        
+        Every chunk is compressed and encrypted on its own (AES-GCM, nonce
+        from a random prefix and the chunk index), so the extractor decodes
+        chunks in parallel and reads any byte range without the rest. The
+        chunks are numbered after the manifest and read while saving.
+        """
+        start = reader.tell()
+        count = chunked_payload.chunk_count(size, self.chunk_size)
+        codec, spans = self.compress_chunks(reader, start, size, count)
+        aes = AESCipher(encryption_key) if encryption else None
+        nonce = os.urandom(chunked_payload.NONCE_PREFIX_SIZE) if aes is not None else b""
+        
+        self.chunk_objects = []
+        for index, (source, offset, length) in enumerate(spans):
+            number = self.new_obj_num + 1 + index
+            body = self.chunk_body(source, offset, length, aes, nonce, index, count)
+            body_length = length + (GCM_TAG_SIZE if aes is not None else 0)
+            if self.encoding == 'stream':
+                header = f"{number} 0 obj\n<< /{chunked_payload.CHUNK_KEY} /Stream /Length {body_length} >>\nstream\n"
+                chunk = PDFStreamedObject(header.encode('latin-1'), body, b"\nendstream\nendobj", body_length)
+            else:
+                chunk = PDFStreamedObject(f"{number} 0 obj << /{chunked_payload.CHUNK_KEY} ".encode('latin-1'),
+                                          base64_stream.encode_chunks(body), b" >> endobj",
+                                          base64_stream.encoded_length(body_length))
+            self.chunk_objects.append((chunk, len(chunk) + 2))
         
-        for match in re.finditer(obj_pattern, self.content_str):
-            obj_num = int(match.group(1))
-            obj_positions.append((obj_num, match.start()))
+        header = payload_header.build(size, aes, codec=codec)
+        manifest = chunked_payload.build_manifest(name, count, self.chunk_size, nonce, header)
+        self.hidden_object = f"{self.new_obj_num} 0 obj << {manifest} >> endobj"
+        self.obj_length = len(("\n" + self.hidden_object + "\n").encode('latin-1'))
+        self.logger.debug("Chunked payload: %s chunks of %s bytes", count, self.chunk_size)
+    
+    def compress_chunks(self, reader, start, size, count):
+        """
+        Compression stage of a chunked payload, each chunk compressed on its own into a spool
+        
+        Returns:
+            tuple: (codec, spans) with the (reader, offset, length) of every
+            chunk to encrypt; codec is None when the chunks are stored as is
+        """
+        raw = [(reader, start + index * self.chunk_size, chunked_payload.chunk_length(index, size, self.chunk_size))
+               for index in range(count)]
+        codec = self.compression
+        if codec is None or size == 0:
+            return None, raw
+        if codec == 'auto':
+            sample = reader.read(payload_compression.SAMPLE_SIZE)
+            reader.seek(start)
+            if not payload_compression.is_compressible(sample):
+                self.logger.debug("Payload looks incompressible, stored as is")
+                return None, raw
+            codec = 'zlib'
         
-        obj_positions.sort()
+        spool = tempfile.SpooledTemporaryFile(max_size=self.FLATE_SPOOL_SIZE)
+        self.spools.append(spool)
+        spans = []
+        for _, offset, length in raw:
+            reader.seek(offset)
+            compressor = payload_compression.compressor(codec, self.compression_level)
+            data = compressor.compress(reader.read(length)) + compressor.flush()
+            spans.append((spool, spool.tell(), len(data)))
+            spool.write(data)
+        if self.compression == 'auto' and spool.tell() >= size:
+            self.logger.debug("Compression does not shrink the payload, stored as is")
+            return None, raw
+        self.logger.info("🗜️  Payload compressed with %s: %s -> %s bytes", codec, size, spool.tell())
+        return codec, spans
+    
+    @staticmethod
+    def chunk_body(reader, offset, length, aes, nonce, index, count):
+        """Read one chunk while saving and yield it, encrypted when aes is set"""
+        reader.seek(offset)
+        data = reader.read(length)
+        if aes is not None:
+            data = aes.encrypt_chunk(data, chunked_payload.chunk_nonce(nonce, index),
+                                     chunked_payload.chunk_aad(index, count))
+        yield data
+    
+    def add_hidden_object(self):
+        """Queue the object just created and reserve its number, so the next one gets the following number"""
+        self.pending.append(PDFPendingObject(self.new_obj_num, self.hidden_object, self.obj_length, self.payload_size))
+        self.max_obj_num = self.new_obj_num
+        # Chunk objects of a chunked payload follow their manifest
+        for chunk, length in self.chunk_objects:
+            self.max_obj_num += 1
+            self.pending.append(PDFPendingObject(self.max_obj_num, chunk, length, None))
+        self.chunk_objects = []
+    
+    def create_hidden_objects(self, payloads, encryption, encryption_key):
+        """Create and queue one hidden object per PDFPayload, with consecutive numbers"""
+        self.pending = []
+        for payload in payloads:
+            if payload.file_name is None:
+                self.create_hidden_object(payload.content, encryption, encryption_key)
+            else:
+                self.create_hidden_object_file(payload.content, payload.file_name, encryption, encryption_key)
+            self.add_hidden_object()
+    
+    @staticmethod
+    def frame_hidden_object(hidden_object, prefix, suffix):
+        """Return a hidden object as write data (bytes or streamed chunks) between prefix and suffix"""
+        if isinstance(hidden_object, PDFStreamedObject):
+            return hidden_object.framed(prefix, suffix)
+        return prefix + hidden_object.encode('latin-1') + suffix
+    
+    def find_insertion_position(self):
+        """Find the position to insert the hidden object"""
+        obj_positions = sorted((obj.number, obj.start, obj.end)
+                               for obj in self.index.objects if obj.generation == 0)
         
         # Find insertion position (after object at position half_objects-1)
         if self.half_objects > 0 and self.half_objects <= len(obj_positions):
-            target_obj_num = obj_positions[self.half_objects-1][0]
-            # Find end of target object
-            end_pattern = rf'{target_obj_num}\s+0\s+obj.*?endobj'
-            match = re.search(end_pattern, self.content_str, re.DOTALL)
-            if match:
-                insert_pos = match.end()
-            else:
-                insert_pos = len(self.content_str) // 2  # fallback
+            insert_pos = obj_positions[self.half_objects-1][2]
+            if insert_pos is None:
+                insert_pos = len(self.content) // 2  # fallback
         else:
-            insert_pos = len(self.content_str) // 2
+            insert_pos = len(self.content) // 2
         
         return insert_pos
     
-    def insert_hidden_object(self, insert_pos):
-        """Insert the hidden object at the specified position"""
-        self.content_str = (self.content_str[:insert_pos] + "\n" + 
-                           self.hidden_object + "\n" + 
-                           self.content_str[insert_pos:])
-        print(f"Hidden object {self.new_obj_num} inserted at position {insert_pos}")
+    def insert_hidden_objects(self, insert_pos):
+        """Insert the queued hidden objects, back to back, at the specified position"""
+        self.insert_pos = insert_pos
+        self.placements = []
+        cursor = insert_pos
+        for pending in self.pending:
+            # Patches at the same position keep their order when saving
+            self.patches.append((insert_pos, insert_pos, self.frame_hidden_object(pending.data, b"\n", b"\n")))
+            self.placements.append((cursor + 1, pending.length))
+            self.logger.debug("Hidden object %s inserted at position %s", pending.number, cursor)
+            cursor += pending.length
+        # Everything after the insertion point moves by the size of the whole block
+        self.shift = cursor - insert_pos
     
     def update_xref_table(self):
         """Update the xref table with new offsets"""
-        xref_pattern = r'xref\s*\n(.*?)\ntrailer'
-        xref_match = re.search(xref_pattern, self.content_str, re.DOTALL)
+        xref = self.index.main_xref()
         
-        if xref_match:
-            xref_content = xref_match.group(1)
-            lines = xref_content.strip().split('\n')
-            
-            # First line should be "0 N" where N is the number of objects
-            header_line = lines[0].strip()
-            updated_lines = [header_line]
-            
-            # Process each xref entry
-            for i, line in enumerate(lines[1:], 1):
-                if re.match(r'\d{10}\s+\d{5}\s+[fn]', line.strip()):
-                    # It's a valid xref entry
-                    parts = line.strip().split()
-                    offset = int(parts[0])
-                    
-                    # If this object comes after the insertion point
-                    if i >= self.half_objects:  # Objects from half onwards
-                        new_offset = offset + self.obj_length
-                        updated_line = f"{new_offset:010d} {parts[1]} {parts[2]}"
-                    else:
-                        updated_line = line.strip()
-                    
-                    updated_lines.append(updated_line)
-                else:
-                    updated_lines.append(line.strip())
-            
-            # Rebuild xref
-            new_xref_content = '\n'.join(updated_lines)
-            self.content_str = re.sub(xref_pattern, f'xref\n{new_xref_content}\ntrailer', 
-                                    self.content_str, flags=re.DOTALL)
-            print("Xref table updated successfully")
+        if xref:
+            # Patch only the 10-digit offset of entries located after the
+            # insertion point, so the table keeps its exact byte length
+            for start, end, offset in self.index.xref_entries(xref):
+                if offset >= self.insert_pos:
+                    self.patches.append((start, end, f"{offset + self.shift:010d}".encode('ascii')))
+            self.logger.debug("Xref table updated successfully")
         else:
-            print("Warning: Xref table not found")
+            self.logger.warning("Warning: Xref table not found")
     
     def update_startxref(self):
         """Update the startxref value"""
-        startxref_pattern = r'startxref\s*\n(\d+)'
-        startxref_match = re.search(startxref_pattern, self.content_str)
-        
-        if startxref_match:
-            old_startxref = int(startxref_match.group(1))
-            new_startxref = old_startxref + self.obj_length
-            self.content_str = re.sub(startxref_pattern, f'startxref\n{new_startxref}', 
-                                    self.content_str)
-            print(f"Startxref updated: {old_startxref} -> {new_startxref}")
+        if self.index.startxref is not None:
+            old_startxref = self.index.startxref
+            new_startxref = old_startxref
+            if old_startxref >= self.insert_pos:
+                new_startxref += self.shift
+            start, end = self.index.startxref_span
+            self.patches.append((start, end, str(new_startxref).encode('ascii')))
+            self.logger.debug("Startxref updated: %s -> %s", old_startxref, new_startxref)
         else:
-            print("Warning: Startxref not found")
+            self.logger.warning("Warning: Startxref not found")
+    
+    def build_incremental_index(self):
+        """
+        Follow the startxref / /Prev chain from the file tail and index only
+        the update sections, so the original body is never scanned
+
+        A file ending with an xref stream gets a new xref stream section
+        instead of a classic one. Returns False when the file has neither a
+        classic trailer nor an xref stream to chain onto.
+        """
+        tail = max(0, len(self.content) - 1024)
+        startxrefs = re.compile(rb'startxref\s+(\d+)').findall(self.content, tail)
+        if not startxrefs:
+            return False
+        
+        self.last_startxref = int(startxrefs[-1])
+        self.xref_stream_update = False
+        trailer_pattern = re.compile(rb'trailer\s*(<<.*?>>)\s*startxref', re.DOTALL)
+        offset = self.last_startxref
+        seen = []
+        self.trailer_dict = b""
+        while offset is not None and offset not in seen and offset < len(self.content):
+            seen.append(offset)
+            trailer_match = trailer_pattern.search(self.content, offset)
+            if not trailer_match:
+                break
+            if not self.trailer_dict:
+                self.trailer_dict = trailer_match.group(1)
+            prev_match = re.search(rb'/Prev\s+(\d+)', trailer_match.group(1))
+            offset = int(prev_match.group(1)) if prev_match else None
+        
+        if not self.trailer_dict:
+            stream_match = re.compile(rb'\s*\d+\s+\d+\s+obj\s*(<<.*?>>)\s*stream\r?\n',
+                                      re.DOTALL).match(self.content, self.last_startxref)
+            if not stream_match or not re.search(rb'/Type\s*/XRef\b', stream_match.group(1)):
+                return False
+            self.trailer_dict = stream_match.group(1)
+            self.xref_stream_update = True
+            seen = [self.last_startxref]
+        
+        size_match = re.search(rb'/Size\s+(\d+)', self.trailer_dict)
+        self.trailer_size = int(size_match.group(1)) if size_match else 0
+        self.index = PDFObjectIndex(self.content, start=min(seen))
+        self.logger.debug("Incremental mode: indexing from byte %s of %s", min(seen), len(self.content))
+        return True
+    
+    def append_incremental_update(self):
+        """Append the queued hidden objects and one update section (xref + trailer with /Prev)"""
+        end = len(self.content)
+        separator = b"" if self.content[end - 1:end] in (b"\n", b"\r") else b"\n"
+        self.insert_pos = end + len(separator)
+        self.placements = []
+        cursor = end
+        # Two patches at the same position keep their order when saving
+        for pending in self.pending:
+            prefix = separator if cursor == end else b""
+            obj_data = self.frame_hidden_object(pending.data, prefix, b"\n")
+            self.patches.append((end, end, obj_data))
+            self.placements.append((cursor + len(prefix), len(obj_data)))
+            self.logger.debug("Hidden object %s appended at position %s", pending.number, cursor + len(prefix))
+            cursor += len(obj_data)
+        
+        # The new section only re-declares the free head entry: the hidden
+        # objects stay unreferenced, exactly as in rewrite mode
+        xref_offset = cursor
+        if self.xref_stream_update:
+            update = self.build_xref_stream_update(xref_offset)
+        else:
+            trailer = re.sub(rb'\s*/Prev\s+\d+', b"", self.trailer_dict)
+            trailer = trailer[:-2].rstrip() + b" /Prev %d >>" % self.last_startxref
+            update = (b"xref\n0 1\n0000000000 65535 f \ntrailer\n" + trailer +
+                      b"\nstartxref\n%d\n%%%%EOF\n" % xref_offset)
+        self.patches.append((end, end, update))
+        self.logger.debug("Update section: xref at %s, /Prev %s", xref_offset, self.last_startxref)
+    
+    def build_xref_stream_update(self, xref_offset):
+        """
+        Update section of a file whose last section is an xref stream: a new
+        uncompressed xref stream, numbered after the hidden objects, that
+        only declares itself and chains to the previous one with /Prev
+        """
+        number = self.max_obj_num + 1
+        width = max(4, (xref_offset.bit_length() + 7) // 8)
+        row = b"\x01" + xref_offset.to_bytes(width, 'big') + b"\x00"
+        keys = [b"/Type /XRef /Size %d /W [1 %d 1] /Index [%d 1]" % (number + 1, width, number)]
+        for pattern in self.XREF_STREAM_KEYS:
+            match = re.search(pattern, self.trailer_dict)
+            if match:
+                keys.append(match.group(0))
+        keys.append(b"/Prev %d /Length %d" % (self.last_startxref, len(row)))
+        return (b"%d 0 obj\n<< " % number + b" ".join(keys) + b" >>\nstream\n" + row +
+                b"\nendstream\nendobj\nstartxref\n%d\n%%%%EOF\n" % xref_offset)
+    
+    def iter_output_plan(self):
+        """
+        Yield the output document as an ordered list of write operations
+
+        Each item is (start, end, data): when data is None the source bytes
+        [start, end) are copied unchanged, otherwise data is written as-is.
+        """
+        pos = 0
+        for start, end, replacement in sorted(self.patches, key=lambda patch: (patch[0], patch[1])):
+            if start > pos:
+                yield pos, start, None
+            yield start, end, replacement
+            pos = max(pos, end)
+        if pos < len(self.content):
+            yield pos, len(self.content), None
+    
+    def iter_output_chunks(self):
+        """Yield the output document as zero-copy source views and patches, in order"""
+        view = memoryview(self.content)
+        try:
+            for start, end, data in self.iter_output_plan():
+                if data is None:
+                    yield view[start:end]
+                elif isinstance(data, PDFStreamedObject):
+                    yield from data
+                else:
+                    yield data
+        finally:
+            view.release()
+    
+    def copy_source_range(self, src, dst, start, end):
+        """Copy source bytes [start, end) to dst, in kernel space when possible"""
+        count = end - start
+        copied = 0
+        
+        if src is not None and count >= self.ZERO_COPY_THRESHOLD:
+            dst.flush()
+            out_pos = dst.tell()
+            try:
+                while copied < count:
+                    if hasattr(os, 'copy_file_range'):
+                        n = os.copy_file_range(src.fileno(), dst.fileno(), count - copied,
+                                               start + copied, out_pos + copied)
+                    elif sys.platform.startswith('linux'):
+                        n = os.sendfile(dst.fileno(), src.fileno(), start + copied, count - copied)
+                    else:
+                        break
+                    if n == 0:
+                        break
+                    copied += n
+            except OSError:
+                pass
+            dst.seek(out_pos + copied)
+        
+        # Fallback (or remainder): write straight from the mapped source buffer
+        if copied < count:
+            with memoryview(self.content) as view:
+                dst.write(view[start + copied:end])
+    
+    @staticmethod
+    def write_data(f, data):
+        """Write a patch: plain bytes or the chunks of a streamed object"""
+        if isinstance(data, PDFStreamedObject):
+            for chunk in data:
+                f.write(chunk)
+        else:
+            f.write(data)
     
     def save_pdf(self, output_path):
         """Save the modified PDF to file"""
-        with open(output_path, 'wb') as f:
-            f.write(self.content_str.encode('latin-1'))
+        # The source may still be memory-mapped: never truncate it in place
+        same_file = (self.source_path is not None and os.path.exists(output_path)
+                     and os.path.samefile(self.source_path, output_path))
         
-        print(f"\nFile saved to: {output_path}")
-        print(f"Hidden object {self.new_obj_num} injected successfully!")
-        print(f"Offsets updated for objects from position {self.half_objects} onwards")
-    
-    def inject_hidden_object(self, pdf_path, output_path, payload, encryption=False, encryption_key=None):
-        """Main method to inject hidden object into PDF"""
+        # Pure appends onto the source itself leave the original bytes untouched
+        if same_file and all(start == len(self.content) for start, _, _ in self.patches):
+            with open(output_path, 'ab') as f:
+                start = f.tell()
+                for _, _, data in self.patches:
+                    self.write_data(f, data)
+                self.profiler.add_bytes(written=f.tell() - start)
+            self.logger.info("\nFile updated in place: %s", output_path)
+            self.log_injected()
+            return
+        
+        write_path = output_path + ".tmp" if same_file else output_path
+        
+        # Unchanged regions are streamed from the source, only patches are built in memory
+        src = open(self.source_path, 'rb') if self.source_path is not None else None
         try:
-            print("Starting PDF hidden object injection...")
-            
-            # Step 1: Read PDF
-            self.read_pdf(pdf_path)
-            
-            # Step 2: Analyze existing objects
-            self.analyze_objects()
-            
-            # Step 3: Create hidden object
-            self.create_hidden_object(payload, encryption, encryption_key)
-            
-            # Step 4: Find insertion position
-            insert_pos = self.find_insertion_position()
-            
-            # Step 5: Insert hidden object
-            self.insert_hidden_object(insert_pos)
-            
-            # Step 6: Update xref table
-            self.update_xref_table()
-            
-            # Step 7: Update startxref
-            self.update_startxref()
-            
-            # Step 8: Save modified PDF
-            self.save_pdf(output_path)
-            
-            print("Injection completed successfully!")
-            
-        except Exception as e:
-            print(f"Error during injection: {str(e)}")
-            raise
-
+            with open(write_path, 'wb') as f:
+                for start, end, data in self.iter_output_plan():
+                    if data is None:
+                        self.copy_source_range(src, f, start, end)
+                    else:
+                        self.write_data(f, data)
+                self.profiler.add_bytes(written=f.tell())
+        finally:
+            if src is not None:
+                src.close()
+        
+        if same_file:
+            self.close()
+            os.replace(write_path, output_path)
+        
+        self.logger.info("\nFile saved to: %s", output_path)
+        self.log_injected()
+        if self.incremental:
+            self.logger.debug("Original bytes preserved, incremental update section appended")
+        else:
+            self.logger.debug("Offsets updated for objects after byte %s", self.insert_pos)
+    
+    def log_injected(self):
+        """Log the numbers of the objects just saved"""
+        numbers = [pending.number for pending in self.pending if pending.payload_size is not None]
+        if len(numbers) == 1:
+            self.logger.info("Hidden object %s injected successfully!", numbers[0])
+        else:
+            self.logger.info("Hidden objects %s injected successfully!", numbers)
+    
+    def injection_results(self, output_path, start_time):
+        """
+        Build one PDFInjectionResult per payload just saved (elapsed and stages cover the whole pass)
+        
+        A chunked payload is reported by its manifest, its object_length
+        covering the manifest and all its chunks.
+        """
+        elapsed = time.perf_counter() - start_time
+        stages = self.profiler.stats()
+        results = []
+        for pending, (offset, length) in zip(self.pending, self.placements):
+            if pending.payload_size is None:
+                results[-1] = results[-1]._replace(object_length=results[-1].object_length + length)
+                continue
+            results.append(PDFInjectionResult(output_path, pending.number, offset, length, pending.payload_size,
+                                              self.incremental, elapsed, stages))
+        return results
+    
+    def inject_hidden_object(self, pdf_path, output_path, payload, encryption=False, encryption_key=None, incremental=False):
+        """Main method to inject hidden object into PDF; returns a PDFInjectionResult"""
+        return self.inject_hidden_objects(pdf_path, output_path, [PDFPayload(payload, None)],
+                                          encryption, encryption_key, incremental)[0]
 
-    def inject_hidden_object_file(self, pdf_path, output_path, payload, file_name, encryption=False, encryption_key=None):
-        """Main method to inject hidden object into PDF"""
+    def inject_hidden_object_file(self, pdf_path, output_path, payload, file_name, encryption=False, encryption_key=None, incremental=False):
+        """Main method to inject hidden object into PDF; returns a PDFInjectionResult"""
+        return self.inject_hidden_objects(pdf_path, output_path, [PDFPayload(payload, file_name)],
+                                          encryption, encryption_key, incremental)[0]
+    
+    def inject_hidden_objects(self, pdf_path, output_path, payloads, encryption=False, encryption_key=None, incremental=False):
+        """
+        Inject a bundle of payloads (PDFPayload items) in a single pass
+        
+        The document is read, indexed and rewritten once whatever the number
+        of payloads: the objects are inserted back to back and the xref
+        offsets are shifted once by their total length.
+        
+        Returns a list of PDFInjectionResult, one per payload, in order.
+        """
+        if not payloads:
+            raise ValueError("No payloads to inject")
+        start_time = time.perf_counter()
+        self.profiler.reset()
         try:
-            print("Starting PDF hidden object injection...")
+            self.logger.info("Starting PDF hidden object injection...")
             
             # Step 1: Read PDF
-            self.read_pdf(pdf_path)
+            with self.profiler.stage('read'):
+                self.read_pdf(pdf_path)
             
-            # Step 2: Analyze existing objects
-            self.analyze_objects()
+            # Step 2: Index and analyze existing objects (single pass)
+            with self.profiler.stage('index'):
+                self.incremental = incremental
+                if self.incremental and not self.build_incremental_index():
+                    # A rewrite would leave the offsets of an unknown xref layout stale
+                    raise ValueError("Incremental mode needs a classic trailer or an xref stream "
+                                     "at startxref; none was found")
+                if not self.incremental:
+                    self.build_object_index()
+                    self.trailer_size = self.index.trailer_size()
+                self.analyze_objects()
             
-            # Step 3: Create hidden object
-            self.create_hidden_object_file(payload, file_name, encryption, encryption_key)
+            # Step 3: Create hidden objects (the payloads themselves are encoded while saving)
+            with self.profiler.stage('encode'):
+                self.create_hidden_objects(payloads, encryption, encryption_key)
             
-            # Step 4: Find insertion position
-            insert_pos = self.find_insertion_position()
-            
-            # Step 5: Insert hidden object
-            self.insert_hidden_object(insert_pos)
-            
-            # Step 6: Update xref table
-            self.update_xref_table()
-            
-            # Step 7: Update startxref
-            self.update_startxref()
+            with self.profiler.stage('patch'):
+                if self.incremental:
+                    # Steps 4-7: Append objects and update section, body untouched
+                    self.append_incremental_update()
+                else:
+                    # Step 4: Find insertion position
+                    insert_pos = self.find_insertion_position()
+                    
+                    # Step 5: Insert hidden objects
+                    self.insert_hidden_objects(insert_pos)
+                    
+                    # Step 6: Update xref table
+                    self.update_xref_table()
+                    
+                    # Step 7: Update startxref
+                    self.update_startxref()
             
             # Step 8: Save modified PDF
-            self.save_pdf(output_path)
+            with self.profiler.stage('save'):
+                self.save_pdf(output_path)
             
-            print("Injection completed successfully!")
+            self.logger.info("Injection completed successfully!")
+            self.profiler.report("Injection profile")
+            return self.injection_results(output_path, start_time)
             
         except Exception as e:
-            print(f"Error during injection: {str(e)}")
+            self.logger.error("Error during injection: %s", e)
             raise
+        finally:
+            self.close()
@@ -0,0 +1,135 @@
+import heapq
+import re
+from collections import namedtuple
+
+# Span of a single indirect object: "number generation obj ... endobj"
+# start/header_end/end are offsets in the indexed content, end is None
+# when no matching endobj was found.
+PDFObjectSpan = namedtuple('PDFObjectSpan', ['number', 'generation', 'start', 'header_end', 'end'])
+
+# Span of a classic xref table: offset of the "xref" keyword and of the
+# "trailer" keyword that closes it.
+PDFXrefSpan = namedtuple('PDFXrefSpan', ['start', 'end'])
+
+
+class PDFObjectIndex:
+    """
+    Single-pass index of the structural tokens of a PDF file
+
+    One scan collects every object header with its endobj, every classic
+    xref table and the last startxref value, so callers never need to run
+    another full-file regex.
+
+    The scan searches each keyword on its own (plain literal searches) and
+    reads object numbers backwards from "obj": a pattern starting with \d+
+    would be tried at every digit of the streams and payloads.
+    """
+
+    KEYWORD_PATTERNS = [rb'obj', rb'xref\b', rb'trailer', rb'startxref\s+(\d+)']
+    HEADER_PATTERN = rb'(?<!\d)(\d+)\s+(\d+)\s+\Z'
+    HEADER_WINDOW = 64
+    XREF_ENTRY_PATTERN = rb'(\d{10})[ \t]+(\d{5})[ \t]+([fn])'
+
+    def __init__(self, content, start=0):
+        # content is any bytes-like buffer (bytes, mmap), never a decoded str
+        self.content = content
+        self.start = start
+        self.objects = []
+        self.by_number = {}
+        self.xrefs = []
+        self.startxref = None
+        self.startxref_span = None
+        self.build()
+
+    def build(self):
+        """Scan the content once (from self.start) and record objects, xref tables and startxref"""
+        self.objects = []
+        self.by_number = {}
+        self.xrefs = []
+        self.startxref = None
+        self.startxref_span = None
+
+        open_obj = None
+        open_xref = None
+        # End of the previous token: an object number never overlaps it
+        token_end = self.start
+        header_pattern = re.compile(self.HEADER_PATTERN)
+        scans = [re.compile(pattern).finditer(self.content, self.start) for pattern in self.KEYWORD_PATTERNS]
+
+        for match in heapq.merge(*scans, key=lambda match: match.start()):
+            keyword = match.group(0)
+            if keyword == b'obj':
+                if match.start() - 3 >= self.start and self.content[match.start() - 3:match.start()] == b'end':
+                    if open_obj is not None:
+                        self.objects.append(open_obj._replace(end=match.end()))
+                        open_obj = None
+                else:
+                    header = header_pattern.search(self.content, max(token_end, match.start() - self.HEADER_WINDOW),
+                                                   match.start())
+                    if not header:
+                        continue
+                    if open_obj is not None:
+                        self.objects.append(open_obj)
+                    open_obj = PDFObjectSpan(int(header.group(1)), int(header.group(2)),
+                                             header.start(), match.end(), None)
+            elif keyword == b'xref':
+                previous = self.content[match.start() - 1:match.start()]
+                if previous.isalnum() or previous == b'_':
+                    continue  # part of "startxref" or of a name
+                open_xref = match.start()
+            elif keyword == b'trailer':
+                if open_xref is not None:
+                    self.xrefs.append(PDFXrefSpan(open_xref, match.start()))
+                    open_xref = None
+            else:
+                self.startxref = int(match.group(1))
+                self.startxref_span = match.span(1)
+            token_end = match.end()
+
+        if open_obj is not None:
+            self.objects.append(open_obj)
+
+        for obj in self.objects:
+            self.by_number.setdefault((obj.number, obj.generation), obj)
+
+    def object_numbers(self, generation=0):
+        """Return the numbers of all objects with the given generation, in file order"""
+        return [obj.number for obj in self.objects if obj.generation == generation]
+
+    def find(self, obj_num, generation=0):
+        """Return the first span of the given object, or None"""
+        return self.by_number.get((obj_num, generation))
+
+    def main_xref(self):
+        """Return the xref table pointed to by startxref, falling back to the first one"""
+        if not self.xrefs:
+            return None
+        for xref in self.xrefs:
+            if xref.start == self.startxref:
+                return xref
+        return self.xrefs[0]
+
+    def trailer_size(self, xref=None):
+        """Return the /Size of the trailer closing an xref table (default: the main one), or 0"""
+        xref = xref or self.main_xref()
+        if xref is None:
+            return 0
+        end = len(self.content)
+        if self.startxref_span is not None and self.startxref_span[0] > xref.end:
+            end = self.startxref_span[0]
+        match = re.compile(rb'/Size\s+(\d+)').search(self.content, xref.end, end)
+        return int(match.group(1)) if match else 0
+
+    def xref_entries(self, xref=None):
+        """
+        Yield (start, end, offset) for each in-use entry of an xref table
+
+        start/end delimit the 10-digit offset field so it can be patched in place.
+        """
+        xref = xref or self.main_xref()
+        if xref is None:
+            return
+        pattern = re.compile(self.XREF_ENTRY_PATTERN)
+        for match in pattern.finditer(self.content, xref.start, xref.end):
+            if match.group(3) == b'n':
+                yield match.start(1), match.end(1), int(match.group(1))
@@ -0,0 +1,31 @@
+class PDFStreamedObject:
+    """
+    Object whose body is produced chunk by chunk while the PDF is written
+
+    The byte length must be known up front (xref offsets depend on it), the
+    body itself is only pulled from its iterator when the output is saved,
+    so large payloads never have to be held in memory.
+    """
+
+    def __init__(self, header, body, footer, body_length):
+        self.header = header
+        self.body = body
+        self.footer = footer
+        self.body_length = body_length
+
+    def __len__(self):
+        return len(self.header) + self.body_length + len(self.footer)
+
+    def __iter__(self):
+        yield self.header
+        written = 0
+        for chunk in self.body:
+            written += len(chunk)
+            yield chunk
+        if written != self.body_length:
+            raise ValueError(f"Streamed object body is {written} bytes, expected {self.body_length}")
+        yield self.footer
+
+    def framed(self, prefix, suffix):
+        """Return the same object surrounded by prefix and suffix bytes"""
+        return PDFStreamedObject(prefix + self.header, self.body, self.footer + suffix, self.body_length)
@@ -1,8 +1,30 @@
+import atexit
+import json
+import os
+import sys
+import time
+
+
 class OutputManager:
     """
     Class to manage colored console output
+    
+    Messages below the configured level are dropped before they are
+    formatted: pass %-style arguments (or a callable) instead of a
+    pre-built string and a disabled message costs one comparison. Events
+    can also be written as JSON lines to a separate sink, and writes can
+    be buffered and flushed in batches.
     """
     
+    # Verbosity levels, from most to least verbose ('quiet' drops everything)
+    LEVELS = {
+        'debug': 10,
+        'info': 20,
+        'warning': 30,
+        'error': 40,
+        'quiet': 100
+    }
+    
     # ANSI color codes
     COLORS = {
         'GREEN': '\033[92m',      # Bright green
@@ -11,14 +33,175 @@ class OutputManager:
         'RESET': '\033[0m'        # Reset to default color
     }
     
-    def __init__(self, enable_colors=True):
+    # Lines kept in memory before a buffered manager writes them out
+    BUFFER_LINES = 256
+    
+    def __init__(self, enable_colors=None, level='info', json_file=None, json_level=None,
+                 buffered=False, stream=None):
         """
         Initialize OutputManager
         
         Args:
-            enable_colors (bool): Enable/disable colored output
+            enable_colors (bool): Enable/disable colored output (default: only
+                when the console is a TTY and NO_COLOR is not set)
+            level (str): Minimum level printed: debug, info, warning, error or quiet
+            json_file (str): Path (or open text file) receiving one JSON event per line
+            json_level (str): Minimum level written to json_file (default: level)
+            buffered (bool): Collect lines and write them in batches of BUFFER_LINES
+            stream: Console stream (default: the current sys.stdout)
         """
+        self.stream = stream
+        if enable_colors is None:
+            console = self.console()
+            enable_colors = (hasattr(console, 'isatty') and console.isatty()
+                             and 'NO_COLOR' not in os.environ)
         self.enable_colors = enable_colors
+        self.set_level(level)
+        
+        self.buffered = buffered
+        self.console_buffer = []
+        self.json_buffer = []
+        
+        self.json_sink = None
+        self.owns_json_sink = False
+        self.json_level = None
+        if json_file is not None:
+            self.open_json_sink(json_file, json_level or level)
+        
+        if buffered:
+            atexit.register(self.flush)
+    
+    def console(self):
+        """Return the console stream (resolved at write time, so redirections apply)"""
+        return self.stream or sys.stdout
+    
+    def set_level(self, level):
+        """Set the minimum level of printed messages"""
+        if level not in self.LEVELS:
+            raise ValueError(f"Unknown output level: {level}")
+        self.level = level
+        self.threshold = self.LEVELS[level]
+    
+    def open_json_sink(self, json_file, json_level='info'):
+        """
+        Send every event at or above json_level to a JSON lines file
+        
+        Args:
+            json_file (str): Path (appended to) or open text file
+            json_level (str): Minimum level of the written events
+        """
+        if json_level not in self.LEVELS:
+            raise ValueError(f"Unknown output level: {json_level}")
+        self.close_json_sink()
+        if hasattr(json_file, 'write'):
+            self.json_sink, self.owns_json_sink = json_file, False
+        else:
+            self.json_sink, self.owns_json_sink = open(json_file, 'a', encoding='utf-8'), True
+        self.json_level = json_level
+    
+    def close_json_sink(self):
+        """Flush and detach the JSON sink"""
+        self.flush()
+        if self.json_sink is not None and self.owns_json_sink:
+            self.json_sink.close()
+        self.json_sink = None
+        self.owns_json_sink = False
+    
+    def is_enabled(self, level):
+        """Return True if messages of this level reach the console or the JSON sink"""
+        value = self.LEVELS[level]
+        if value >= self.threshold:
+            return True
+        return self.json_sink is not None and value >= self.LEVELS[self.json_level]
+    
+    def emit(self, level, message, args=(), fields=None, prefix="", color=None):
+        """
+        Format and write one event, unless its level is disabled everywhere
+        
+        Args:
+            level (str): Event level
+            message (str): Message, %-formatted with args when args are given,
+                or a callable returning the message
+            args (tuple): Lazy formatting arguments
+            fields (dict): Extra structured fields (JSON sink only)
+            prefix (str): Console prefix (emoji)
+            color (str): Console ANSI color code
+        """
+        value = self.LEVELS[level]
+        to_console = value >= self.threshold
+        to_json = self.json_sink is not None and value >= self.LEVELS[self.json_level]
+        if not (to_console or to_json):
+            return
+        
+        if callable(message):
+            message = message()
+        elif args:
+            message = message % args
+        
+        if to_console:
+            if color is None:
+                self._write(prefix + message)
+            else:
+                self._print_colored(prefix + message, color)
+        if to_json:
+            event = {'time': time.time(), 'level': level, 'message': message.strip()}
+            if fields:
+                event.update(fields)
+            line = json.dumps(event, default=str, ensure_ascii=False)
+            if self.buffered:
+                self.json_buffer.append(line)
+                if len(self.json_buffer) >= self.BUFFER_LINES:
+                    self.flush()
+            else:
+                self.json_sink.write(line + "\n")
+                self.json_sink.flush()
+    
+    def log(self, message, level='info', *args, **fields):
+        """
+        Print a plain message if its level is enabled
+        
+        Args:
+            message (str): Message to print (%-formatted with args, if any)
+            level (str): Message level
+        """
+        self.emit(level, message, args, fields)
+    
+    def debug(self, message, *args, **fields):
+        """Plain debug message, formatted only when debug output is enabled"""
+        self.emit('debug', message, args, fields)
+    
+    def info(self, message, *args, **fields):
+        """Plain info message, formatted only when enabled"""
+        self.emit('info', message, args, fields)
+    
+    def warning(self, message, *args, **fields):
+        """Plain warning message, formatted only when enabled"""
+        self.emit('warning', message, args, fields)
+    
+    def error(self, message, *args, **fields):
+        """Plain error message, formatted only when enabled"""
+        self.emit('error', message, args, fields)
+    
+    def _write(self, text):
+        """Write one console line, directly or through the buffer"""
+        if self.buffered:
+            self.console_buffer.append(text)
+            if len(self.console_buffer) >= self.BUFFER_LINES:
+                self.flush()
+        else:
+            self.console().write(text + "\n")
+    
+    def flush(self):
+        """Write out buffered lines"""
+        if self.console_buffer:
+            console = self.console()
+            console.write("\n".join(self.console_buffer) + "\n")
+            console.flush()
+            self.console_buffer = []
+        if self.json_buffer and self.json_sink is not None:
+            self.json_sink.write("\n".join(self.json_buffer) + "\n")
+            self.json_sink.flush()
+            self.json_buffer = []
     
     def _print_colored(self, message, color_code):
         """
@@ -29,45 +212,54 @@ class OutputManager:
             color_code (str): ANSI color code
         """
         if self.enable_colors:
-            print(f"{color_code}{message}{self.COLORS['RESET']}")
+            self._write(f"{color_code}{message}{self.COLORS['RESET']}")
         else:
-            print(message)
+            self._write(message)
     
-    def print_success(self, message):
+    def print_success(self, message, **fields):
         """
         Print success message in green color
         
         Args:
             message (str): Success message to print
         """
-        self._print_colored(f"✅ {message}", self.COLORS['GREEN'])
+        self.emit('info', message, (), fields, "✅ ", self.COLORS['GREEN'])
     
-    def print_warning(self, message):
+    def print_warning(self, message, **fields):
         """
         Print warning message in orange color
         
         Args:
             message (str): Warning message to print
         """
-        self._print_colored(f"⚠️  {message}", self.COLORS['ORANGE'])
+        self.emit('warning', message, (), fields, "⚠️  ", self.COLORS['ORANGE'])
     
-    def print_info(self, message):
+    def print_info(self, message, **fields):
         """
         Print info message in white color
         
         Args:
             message (str): Info message to print
         """
-        self._print_colored(f"ℹ️  {message}", self.COLORS['WHITE'])
+        self.emit('info', message, (), fields, "ℹ️  ", self.COLORS['WHITE'])
     
-    def print_error(self, message):
+    def print_error(self, message, **fields):
         """
         Bonus method: Print error message in red color
         
         Args:
             message (str): Error message to print
         """
-        self._print_colored(f"❌ {message}", '\033[91m')  # Bright red
+        self.emit('error', message, (), fields, "❌ ", '\033[91m')  # Bright red
+    
+    def print_debug(self, message, **fields):
+        """
+        Print debug message (only at debug level)
+        
+        Args:
+            message (str): Debug message to print
+        """
+        self.emit('debug', message, (), fields, "🐞 ", self.COLORS['WHITE'])
     
     def disable_colors(self):
         """Disable colored output"""
@@ -91,16 +283,16 @@ class OutputManager:
             "                                                                                  "
         ]
 
-        print()
+        self._write("")
         for line in banner_lines:
             self._print_colored(line, '\033[95m')  # Purple
-        print()
+        self._write("")
 
         # Center the subtitle
         banner_width = len(banner_lines[0])  # Use first line length as reference
         subtitle_centered = "PDF Steganography Tool v1.0".center(banner_width)
-        print(f"{self.COLORS['ORANGE']}{subtitle_centered}{self.COLORS['RESET']}")
-        print()
+        self._print_colored(subtitle_centered, self.COLORS['ORANGE'])
+        self._write("")
         subtitle_centered = "Made by Spor3".center(banner_width)
-        print(f"{self.COLORS['WHITE']}{subtitle_centered}{self.COLORS['RESET']}")
-        print()
\ No newline at end of file
+        self._print_colored(subtitle_centered, self.COLORS['WHITE'])
+        self._write("")
\ No newline at end of file
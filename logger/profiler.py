@@ -0,0 +1,97 @@
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+# Measurements of one pipeline stage: elapsed is in seconds, peak_memory the
+# peak of new Python allocations during the stage in bytes (None unless
+# memory tracing is on), bytes_read/bytes_written the I/O reported by it.
+StageStats = namedtuple('StageStats', ['name', 'elapsed', 'peak_memory', 'bytes_read', 'bytes_written'])
+
+
+class StageProfiler:
+    """
+    Per-stage timing, memory and I/O instrumentation
+
+    Wrap each step in "with profiler.stage('name'):" and report byte
+    counts with add_bytes(). A disabled profiler turns every call into a
+    no-op, so the pipelines can be instrumented unconditionally.
+    """
+
+    def __init__(self, enabled=True, trace_memory=False, logger=None):
+        """
+        Initialize StageProfiler
+
+        Args:
+            enabled (bool): Record stages (False: every call is a no-op)
+            trace_memory (bool): Measure peak allocations per stage with tracemalloc
+                (slows the traced code down noticeably)
+            logger (OutputManager): Destination of report()
+        """
+        self.enabled = enabled
+        self.trace_memory = trace_memory and enabled
+        self.logger = logger
+        self.stages = []
+        self.current = None
+        self.started_tracing = False
+
+    def reset(self):
+        """Forget the stages of the previous run"""
+        self.stages = []
+        self.current = None
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block (and its peak memory) as stage name"""
+        if not self.enabled:
+            yield
+            return
+
+        if self.trace_memory:
+            import tracemalloc  # only loaded when memory is traced
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracing = True
+            tracemalloc.reset_peak()
+            memory_start = tracemalloc.get_traced_memory()[0]
+
+        self.current = {'read': 0, 'written': 0}
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] - memory_start if self.trace_memory else None
+            self.stages.append(StageStats(name, elapsed, peak, self.current['read'], self.current['written']))
+            self.current = None
+
+    def add_bytes(self, read=0, written=0):
+        """Attribute I/O to the running stage"""
+        if self.current is not None:
+            self.current['read'] += read
+            self.current['written'] += written
+
+    def stats(self):
+        """Return the StageStats of the last run, in execution order"""
+        return list(self.stages)
+
+    def total(self):
+        """Total elapsed seconds of the recorded stages"""
+        return sum(stage.elapsed for stage in self.stages)
+
+    def report(self, title="Profile"):
+        """Log one line per stage (with structured fields) and the total"""
+        if not self.enabled or self.logger is None:
+            return
+        self.logger.info("⏱️  %s:", title)
+        for stage in self.stages:
+            memory = f", peak {stage.peak_memory / 1024:.0f} KiB" if stage.peak_memory is not None else ""
+            self.logger.info("   - %-10s %8.2f ms%s, read %d B, written %d B", stage.name, stage.elapsed * 1000,
+                             memory, stage.bytes_read, stage.bytes_written, stage=stage._asdict())
+        self.logger.info("   - %-10s %8.2f ms", "total", self.total() * 1000)
+
+    def close(self):
+        """Stop tracemalloc if this profiler started it"""
+        if self.started_tracing:
+            import tracemalloc
+            tracemalloc.stop()
+            self.started_tracing = False
@@ -1,4 +1,5 @@
 import argparse
+import re
 import sys
 
 def create_argument_parser():
@@ -15,35 +16,118 @@ def create_argument_parser():
                        help='Output PDF file')
     
     parser.add_argument('--m', '--mode',
-                       choices=['t', 'text', 'f', 'file'],
+                       choices=['t', 'text', 'f', 'file', 'b', 'bundle'],
                        required=True,
-                       help='Mode: t/text for text, f/file for file')
+                       help='Mode: t/text for text, f/file for file, b/bundle for several texts and files in one pass')
     
     parser.add_argument('--t', '--text', 
-                       help='Message to hide in PDF (required if mode=text)')
+                       action='append',
+                       help='Message to hide in PDF (required if mode=text, repeatable in bundle mode)')
     
     parser.add_argument('--f', '--file',
-                       help='File to hide in PDF (required if mode=file)')
+                       action='append',
+                       help='File to hide in PDF (required if mode=file, repeatable in bundle mode)')
     
     parser.add_argument('--e', '--encryption',
                        help='Encryption key (optional)')
     
+    parser.add_argument('--converter',
+                       choices=['auto', 'native', 'qpdf'],
+                       default='auto',
+                       help='Normalization backend: native (in-process), qpdf, or auto (native, qpdf fallback)')
+    
+    parser.add_argument('--no-cache',
+                       action='store_true',
+                       help='Do not reuse or store normalized copies in the conversion cache')
+    
+    parser.add_argument('--cache-dir',
+                       help='Conversion cache directory (default: ~/.cache/payloadpdf)')
+    
+    parser.add_argument('--incremental',
+                       action='store_true',
+                       help='Append the object as an incremental update instead of rewriting the file')
+    
+    parser.add_argument('--encoding',
+                       choices=['base64', 'stream'],
+                       default='base64',
+                       help='Payload encoding: base64 string (default) or binary stream object')
+    
+    parser.add_argument('--flate',
+                       action='store_true',
+                       help='Compress stream payloads with FlateDecode (requires --encoding stream)')
+    
+    parser.add_argument('--compress',
+                       choices=['none', 'zlib', 'lzma', 'auto'],
+                       default='none',
+                       help='Compress the payload before encryption (auto: zlib, skipped for incompressible data)')
+    
+    parser.add_argument('--compress-level',
+                       type=int,
+                       help='Compression level 0-9 (default: 6)')
+    
+    parser.add_argument('--chunk-size',
+                       type=int,
+                       help='Store files as independently encrypted chunks of this many KiB '
+                            '(parallel extraction and byte-range reads)')
+    
+    parser.add_argument('--v', '--verbose',
+                       action='store_true',
+                       help='Show debug output (object layout, offsets, content previews)')
+    
+    parser.add_argument('--log-json',
+                       help='Also write log events as JSON lines to this file')
+    
+    parser.add_argument('--profile',
+                       action='store_true',
+                       help='Report time, peak memory and bytes read/written per stage')
+    
+    parser.add_argument('--quiet',
+                       action='store_true',
+                       help='No banner or progress output: only results, warnings and errors')
+    
     return parser
 
 def validate_args(args):
     """Validate arguments based on selected mode"""
     mode = getattr(args, 'mode', None) or getattr(args, 'm', None)
     # Normalize mode values
+    texts = getattr(args, 'text', None) or getattr(args, 't', None) or []
+    files = getattr(args, 'file', None) or getattr(args, 'f', None) or []
     if mode in ['t', 'text']:
-        if not (getattr(args, 'text', None) or getattr(args, 't', None)):
+        if not texts:
             raise argparse.ArgumentTypeError("--message/-m is required when mode is 'text' or 't'")
+        if len(texts) > 1:
+            raise argparse.ArgumentTypeError("Several --t/--text values require mode 'bundle' or 'b'")
     elif mode in ['f', 'file']:
-        if not (getattr(args, 'file', None) or getattr(args, 'f', None)):
+        if not files:
             raise argparse.ArgumentTypeError("--file/--f is required when mode is 'file' or 'f'")
+        if len(files) > 1:
+            raise argparse.ArgumentTypeError("Several --f/--file values require mode 'bundle' or 'b'")
+    elif mode in ['b', 'bundle']:
+        if not (texts or files):
+            raise argparse.ArgumentTypeError("--t/--text or --f/--file is required when mode is 'bundle' or 'b'")
+    if getattr(args, 'compress', 'none') != 'none' and getattr(args, 'flate', False):
+        raise argparse.ArgumentTypeError("--compress cannot be combined with --flate")
+    level = getattr(args, 'compress_level', None)
+    if level is not None and not 0 <= level <= 9:
+        raise argparse.ArgumentTypeError("--compress-level must be between 0 and 9")
+    chunk_size = getattr(args, 'chunk_size', None)
+    if chunk_size is not None:
+        if chunk_size <= 0:
+            raise argparse.ArgumentTypeError("--chunk-size must be positive")
+        if getattr(args, 'flate', False):
+            raise argparse.ArgumentTypeError("--chunk-size cannot be combined with --flate")
     
     return args
 
 
+def parse_byte_range(value):
+    """Parse a START-END byte range (end exclusive)"""
+    match = re.fullmatch(r'(\d+)-(\d+)', value or "")
+    if not match or int(match.group(2)) < int(match.group(1)):
+        raise argparse.ArgumentTypeError(f"Invalid byte range: {value} (expected START-END)")
+    return int(match.group(1)), int(match.group(2))
+
 
 def create_arguments_extract():
     """Create and configure the argument parser"""
@@ -62,4 +146,184 @@ def create_arguments_extract():
     parser.add_argument('--e', '--encryption',
                        help='Encryption key (optional)')
     
+    parser.add_argument('--workers',
+                       type=int,
+                       help='Threads decoding chunked files (default: one per CPU)')
+    
+    parser.add_argument('--range',
+                       type=parse_byte_range,
+                       help='File mode: only read bytes START-END (end exclusive) of a chunked file into --o')
+    
+    parser.add_argument('--name',
+                       help='Chunked file read by --range (default: the first one)')
+    
+    parser.add_argument('--o', '--output',
+                       help='Output file of --range')
+    
+    parser.add_argument('--v', '--verbose',
+                       action='store_true',
+                       help='Show debug output (object layout, offsets, content previews)')
+    
+    parser.add_argument('--log-json',
+                       help='Also write log events as JSON lines to this file')
+    
+    parser.add_argument('--profile',
+                       action='store_true',
+                       help='Report time, peak memory and bytes read/written per stage')
+    
+    parser.add_argument('--quiet',
+                       action='store_true',
+                       help='No banner or progress output: only results, warnings and errors')
+    
+    return parser
+
+
+
+def create_arguments_scan():
+    """Create and configure the argument parser for corpus scans"""
+    parser = argparse.ArgumentParser(description='Script to scan PDF collections for orphan objects')
+    
+    # Add arguments
+    parser.add_argument('--i', '--input',
+                       nargs='+',
+                       required=True,
+                       help='PDF files and/or directories to scan')
+    
+    parser.add_argument('--o', '--output',
+                       help='JSON lines output file (default: stdout)')
+    
+    parser.add_argument('--j', '--jobs',
+                       type=int,
+                       help='Worker processes (default: one per CPU)')
+    
+    parser.add_argument('--resume',
+                       action='store_true',
+                       help='Append to the output file and skip files already scanned and unchanged')
+    
+    parser.add_argument('--no-recursive',
+                       action='store_true',
+                       help='Do not descend into subdirectories')
+    
+    parser.add_argument('--no-prefilter',
+                       action='store_true',
+                       help='Fully parse every file instead of only those the pre-filter keeps')
+    
+    parser.add_argument('--log-json',
+                       help='Also write log events as JSON lines to this file')
+    
+    return parser
+
+
+def create_arguments_bench():
+    """Create and configure the argument parser for benchmarks"""
+    parser = argparse.ArgumentParser(description='Script to benchmark injection, extraction, AES and conversion')
+    
+    # Add arguments
+    parser.add_argument('--o', '--output',
+                       help='JSON results file')
+    
+    parser.add_argument('--objects',
+                       nargs='+',
+                       type=int,
+                       default=[10, 1000, 100000],
+                       help='Object counts of the synthetic PDFs (default: 10 1000 100000)')
+    
+    parser.add_argument('--object-size',
+                       type=int,
+                       default=64,
+                       help='Stream size of each filler object in bytes (default: 64)')
+    
+    parser.add_argument('--payload',
+                       nargs='+',
+                       type=int,
+                       default=[1024, 1048576],
+                       help='Payload sizes in bytes (default: 1024 1048576)')
+    
+    parser.add_argument('--cases',
+                       nargs='+',
+                       help='Cases to run (default: all): inject_text inject_file extract_text '
+                            'extract_file aes_encrypt aes_decrypt convert startup')
+    
+    parser.add_argument('--repeat',
+                       type=int,
+                       default=3,
+                       help='Timed repetitions per case (default: 3)')
+    
+    parser.add_argument('--work-dir',
+                       default='benchmark_files',
+                       help='Directory of the generated PDFs and outputs (default: benchmark_files)')
+    
+    parser.add_argument('--no-memory',
+                       action='store_true',
+                       help='Skip the tracemalloc run that measures peak memory')
+    
+    parser.add_argument('--plain',
+                       action='store_true',
+                       help='Benchmark unencrypted payloads (skips the AES cases)')
+    
+    parser.add_argument('--converter',
+                       choices=['auto', 'native', 'qpdf'],
+                       default='native',
+                       help='Backend of the convert case (default: native)')
+    
+    parser.add_argument('--compare',
+                       help='Previous JSON results file to compare against')
+    
+    parser.add_argument('--startup-budget',
+                       type=float,
+                       help='Warn when a CLI adds more than this many ms to the bare interpreter start')
+    
+    return parser
+
+
+def create_arguments_serve():
+    """Create and configure the argument parser for the service"""
+    parser = argparse.ArgumentParser(description='Script to serve injection/extraction jobs from a warm process')
+    
+    # Add arguments
+    parser.add_argument('--host',
+                       default='127.0.0.1',
+                       help='Listening address (default: 127.0.0.1)')
+    
+    parser.add_argument('--port',
+                       type=int,
+                       default=8765,
+                       help='Listening port (default: 8765)')
+    
+    parser.add_argument('--socket',
+                       help='Listen on this Unix socket (mode 0600, no token) instead of TCP')
+    
+    parser.add_argument('--root',
+                       help='Working root: job paths are resolved under it and refused outside (default: current directory)')
+    
+    parser.add_argument('--token',
+                       help='Token required in the X-PayloadPDF-Token header on TCP (default: a random one per start)')
+    
+    parser.add_argument('--j', '--jobs',
+                       type=int,
+                       help='Jobs run concurrently (default: one per CPU)')
+    
+    parser.add_argument('--queue',
+                       type=int,
+                       help='Jobs waiting for a worker before new ones are refused (default: 4 per worker)')
+    
+    parser.add_argument('--converter',
+                       choices=['auto', 'native', 'qpdf'],
+                       default='auto',
+                       help='Normalization backend of inject jobs (default: auto)')
+    
+    parser.add_argument('--no-cache',
+                       action='store_true',
+                       help='Do not reuse or store normalized copies in the conversion cache')
+    
+    parser.add_argument('--cache-dir',
+                       help='Conversion cache directory (default: ~/.cache/payloadpdf)')
+    
+    parser.add_argument('--v', '--verbose',
+                       action='store_true',
+                       help='Also log every HTTP request')
+    
+    parser.add_argument('--log-json',
+                       help='Also write job events as JSON lines to this file')
+    
     return parser
@@ -0,0 +1,29 @@
+from parser import create_arguments_scan
+from logger.logger import OutputManager
+from extractor.corpus_scanner import PDFCorpusScanner
+
+if __name__ == "__main__":
+    parser = create_arguments_scan()
+    args = parser.parse_args()
+
+    inputs = getattr(args, 'input', None) or getattr(args, 'i', None)
+    output_file = getattr(args, 'output', None) or getattr(args, 'o', None)
+    jobs = getattr(args, 'jobs', None) or getattr(args, 'j', None)
+
+    if args.resume and not output_file:
+        parser.error("--resume requires --o/--output")
+
+    # Results go to stdout when no output file is given: keep it pure JSON lines
+    logger = OutputManager(level='info' if output_file else 'quiet')
+    if getattr(args, 'log_json', None):
+        logger.open_json_sink(args.log_json, 'debug')
+    if output_file:
+        logger.print_banner()
+
+    scanner = PDFCorpusScanner(jobs, recursive=not args.no_recursive, resume=args.resume,
+                               prefilter=not args.no_prefilter, logger=logger)
+    stats = scanner.scan(inputs, output_file)
+
+    logger.print_success(f"Scanned {stats['scanned']} files ({stats['skipped']} skipped, {stats['prefiltered']} pre-filtered, "
+                         f"{stats['with_orphans']} with orphan objects, {stats['errors']} errors)", **stats)
+    logger.close_json_sink()
@@ -0,0 +1,20 @@
+from parser import create_arguments_serve
+from logger.logger import OutputManager
+from service.daemon import PDFService
+
+if __name__ == "__main__":
+    logger = OutputManager()
+    logger.print_banner()
+
+    parser = create_arguments_serve()
+    args = parser.parse_args()
+    if getattr(args, 'verbose', False) or getattr(args, 'v', False):
+        logger.set_level('debug')
+    if getattr(args, 'log_json', None):
+        logger.open_json_sink(args.log_json, logger.level)
+
+    jobs = getattr(args, 'jobs', None) or getattr(args, 'j', None)
+    service = PDFService(jobs, args.queue, converter_backend=args.converter, use_cache=not args.no_cache,
+                         cache_dir=args.cache_dir, root=args.root, token=args.token, logger=logger)
+    service.serve(args.host, args.port, args.socket)
+    logger.close_json_sink()
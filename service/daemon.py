@@ -0,0 +1,366 @@
+import base64
+import hmac
+import json
+import os
+import secrets
+import signal
+import socketserver
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from converter.converter import PDFTraditionalConverter
+from extractor.extractor import PDFHiddenMessageExtractor
+from injector.injector import PDFHiddenObjectInjector, PDFPayload
+from logger.logger import OutputManager
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server listening on a Unix domain socket"""
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name, self.server_port = "localhost", 0
+
+
+class PDFServiceRequestHandler(BaseHTTPRequestHandler):
+    """JSON-over-HTTP front end of PDFService (one request = one job)"""
+
+    protocol_version = "HTTP/1.1"
+
+    LOOPBACK_HOSTS = ('localhost', '127.0.0.1', '::1')
+    TOKEN_HEADER = 'X-PayloadPDF-Token'
+
+    def check_request(self):
+        """
+        Refuse requests a browser could forge (CSRF, DNS rebinding)
+
+        Returns:
+            bool: True when the request may run, otherwise an error was sent
+        """
+        host = self.headers.get('Host', '').strip().lower()
+        if host.startswith('['):
+            host = host[1:].split(']', 1)[0]
+        elif host.count(':') == 1:
+            host = host.split(':', 1)[0]
+        if host not in self.LOOPBACK_HOSTS:
+            self.send_json(403, {'ok': False, 'error': f"Host not allowed: {host or '(none)'}"})
+            return False
+        token = self.server.service.token
+        if token and not hmac.compare_digest(self.headers.get(self.TOKEN_HEADER, '').encode('utf-8'),
+                                             token.encode('utf-8')):
+            self.send_json(401, {'ok': False, 'error': f"Missing or wrong {self.TOKEN_HEADER} header"})
+            return False
+        return True
+
+    def do_GET(self):
+        if not self.check_request():
+            return
+        if self.path == '/status':
+            self.send_json(200, self.server.service.status())
+        else:
+            self.send_json(404, {'ok': False, 'error': f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        operation = self.path.strip('/')
+        if operation not in PDFService.OPERATIONS:
+            self.send_json(404, {'ok': False, 'error': f"Unknown path: {self.path}"})
+            return
+        if not self.check_request():
+            return
+        content_type = self.headers.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if content_type != 'application/json':
+            self.send_json(415, {'ok': False, 'error': "Jobs must be sent as application/json"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            job = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(job, dict):
+                raise ValueError("Job must be a JSON object")
+        except ValueError as e:
+            self.send_json(400, {'ok': False, 'error': f"Invalid job: {e}"})
+            return
+        status, response = self.server.service.submit(operation, job)
+        self.send_json(status, response)
+
+    def send_json(self, status, document):
+        body = json.dumps(document, default=PDFService.json_default).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        self.server.service.logger.debug("🌐 " + format, *args)
+
+
+class PDFService:
+    """
+    Long-running injection/extraction service with warm state
+
+    Modules, derived AES keys, the qpdf probe and the conversion cache stay
+    loaded between jobs, so each request only pays for its own document.
+    Jobs arrive as JSON over HTTP (localhost or a Unix socket) and run on a
+    bounded thread pool; when every worker and queue slot is taken new jobs
+    are refused with 503 instead of piling up.
+
+    Requests must carry a loopback Host and a JSON content type; on TCP they
+    also need the token generated at start, on a Unix socket the 0600 socket
+    file is the access check. Job paths are resolved under the working root
+    and refused outside it.
+    """
+
+    OPERATIONS = ('inject', 'extract', 'convert')
+
+    def __init__(self, workers=None, queue_size=None, converter_backend='auto', use_cache=True,
+                 cache_dir=None, root=None, token=None, logger=None):
+        """
+        Initialize PDFService
+
+        Args:
+            workers (int): Jobs run concurrently (default: one per CPU)
+            queue_size (int): Jobs waiting for a worker before new ones are refused
+                (default: 4 per worker)
+            converter_backend (str): Normalization backend of inject jobs
+            use_cache (bool): Reuse normalized copies through the conversion cache
+            cache_dir (str): Conversion cache directory
+            root (str): Working root: every job path must resolve inside it (default: current directory)
+            token (str): Token required on TCP (default: a random one per start)
+            logger (OutputManager): Job events (default: warnings and errors only)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = self.workers * 4 if queue_size is None else queue_size
+        self.converter_backend = converter_backend
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+        self.root = os.path.realpath(root or os.getcwd())
+        self.token = token
+        self.logger = logger or OutputManager(level='warning')
+        # Workers stay silent, the service logs one event per job
+        self.quiet = OutputManager(level='quiet')
+        self.pool = ThreadPoolExecutor(self.workers, thread_name_prefix='payloadpdf')
+        self.slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.counters = {'completed': 0, 'failed': 0, 'rejected': 0, 'running': 0}
+        self.started = time.time()
+        self.server = None
+
+    def warm_up(self):
+        """Probe the converter environment once, before the first job"""
+        if self.converter_backend in ['auto', 'qpdf']:
+            self.converter().probe_environment()
+
+    def converter(self):
+        """Converter of the calling worker thread (instances keep per-run state)"""
+        if not hasattr(self.local, 'converter'):
+            self.local.converter = PDFTraditionalConverter(self.converter_backend, use_cache=self.use_cache,
+                                                           cache_dir=self.cache_dir, logger=self.quiet)
+        return self.local.converter
+
+    def extractor(self, output_dir):
+        """Extractor of the calling worker thread (keeps its cipher cache between jobs)"""
+        if not hasattr(self.local, 'extractor'):
+            self.local.extractor = PDFHiddenMessageExtractor(logger=self.quiet)
+        self.local.extractor.output_dir = output_dir
+        return self.local.extractor
+
+    def resolve(self, path):
+        """Absolute path of a job path (relative to the root), ValueError outside the root"""
+        if not isinstance(path, str) or not path:
+            raise ValueError(f"Invalid path: {path!r}")
+        resolved = os.path.realpath(os.path.join(self.root, path))
+        if os.path.commonpath([resolved, self.root]) != self.root:
+            raise ValueError(f"Path outside the service root: {path}")
+        return resolved
+
+    def submit(self, operation, job):
+        """
+        Run one job on the pool and wait for it
+
+        Returns:
+            tuple: (HTTP status, response document)
+        """
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.counters['rejected'] += 1
+            return 503, {'ok': False, 'error': "Service busy, retry later"}
+        try:
+            future = self.pool.submit(self.run_job, operation, job)
+        except RuntimeError:
+            self.slots.release()
+            return 503, {'ok': False, 'error': "Service shutting down"}
+        future.add_done_callback(lambda _: self.slots.release())
+        return future.result()
+
+    def run_job(self, operation, job):
+        """Execute a job on a worker thread and log its outcome"""
+        start_time = time.perf_counter()
+        with self.lock:
+            self.counters['running'] += 1
+        try:
+            results = getattr(self, f"run_{operation}")(job)
+            status, response = 200, {'ok': True, 'results': self.to_json(results)}
+        except (KeyError, TypeError, ValueError) as e:
+            status, response = 400, {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            status, response = 500, {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        elapsed = time.perf_counter() - start_time
+        response['elapsed'] = elapsed
+
+        with self.lock:
+            self.counters['running'] -= 1
+            self.counters['completed' if response['ok'] else 'failed'] += 1
+        if response['ok']:
+            self.logger.info("✅ %s %s (%.1f ms)", operation, job.get('input'), elapsed * 1000,
+                             operation=operation, input=job.get('input'), elapsed=elapsed)
+        else:
+            self.logger.warning("⚠️  %s %s: %s", operation, job.get('input'), response['error'],
+                                operation=operation, input=job.get('input'), error=response['error'])
+        return status, response
+
+    def run_inject(self, job):
+        """
+        Inject job: {"input", "output", "payloads": [{"text": ...} or {"file": path, "name": ...}],
+        "key", "incremental", "encoding", "flate", "compression", "compression_level", "chunk_size", "convert"}
+        """
+        payloads = job['payloads']
+        if not payloads:
+            raise ValueError("No payloads to inject")
+        key = job.get('key')
+        injector = PDFHiddenObjectInjector(encoding=job.get('encoding', 'base64'), flate=job.get('flate', False),
+                                           compression=job.get('compression'),
+                                           compression_level=job.get('compression_level'),
+                                           chunk_size=job.get('chunk_size'), logger=self.quiet)
+
+        source = self.resolve(job['input'])
+        output = self.resolve(job['output'])
+        converted = None
+        files = []
+        try:
+            if job.get('convert', True):
+                # One temporary copy per job: concurrent jobs never share a path
+                fd, converted = tempfile.mkstemp(suffix='.pdf')
+                os.close(fd)
+                if not self.converter().convert_pdf(source, converted):
+                    raise ValueError(f"Conversion failed: {source}")
+                source = converted
+
+            items = []
+            for payload in payloads:
+                if 'text' in payload:
+                    items.append(PDFPayload(payload['text'], None))
+                else:
+                    files.append(open(self.resolve(payload['file']), 'rb'))
+                    items.append(PDFPayload(files[-1], payload.get('name') or os.path.basename(payload['file'])))
+            return injector.inject_hidden_objects(source, output, items, bool(key), key,
+                                                  job.get('incremental', False))
+        finally:
+            for f in files:
+                f.close()
+            if converted and os.path.exists(converted):
+                os.remove(converted)
+
+    def run_extract(self, job):
+        """
+        Extract job: {"input", "mode": "text" or "file", "key", "output_dir"}, or a byte-range
+        read of a chunked file: {"input", "range": [start, end], "name", "key"} (data in base64)
+        """
+        key = job.get('key')
+        source = self.resolve(job['input'])
+        extractor = self.extractor(self.resolve(job.get('output_dir', "extracted_files")))
+        if 'range' in job:
+            start, end = job['range']
+            data = extractor.read_range(source, start, end, job.get('name'), key)
+            return {'name': job.get('name'), 'start': start, 'length': len(data),
+                    'data': base64.b64encode(data).decode('ascii')}
+        if job.get('mode', 'text') == 'file':
+            result = extractor.extract_all_hidden_objects_file(source, bool(key), key)
+        else:
+            result = extractor.extract_all_hidden_objects(source, bool(key), key)
+        if result is None:
+            raise ValueError(f"Could not process {job['input']}")
+        return result
+
+    def run_convert(self, job):
+        """Convert job: {"input", "output"}"""
+        result = self.converter().convert_pdf(self.resolve(job['input']), self.resolve(job['output']))
+        if result is None:
+            raise ValueError(f"Conversion failed: {job['input']}")
+        return result
+
+    def status(self):
+        """Counters, pool size and uptime"""
+        with self.lock:
+            counters = dict(self.counters)
+        counters.update({'workers': self.workers, 'queue_size': self.queue_size,
+                         'uptime': time.time() - self.started})
+        return counters
+
+    @staticmethod
+    def json_default(value):
+        """Encode results: named tuples as objects, file bytes are left out (see 'path')"""
+        if isinstance(value, (bytes, bytearray)):
+            return None
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    @staticmethod
+    def to_json(value):
+        """Turn (nested) named tuples into dictionaries"""
+        if hasattr(value, '_asdict'):
+            return {name: PDFService.to_json(item) for name, item in value._asdict().items()}
+        if isinstance(value, (list, tuple)):
+            return [PDFService.to_json(item) for item in value]
+        return value
+
+    def serve(self, host='127.0.0.1', port=8765, socket_path=None):
+        """
+        Serve jobs until shutdown() (or Ctrl+C)
+
+        Args:
+            host (str): Listening address (keep it on loopback: jobs name local paths)
+            port (int): Listening port
+            socket_path (str): Listen on this Unix socket instead of TCP (created 0600, no token)
+        """
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            # Only the owner may connect: the socket is created 0600
+            umask = os.umask(0o177)
+            try:
+                self.server = ThreadingUnixHTTPServer(socket_path, PDFServiceRequestHandler)
+            finally:
+                os.umask(umask)
+            self.token = None
+            address = socket_path
+        else:
+            self.server = ThreadingHTTPServer((host, port), PDFServiceRequestHandler)
+            address = "http://%s:%s" % self.server.server_address[:2]
+            self.token = self.token or secrets.token_urlsafe(32)
+        self.server.service = self
+        if threading.current_thread() is threading.main_thread():
+            # serve_forever() must be stopped from another thread
+            signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=self.shutdown).start())
+        self.warm_up()
+        self.logger.info("🚀 Serving on %s (%s workers, queue %s), root %s", address, self.workers,
+                         self.queue_size, self.root)
+        if self.token:
+            self.logger.info("🔑 Send the header %s: %s", PDFServiceRequestHandler.TOKEN_HEADER, self.token)
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.server.server_close()
+            self.pool.shutdown(wait=True)
+            if socket_path and os.path.exists(socket_path):
+                os.remove(socket_path)
+            self.logger.info("🛑 Service stopped")
+
+    def shutdown(self):
+        """Stop serve() from another thread"""
+        if self.server is not None:
+            self.server.shutdown()